@@ -3,6 +3,7 @@
 
 from uuid import UUID
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,11 +17,15 @@ from app.schemas.ai import (
 )
 from app.services.ai_service import AIService
 from app.utils.security import get_current_user
-from app.middleware.rate_limit import check_rate_limit
+from app.utils.responses import JSONResponse
+from app.middleware.rate_limit import check_rate_limit, ROUTE_COSTS
 
 
 router = APIRouter(prefix="/ai", tags=["AI"])
 
+# Keep proxies from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
@@ -29,11 +34,30 @@ async def chat(
     db: AsyncSession = Depends(get_db),
 ):
     """Chat with AI assistant about finances."""
-    # Apply rate limiting (10 requests per minute per user)
-    check_rate_limit(str(current_user.id))
+    # Apply rate limiting (10 tokens per minute per user, chat costs 1)
+    await check_rate_limit(str(current_user.id), cost=ROUTE_COSTS["chat"])
     
     service = AIService(db)
-    return await service.chat(current_user, request)
+    return JSONResponse(await service.chat(current_user, request))
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Chat with AI assistant, streaming the reply as Server-Sent Events.
+    
+    Events: `start` {conversation_id}, unnamed {delta} chunks, then `done`
+    with the saved message (same shape as ChatResponse.message) or `error`.
+    """
+    await check_rate_limit(str(current_user.id), cost=ROUTE_COSTS["chat"])
+    
+    service = AIService(db)
+    events = await service.chat_stream(current_user, request)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.get("/chat/{conversation_id}", response_model=ChatHistoryResponse)
@@ -44,7 +68,7 @@ async def get_chat_history(
 ):
     """Get chat history for a conversation."""
     service = AIService(db)
-    return await service.get_chat_history(current_user.id, conversation_id)
+    return JSONResponse(await service.get_chat_history(current_user.id, conversation_id))
 
 
 @router.get("/predict", response_model=PredictionResponse)
@@ -53,11 +77,11 @@ async def get_prediction(
     db: AsyncSession = Depends(get_db),
 ):
     """Get AI-powered spending prediction for next month."""
-    # Apply rate limiting
-    check_rate_limit(str(current_user.id))
+    # Apply rate limiting (prompts carry months of history, so cost more)
+    await check_rate_limit(str(current_user.id), cost=ROUTE_COSTS["predict"])
     
     service = AIService(db)
-    return await service.get_prediction(current_user)
+    return JSONResponse(await service.get_prediction(current_user))
 
 
 @router.get("/insights", response_model=InsightsResponse)
@@ -67,8 +91,8 @@ async def get_insights(
 ):
     """Get AI-generated spending insights."""
     # Apply rate limiting
-    check_rate_limit(str(current_user.id))
+    await check_rate_limit(str(current_user.id), cost=ROUTE_COSTS["insights"])
     
     service = AIService(db)
-    return await service.get_insights(current_user)
+    return JSONResponse(await service.get_insights(current_user))
 
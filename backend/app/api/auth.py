@@ -1,7 +1,9 @@
 # Authentication API Routes
 # Signup, login, logout, token refresh
 
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -10,9 +12,11 @@ from app.schemas.auth import (
     LoginRequest,
     TokenResponse,
     RefreshRequest,
+    LogoutRequest,
     MessageResponse,
 )
 from app.services.auth_service import AuthService
+from app.utils.security import optional_security
 
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -49,8 +53,15 @@ async def refresh_token(
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout():
-    """Logout user (client should discard tokens)."""
-    # JWT is stateless, so we just return success
-    # In production, you might add token to a blacklist
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_db),
+):
+    """Logout user: revoke the bearer access token and/or the refresh token sent."""
+    service = AuthService(db)
+    await service.logout(
+        credentials.credentials if credentials else None,
+        data.refresh_token if data else None,
+    )
     return MessageResponse(message="Successfully logged out")
@@ -1,7 +1,8 @@
 # Budget API Routes
 # Budget management
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -12,7 +13,9 @@ from app.schemas.budget import (
     BudgetListResponse,
 )
 from app.services.budget_service import BudgetService
+from app.services.version_service import DataVersionService
 from app.utils.security import get_current_user
+from app.utils.responses import JSONResponse, PRIVATE_REVALIDATE, make_etag, etag_matches, not_modified
 
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
@@ -20,10 +23,17 @@ router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
 @router.get("/current", response_model=BudgetResponse)
 async def get_current_budget(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get current month's budget."""
+    """Get current month's budget (supports If-None-Match)."""
+    today = date.today()
+    version = await DataVersionService(db).get(current_user.id)
+    etag = make_etag("budget", version, f"{today:%Y-%m}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
     service = BudgetService(db)
     budget = await service.get_current(current_user.id)
     
@@ -33,7 +43,7 @@ async def get_current_budget(
             detail="No budget set for this month. Create one first.",
         )
     
-    return budget
+    return JSONResponse(budget, headers={"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE})
 
 
 @router.post("", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
@@ -47,7 +57,10 @@ async def create_or_update_budget(
     budget = await service.create_or_update(current_user.id, data)
     
     # Get full response with spent amounts
-    return await service.get_for_month(current_user.id, data.year, data.month)
+    return JSONResponse(
+        await service.get_for_month(current_user.id, data.year, data.month),
+        status_code=status.HTTP_201_CREATED,
+    )
 
 
 @router.get("/history", response_model=BudgetListResponse)
@@ -59,7 +72,7 @@ async def get_budget_history(
     service = BudgetService(db)
     budgets = await service.get_history(current_user.id)
     
-    return BudgetListResponse(
+    return JSONResponse(BudgetListResponse(
         items=budgets,
         total=len(budgets),
-    )
+    ))
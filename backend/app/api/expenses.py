@@ -1,32 +1,78 @@
 # Expenses API Routes
 # Transaction CRUD and summaries
 
-from typing import Optional
-from datetime import date
+from typing import Optional, Union
+from datetime import date, timedelta
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 import math
 
-from app.database import get_db
+from app.database import get_db, async_session_maker
 from app.models.user import User
 from app.schemas.expense import (
     ExpenseCreate,
     ExpenseUpdate,
     ExpenseResponse,
     ExpenseListResponse,
+    ExpenseCursorListResponse,
     ExpenseSummary,
+    DailySummary,
     CategoryResponse,
+    ImportSummary,
+    BatchRequest,
+    BatchResponse,
 )
 from app.schemas.auth import MessageResponse
 from app.services.expense_service import ExpenseService
+from app.services.import_service import ImportService, StatementImportError
+from app.services.export_service import ExportService
+from app.services.category_registry import category_registry
+from app.services.version_service import DataVersionService
 from app.utils.security import get_current_user
+from app.utils.responses import JSONResponse, PRIVATE_REVALIDATE, make_etag, etag_matches, not_modified
+from app.schemas.common import format_money
 
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
+# Longest window served by GET /transactions/daily
+MAX_DAILY_SERIES_DAYS = 366
 
-@router.get("", response_model=ExpenseListResponse)
+# Categories change only on deploy/seed; clients revalidate with If-None-Match
+CATEGORIES_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _to_response(expense) -> ExpenseResponse:
+    """Build an ExpenseResponse, resolving the category from the registry."""
+    return ExpenseResponse(
+        id=expense.id,
+        amount=expense.amount,
+        type=expense.type,
+        description=expense.description,
+        date=expense.date,
+        category=category_registry.get(expense.category_id),
+        is_auto_detected=expense.is_auto_detected,
+        created_at=expense.created_at,
+    )
+
+
+def _to_item(row) -> dict:
+    """ExpenseResponse-shaped dict for a list row (no model validation)."""
+    return {
+        "id": row.id,
+        "amount": format_money(row.amount),
+        "type": row.type,
+        "description": row.description,
+        "date": row.date,
+        "category": category_registry.get(row.category_id),
+        "is_auto_detected": row.is_auto_detected,
+        "created_at": row.created_at,
+    }
+
+
+@router.get("", response_model=Union[ExpenseListResponse, ExpenseCursorListResponse])
 async def list_transactions(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -34,45 +80,72 @@ async def list_transactions(
     end_date: Optional[date] = None,
     category_id: Optional[int] = None,
     type: Optional[str] = Query(None, regex="^(income|expense)$"),
+    paginate: str = Query("offset", regex="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all matches (cursor mode)"),
+    q: Optional[str] = Query(None, min_length=1, max_length=100, description="Full-text search in descriptions"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """List transactions with filters and pagination."""
+    """
+    List transactions with filters and pagination.
+    
+    Offset mode (default) returns page/pages/total. Cursor mode
+    (paginate=cursor, or any cursor value) returns next_cursor and only
+    counts the full result set when include_total is set. A search query
+    `q` returns ranked matches with offset paging.
+    """
     service = ExpenseService(db)
-    expenses, total = await service.list(
-        user_id=current_user.id,
-        page=page,
-        per_page=per_page,
+    filters = dict(
         start_date=start_date,
         end_date=end_date,
         category_id=category_id,
         transaction_type=type,
     )
     
-    return ExpenseListResponse(
-        items=[
-            ExpenseResponse(
-                id=e.id,
-                amount=e.amount,
-                type=e.type,
-                description=e.description,
-                date=e.date,
-                category=CategoryResponse(
-                    id=e.category.id,
-                    name=e.category.name,
-                    icon=e.category.icon,
-                    color=e.category.color,
-                ),
-                is_auto_detected=e.is_auto_detected,
-                created_at=e.created_at,
+    if q:
+        expenses, total = await service.search(
+            user_id=current_user.id,
+            query=q,
+            page=page,
+            per_page=per_page,
+            **filters,
+        )
+    elif paginate == "cursor" or cursor:
+        try:
+            expenses, next_cursor = await service.list_after(
+                user_id=current_user.id,
+                cursor=cursor,
+                per_page=per_page,
+                **filters,
             )
-            for e in expenses
-        ],
-        total=total,
-        page=page,
-        per_page=per_page,
-        pages=math.ceil(total / per_page) if total > 0 else 1,
-    )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            )
+        
+        return JSONResponse({
+            "items": [_to_item(row) for row in expenses],
+            "next_cursor": next_cursor,
+            "per_page": per_page,
+            "total": await service.count(current_user.id, **filters) if include_total else None,
+        })
+    else:
+        expenses, total = await service.list(
+            user_id=current_user.id,
+            page=page,
+            per_page=per_page,
+            **filters,
+        )
+    
+    return JSONResponse({
+        "items": [_to_item(row) for row in expenses],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": math.ceil(total / per_page) if total > 0 else 1,
+    })
 
 
 @router.post("", response_model=ExpenseResponse, status_code=status.HTTP_201_CREATED)
@@ -83,53 +156,159 @@ async def create_transaction(
 ):
     """Create a new transaction (expense or income)."""
     service = ExpenseService(db)
-    expense = await service.create(current_user.id, data)
+    try:
+        expense = await service.create(current_user.id, data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
-    return ExpenseResponse(
-        id=expense.id,
-        amount=expense.amount,
-        type=expense.type,
-        description=expense.description,
-        date=expense.date,
-        category=CategoryResponse(
-            id=expense.category.id,
-            name=expense.category.name,
-            icon=expense.category.icon,
-            color=expense.category.color,
-        ),
-        is_auto_detected=expense.is_auto_detected,
-        created_at=expense.created_at,
+    return JSONResponse(_to_response(expense), status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/batch", response_model=BatchResponse)
+async def batch_transactions(
+    request: BatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Apply many create/update/delete operations in one request.
+    
+    Operations run in order inside a single DB transaction and each one
+    gets its own result. With atomic=true nothing is written unless every
+    operation succeeds.
+    """
+    service = ExpenseService(db)
+    return JSONResponse(await service.apply_batch(current_user.id, request))
+
+
+@router.post("/import", response_model=ImportSummary)
+async def import_transactions(
+    file: UploadFile = File(..., description="CSV or OFX/QFX bank/UPI statement"),
+    format: Optional[str] = Query(None, regex="^(csv|ofx)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Bulk import transactions from a bank/UPI statement.
+    
+    The upload is parsed as a stream and inserted in batches; rows that
+    fail validation are skipped and reported individually.
+    """
+    file_format = format
+    if not file_format:
+        filename = (file.filename or "").lower()
+        file_format = "ofx" if filename.endswith((".ofx", ".qfx")) else "csv"
+    
+    service = ImportService(db)
+    try:
+        return await service.import_statement(current_user.id, file.file, file_format)
+    except StatementImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/export")
+async def export_transactions(
+    format: str = Query("csv", regex="^(csv|ndjson)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """Stream all matching transactions as CSV or NDJSON."""
+    user_id = current_user.id
+    
+    async def body():
+        # The stream outlives the request-scoped session, so it opens its own
+        async with async_session_maker() as session:
+            service = ExportService(session)
+            stream = service.stream_csv if format == "csv" else service.stream_ndjson
+            async for chunk in stream(user_id, start_date, end_date):
+                yield chunk
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="spendx-transactions.{format}"'},
     )
 
 
 @router.get("/summary", response_model=ExpenseSummary)
 async def get_summary(
+    request: Request,
     year: int = Query(..., ge=2020, le=2100),
     month: int = Query(..., ge=1, le=12),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get monthly expense summary with category breakdown."""
+    """Get monthly expense summary with category breakdown (supports If-None-Match)."""
+    version = await DataVersionService(db).get(current_user.id)
+    etag = make_etag("summary", version, year, month)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    service = ExpenseService(db)
+    return JSONResponse(
+        await service.get_summary(current_user.id, year, month),
+        headers={"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE},
+    )
+
+
+@router.get("/daily", response_model=list[DailySummary])
+async def get_daily_series(
+    start: Optional[date] = Query(None, description="First day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    category_id: Optional[int] = None,
+    type: str = Query("expense", regex="^(expense|income)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a dense per-day series of totals for charts (missing days are zero)."""
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end",
+        )
+    if (end - start).days >= MAX_DAILY_SERIES_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range is limited to {MAX_DAILY_SERIES_DAYS} days",
+        )
+    
     service = ExpenseService(db)
-    return await service.get_summary(current_user.id, year, month)
+    return JSONResponse(await service.get_daily_series(
+        current_user.id,
+        start,
+        end,
+        category_id=category_id,
+        transaction_type=type,
+    ))
 
 
 @router.get("/categories", response_model=list[CategoryResponse])
 async def get_categories(
+    request: Request,
     db: AsyncSession = Depends(get_db),
 ):
-    """Get all available expense categories."""
+    """Get all available expense categories (cacheable, supports If-None-Match)."""
     service = ExpenseService(db)
     categories = await service.get_all_categories()
-    return [
-        CategoryResponse(
-            id=c.id,
-            name=c.name,
-            icon=c.icon,
-            color=c.color,
-        )
-        for c in categories
-    ]
+    
+    if etag_matches(request, category_registry.etag):
+        return not_modified(category_registry.etag, CATEGORIES_CACHE_CONTROL)
+    
+    return JSONResponse(
+        categories,
+        headers={"ETag": category_registry.etag, "Cache-Control": CATEGORIES_CACHE_CONTROL},
+    )
 
 
 @router.get("/{expense_id}", response_model=ExpenseResponse)
@@ -148,21 +327,7 @@ async def get_transaction(
             detail="Transaction not found",
         )
     
-    return ExpenseResponse(
-        id=expense.id,
-        amount=expense.amount,
-        type=expense.type,
-        description=expense.description,
-        date=expense.date,
-        category=CategoryResponse(
-            id=expense.category.id,
-            name=expense.category.name,
-            icon=expense.category.icon,
-            color=expense.category.color,
-        ),
-        is_auto_detected=expense.is_auto_detected,
-        created_at=expense.created_at,
-    )
+    return JSONResponse(_to_response(expense))
 
 
 @router.patch("/{expense_id}", response_model=ExpenseResponse)
@@ -174,7 +339,13 @@ async def update_transaction(
 ):
     """Update a transaction."""
     service = ExpenseService(db)
-    expense = await service.update(expense_id, current_user.id, data)
+    try:
+        expense = await service.update(expense_id, current_user.id, data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     
     if not expense:
         raise HTTPException(
@@ -182,21 +353,7 @@ async def update_transaction(
             detail="Transaction not found",
         )
     
-    return ExpenseResponse(
-        id=expense.id,
-        amount=expense.amount,
-        type=expense.type,
-        description=expense.description,
-        date=expense.date,
-        category=CategoryResponse(
-            id=expense.category.id,
-            name=expense.category.name,
-            icon=expense.category.icon,
-            color=expense.category.color,
-        ),
-        is_auto_detected=expense.is_auto_detected,
-        created_at=expense.created_at,
-    )
+    return JSONResponse(_to_response(expense))
 
 
 @router.delete("/{expense_id}", response_model=MessageResponse)
@@ -1,17 +1,23 @@
 # Users API Routes
 # User profile management
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, extract
+from sqlalchemy import select, func
 from datetime import date
-import bcrypt
 
-from app.database import get_db
+from app.database import get_db, async_session_maker
 from app.models.user import User
 from app.models.expense import Expense, TransactionType
 from app.schemas.user import UserResponse, UserUpdate, UserProfileResponse, ChangePasswordRequest
+from app.services.export_service import ExportService
+from app.services.version_service import DataVersionService
 from app.utils.security import get_current_user
+from app.utils.password_pool import get_password_pool
+from app.utils.auth_cache import auth_cache
+from app.utils.periods import Period
+from app.utils.responses import JSONResponse, PRIVATE_REVALIDATE, make_etag, etag_matches, not_modified
 
 
 router = APIRouter(prefix="/users", tags=["Users"])
@@ -19,11 +25,16 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/me", response_model=UserProfileResponse)
 async def get_current_user_profile(
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get current user's profile with stats."""
+    """Get current user's profile with stats (supports If-None-Match)."""
     today = date.today()
+    version = await DataVersionService(db).get(current_user.id)
+    etag = make_etag("me", version, f"{today:%Y-%m}")
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
     # Get totals
     totals_query = select(
@@ -40,14 +51,13 @@ async def get_current_user_profile(
     ).where(
         Expense.user_id == current_user.id,
         Expense.type == TransactionType.EXPENSE,
-        extract("year", Expense.date) == today.year,
-        extract("month", Expense.date) == today.month,
+        Period.month(today.year, today.month).filter(Expense.date),
     )
     
     month_result = await db.execute(month_query)
     current_month_spent = month_result.scalar() or 0
     
-    return UserProfileResponse(
+    return JSONResponse(UserProfileResponse(
         id=current_user.id,
         email=current_user.email,
         name=current_user.name,
@@ -61,6 +71,26 @@ async def get_current_user_profile(
         total_expenses=totals.get(TransactionType.EXPENSE, 0),
         total_income=totals.get(TransactionType.INCOME, 0),
         current_month_spent=float(current_month_spent),
+    ), headers={"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE})
+
+
+@router.get("/me/archive")
+async def download_account_archive(
+    current_user: User = Depends(get_current_user),
+):
+    """Stream a zip of the user's profile, transactions, budgets and chat history."""
+    user = current_user
+    
+    async def body():
+        # The stream outlives the request-scoped session, so it opens its own
+        async with async_session_maker() as session:
+            async for chunk in ExportService(session).stream_archive(user):
+                yield chunk
+    
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="spendx-archive.zip"'},
     )
 
 
@@ -76,10 +106,12 @@ async def update_current_user(
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
+    await DataVersionService(db).bump(current_user.id)
     await db.commit()
+    auth_cache.invalidate(current_user.id)
     await db.refresh(current_user)
     
-    return UserResponse(
+    return JSONResponse(UserResponse(
         id=current_user.id,
         email=current_user.email,
         name=current_user.name,
@@ -90,7 +122,7 @@ async def update_current_user(
         notifications_enabled=current_user.notifications_enabled,
         is_premium=current_user.is_premium,
         created_at=current_user.created_at,
-    )
+    ))
 
 
 @router.post("/me/change-password")
@@ -100,13 +132,6 @@ async def change_password(
     db: AsyncSession = Depends(get_db),
 ):
     """Change current user's password."""
-    # Verify current password
-    if not bcrypt.checkpw(data.current_password.encode(), current_user.password_hash.encode()):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Current password is incorrect"
-        )
-    
     # Verify new passwords match
     if data.new_password != data.confirm_password:
         raise HTTPException(
@@ -121,11 +146,20 @@ async def change_password(
             detail="New password must be different from current password"
         )
     
+    # Verify current password (after the cheap checks, as bcrypt is costly)
+    if not await get_password_pool().verify(data.current_password, current_user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect"
+        )
+    
     # Update password
-    new_hash = bcrypt.hashpw(data.new_password.encode(), bcrypt.gensalt()).decode()
-    current_user.password_hash = new_hash
+    current_user.password_hash = await get_password_pool().hash(data.new_password)
     
+    # Other workers drop their cached copy of this user on the version change
+    await DataVersionService(db).bump(current_user.id)
     await db.commit()
+    auth_cache.invalidate(current_user.id)
     
     return {"message": "Password changed successfully"}
 
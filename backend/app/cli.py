@@ -0,0 +1,58 @@
+# SpendX Backend - Management Commands
+# Usage: python -m app.cli <command> [options]
+
+import argparse
+import asyncio
+from typing import Optional
+from uuid import UUID
+
+from app.database import create_tables, async_session_maker, engine
+
+
+async def rebuild_rollups(user_id: Optional[UUID] = None) -> None:
+    """Backfill/repair monthly rollups from the expenses table."""
+    from app.services.rollup_service import RollupService
+
+    await create_tables()
+    async with async_session_maker() as session:
+        count = await RollupService(session).rebuild(user_id)
+        await session.commit()
+
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"✅ Rebuilt {count} monthly rollup rows for {scope}")
+
+
+async def rebuild_search() -> None:
+    """Repopulate the full-text search index (SQLite; Postgres maintains its own)."""
+    from app.services.search_service import rebuild_search_index
+
+    await create_tables()
+    async with engine.begin() as conn:
+        await rebuild_search_index(conn)
+
+    print(f"✅ Rebuilt search index ({engine.dialect.name})")
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Parse arguments and run the requested command."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="SpendX management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rebuild-rollups", help="Recompute monthly summary rollups")
+    rollups.add_argument("--user-id", type=UUID, default=None, help="Rebuild a single user only")
+
+    commands.add_parser(
+        "rebuild-search-index",
+        help="Repopulate the SQLite FTS index (run after bulk SQL edits)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-rollups":
+        asyncio.run(rebuild_rollups(args.user_id))
+    elif args.command == "rebuild-search-index":
+        asyncio.run(rebuild_search())
+
+
+if __name__ == "__main__":
+    main()
@@ -25,12 +25,113 @@ class Settings(BaseSettings):
     algorithm: str = Field(default="HS256")
     access_token_expire_minutes: int = Field(default=30)
     refresh_token_expire_days: int = Field(default=7)
+    auth_cache_ttl_seconds: int = Field(
+        default=30,
+        ge=0,
+        description="Trust cached users this long before rechecking the data version (0 = off)"
+    )
+    auth_cache_max_entries: int = Field(default=10000, ge=1)
+    password_pool_workers: int = Field(
+        default=0,
+        ge=0,
+        description="bcrypt worker threads (0 = min(4, CPU count))"
+    )
+    password_pool_max_queue: int = Field(
+        default=64,
+        ge=1,
+        description="bcrypt calls allowed to wait or run before returning 503"
+    )
     
     # Google Gemini AI
     gemini_api_key: str = Field(
         default="",
         description="Google Gemini API key"
     )
+    gemini_max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Gemini calls allowed in flight per process; more wait in a queue"
+    )
+    gemini_use_async: bool = Field(
+        default=True,
+        description="Use the SDK's async API (false: a dedicated thread pool)"
+    )
+    gemini_breaker_threshold: int = Field(
+        default=3,
+        ge=1,
+        description="Consecutive failures before a model's circuit opens"
+    )
+    gemini_breaker_cooldown_seconds: int = Field(
+        default=30,
+        ge=1,
+        description="How long an open circuit skips a model (unless the server hints otherwise)"
+    )
+    gemini_deadline_seconds: float = Field(
+        default=20.0,
+        gt=0,
+        description="Total time one AI call may spend across retries and fallback models"
+    )
+    gemini_stream_idle_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        description="Longest pause allowed between streamed chunks once an answer has started"
+    )
+    gemini_hedge_percentile: float = Field(
+        default=0.0,
+        ge=0,
+        lt=1,
+        description="Also ask the next model once a call outlasts this latency quantile (0 = off, e.g. 0.9)"
+    )
+    ai_cache_ttl_seconds: int = Field(
+        default=3600,
+        ge=0,
+        description="Reuse insights/predictions for unchanged inputs this long (0 = off)"
+    )
+    ai_cache_stale_seconds: int = Field(
+        default=86400,
+        ge=0,
+        description="After the TTL, keep serving a result this long while refreshing it"
+    )
+    prediction_history_months: int = Field(
+        default=3,
+        ge=1,
+        le=36,
+        description="Months of spending history sent to predictions (up to 36)"
+    )
+    
+    # Response cache (summaries, budgets)
+    cache_backend: str = Field(
+        default="memory",
+        pattern="^(memory|redis|none)$",
+        description="Response cache backend: memory, redis or none"
+    )
+    cache_redis_url: str = Field(
+        default="redis://localhost:6379/0",
+        description="Redis-protocol server for the redis cache backend"
+    )
+    cache_ttl_seconds: int = Field(default=300, ge=1)
+    cache_max_entries: int = Field(default=10000, ge=1)
+    cache_max_mb: int = Field(default=32, ge=1, description="Memory cap for the in-process cache")
+    
+    # AI rate limiting (shared across workers with database or redis)
+    rate_limit_backend: str = Field(
+        default="memory",
+        pattern="^(memory|database|redis)$",
+        description="Rate limiter state: memory (per process), database or redis"
+    )
+    rate_limit_redis_url: str = Field(
+        default="redis://localhost:6379/0",
+        description="Redis-protocol server for the redis rate limit backend"
+    )
+    rate_limit_fail_open: bool = Field(
+        default=True,
+        description="Allow requests (true) or reject with 503 (false) when the backend fails"
+    )
+    rate_limit_flush_interval_ms: int = Field(
+        default=0,
+        ge=0,
+        description="Batch shared counter updates, flushing this often (0 writes every check through)"
+    )
     
     # CORS
     cors_origins: str = Field(
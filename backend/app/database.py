@@ -1,8 +1,10 @@
 # Database Configuration
 # SQLAlchemy async setup for PostgreSQL
 
+from sqlalchemy import Column
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex
 from app.config import settings
 
 
@@ -38,10 +40,25 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+def _create_missing_indexes(sync_conn) -> None:
+    """
+    CREATE INDEX IF NOT EXISTS for every plain column index.
+    
+    create_all only indexes tables it creates, so indexes added to a model
+    later never reach an existing database. Expression indexes are
+    dialect-specific and are created by the services that own them.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if all(isinstance(expression, Column) for expression in index.expressions):
+                sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def create_tables():
-    """Create all tables in the database."""
+    """Create all tables in the database, and indexes added since they were created."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
 
 
 async def drop_tables():
@@ -1,14 +1,30 @@
 # SpendX Backend - Main Application
 # FastAPI app with CORS, routes, and lifespan events
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import select
 
 from app.config import settings
-from app.database import create_tables, async_session_maker
+from app.database import create_tables, async_session_maker, engine
 from app.models.category import Category, DEFAULT_CATEGORIES
+from app.services.search_service import ensure_search_index
+from app.services.rollup_service import ensure_rollups
+from app.services.category_registry import category_registry
+from app.services.cache_service import get_response_cache
+from app.services.ai_cache import get_ai_cache
+from app.services.ai_service import ai_flights
+from app.middleware.rate_limit import (
+    run_cleanup as run_rate_limit_cleanup,
+    run_flush as run_rate_limit_flush,
+    flush_pending as flush_rate_limits,
+    rate_limit_stats,
+)
+from app.utils.password_pool import get_password_pool
+from app.utils.auth_cache import auth_cache
+from app.utils.revocation import revocation_store
 from app.api import (
     auth_router,
     users_router,
@@ -28,6 +44,7 @@ async def seed_categories():
                 session.add(category)
             await session.commit()
             print("✅ Seeded default categories")
+        await category_registry.load(session)
 
 
 @asynccontextmanager
@@ -36,8 +53,16 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting SpendX Backend...")
     await create_tables()
+    async with engine.begin() as conn:
+        await ensure_search_index(conn)
     print("✅ Database tables created")
+    async with async_session_maker() as session:
+        backfilled = await ensure_rollups(session)
+    if backfilled:
+        print(f"✅ Backfilled {backfilled} monthly rollup rows")
     await seed_categories()
+    async with async_session_maker() as session:
+        await revocation_store.load(session)
     
     # Validate Gemini API key
     if settings.gemini_api_key:
@@ -51,12 +76,24 @@ async def lifespan(app: FastAPI):
     else:
         print("⚠️  No Gemini API key configured - using fallback responses")
     
+    # Drop idle rate-limit buckets / expired counters so state tracks active users only
+    eviction_task = asyncio.create_task(run_rate_limit_cleanup())
+    # Write batched shared rate-limit counters (no-op unless RATE_LIMIT_FLUSH_INTERVAL_MS is set)
+    flush_task = asyncio.create_task(run_rate_limit_flush())
+    # Pick up logouts/rotations from other workers, drop expired token ids
+    revocation_task = asyncio.create_task(revocation_store.run_sync(async_session_maker))
+    
     print("✅ SpendX Backend ready!")
     
     yield
     
     # Shutdown
     print("👋 Shutting down SpendX Backend...")
+    eviction_task.cancel()
+    flush_task.cancel()
+    await flush_rate_limits()
+    revocation_task.cancel()
+    get_password_pool().shutdown()
 
 
 # Create FastAPI app
@@ -105,13 +142,23 @@ async def root():
 async def health_check():
     """Detailed health check."""
     ai_status = "not configured"
+    ai_calls = None
     if settings.gemini_api_key:
         from app.services.gemini_client import get_gemini_client
         client = get_gemini_client(settings.gemini_api_key)
         ai_status = "configured" if client.is_configured else "error"
+        ai_calls = client.stats()
     
     return {
         "status": "healthy",
         "database": "connected",
         "ai": ai_status,
+        "ai_calls": ai_calls,
+        "ai_cache": get_ai_cache().stats(),
+        "ai_single_flight": ai_flights.stats(),
+        "cache": get_response_cache().stats(),
+        "rate_limit": rate_limit_stats(),
+        "password_pool": get_password_pool().stats(),
+        "auth_cache": auth_cache.stats(),
+        "revoked_tokens": len(revocation_store),
     }
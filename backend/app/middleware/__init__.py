@@ -1,4 +1,4 @@
 # Middleware package
-from app.middleware.rate_limit import check_rate_limit, RateLimitExceeded
+from app.middleware.rate_limit import check_rate_limit, RateLimitExceeded, RateLimiterUnavailable
 
-__all__ = ["check_rate_limit", "RateLimitExceeded"]
+__all__ = ["check_rate_limit", "RateLimitExceeded", "RateLimiterUnavailable"]
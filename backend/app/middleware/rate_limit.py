@@ -1,21 +1,44 @@
 # Rate Limiting Middleware
-# Simple in-memory rate limiter for AI endpoints
+# Per-user rate limiter for AI endpoints (in-process, database or Redis-backed)
 
+import math
 import time
+import asyncio
 import logging
-from collections import defaultdict
-from typing import Optional
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional, Tuple
 from fastapi import HTTPException
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import SQLAlchemyError
 
-logger = logging.getLogger(__name__)
+from app.config import settings
+from app.models.rate_limit import RateLimitCounter
+from app.utils.resp import RespClient, RespError
 
-# Track requests per user: {user_id: [timestamp1, timestamp2, ...]}
-_request_times: dict = defaultdict(list)
+logger = logging.getLogger(__name__)
 
 # Configuration
 MAX_REQUESTS_PER_MINUTE = 10
 WINDOW_SECONDS = 60
 
+# Tokens consumed per call; a full bucket holds MAX_REQUESTS_PER_MINUTE tokens
+ROUTE_COSTS = {
+    "chat": 1,
+    "insights": 2,
+    "predict": 3,
+}
+
+# How often the background task sweeps out idle buckets / expired counters
+EVICTION_INTERVAL_SECONDS = 30
+EVICTION_BATCH = 1000
+
+# Batched shared counters (RATE_LIMIT_FLUSH_INTERVAL_MS > 0) flush early
+# once this many (key, window) debits are waiting
+FLUSH_MAX_PENDING = 1000
+
+# (key, window) -> (previous window count, current window count)
+WindowCounts = Dict[Tuple[str, int], Tuple[int, int]]
+
 
 class RateLimitExceeded(HTTPException):
     """Rate limit exceeded exception with retry-after header."""
@@ -28,64 +51,467 @@ class RateLimitExceeded(HTTPException):
         )
 
 
-def check_rate_limit(user_id: str, max_requests: int = MAX_REQUESTS_PER_MINUTE) -> None:
+class RateLimiterUnavailable(HTTPException):
+    """Shared limiter backend failed and RATE_LIMIT_FAIL_OPEN is off."""
+    
+    def __init__(self, retry_after: int = 5):
+        super().__init__(
+            status_code=503,
+            detail="Rate limiter unavailable. Please try again shortly.",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class TokenBucketLimiter:
     """
-    Check if user has exceeded rate limit.
+    Token bucket per user: constant work per check, two floats per user.
     
-    Args:
-        user_id: Unique identifier for the user
-        max_requests: Maximum allowed requests per minute
+    A bucket holds up to `capacity` tokens and refills continuously at
+    capacity / WINDOW_SECONDS tokens per second. Buckets are kept in
+    least-recently-used order; a bucket idle for a whole window has
+    refilled completely and is indistinguishable from a new one, so it is
+    dropped. Eviction pops from the old end only, so it is O(1) per key.
+    """
+    
+    def __init__(self, window_seconds: float = WINDOW_SECONDS):
+        self.window = window_seconds
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, updated_at]
+    
+    def consume(self, key: str, capacity: int, cost: int = 1) -> float:
+        """
+        Take `cost` tokens from the key's bucket.
         
-    Raises:
-        RateLimitExceeded: If user has exceeded the limit
+        Returns:
+            0 if allowed, otherwise seconds until enough tokens are available
+        """
+        now = time.monotonic()
+        rate = capacity / self.window
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(capacity), now]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+        
+        if bucket[0] < cost:
+            return (cost - bucket[0]) / rate
+        bucket[0] -= cost
+        return 0.0
+    
+    async def acquire(self, key: str, capacity: int, cost: int = 1) -> float:
+        """Backend interface; see consume()."""
+        return self.consume(key, capacity, cost)
+    
+    def remaining(self, key: str, capacity: int) -> int:
+        """Whole tokens currently available to the key."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return capacity
+        elapsed = time.monotonic() - bucket[1]
+        return int(min(capacity, bucket[0] + elapsed * capacity / self.window))
+    
+    def evict_idle(self, limit: int = EVICTION_BATCH) -> int:
+        """Drop up to `limit` buckets untouched for a full window; returns how many."""
+        cutoff = time.monotonic() - self.window
+        evicted = 0
+        buckets = self._buckets
+        while buckets and evicted < limit:
+            if buckets[next(iter(buckets))][1] > cutoff:
+                break
+            buckets.popitem(last=False)
+            evicted += 1
+        return evicted
+    
+    async def cleanup(self) -> None:
+        """Evict all idle buckets, yielding to requests between batches."""
+        total = 0
+        while True:
+            evicted = self.evict_idle()
+            total += evicted
+            if evicted < EVICTION_BATCH:
+                break
+            await asyncio.sleep(0)
+        if total:
+            logger.debug(f"Rate limiter evicted {total} idle buckets, {len(self)} active")
+    
+    def stats(self) -> dict:
+        return {"active_keys": len(self)}
+    
+    def reset(self, key: Optional[str] = None) -> None:
+        if key:
+            self._buckets.pop(key, None)
+        else:
+            self._buckets.clear()
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def _sliding_wait(previous: int, current: int, elapsed: float, capacity: int, window: float) -> float:
+    """
+    Sliding-window estimate over two fixed-window counters.
+    
+    The previous window's count is weighted by how much of it still
+    overlaps the trailing window. `current` already includes this request.
+    
+    Returns:
+        0 if the request fits, otherwise seconds until it would
+    """
+    if previous * (1 - elapsed) + current <= capacity:
+        return 0.0
+    if previous and current <= capacity:
+        # The previous window's weight decays linearly through this one
+        fits_at = 1 - (capacity - current) / previous
+        return (fits_at - elapsed) * window
+    return (1 - elapsed) * window
+
+
+class DatabaseRateLimiter:
     """
-    now = time.time()
-    window_start = now - WINDOW_SECONDS
+    Counters shared through the application database.
     
-    # Clean old entries outside the window
-    _request_times[user_id] = [
-        t for t in _request_times[user_id] if t > window_start
-    ]
+    Each check is one short transaction: an atomic upsert that adds the
+    cost and returns the new count, plus a read of the previous window.
+    Rejected requests give their cost back. Rows older than the previous
+    window are deleted by the cleanup task in one statement.
+    """
     
-    current_count = len(_request_times[user_id])
+    def __init__(self, session_maker, window_seconds: float = WINDOW_SECONDS):
+        self.session_maker = session_maker
+        self.window = window_seconds
     
-    if current_count >= max_requests:
-        # Calculate retry-after based on oldest request in window
-        if _request_times[user_id]:
-            oldest_request = min(_request_times[user_id])
-            retry_after = int(oldest_request + WINDOW_SECONDS - now) + 1
+    async def _add(self, session, debits: Dict[Tuple[str, int], int]) -> WindowCounts:
+        """Add each (key, window) debit atomically; returns the counts it leaves."""
+        dialect = session.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
         else:
-            retry_after = WINDOW_SECONDS
+            dialect_insert = None
+        
+        counts = {}
+        for (key, window), amount in debits.items():
+            if dialect_insert is not None:
+                stmt = dialect_insert(RateLimitCounter).values(key=key, window=window, count=amount)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["key", "window"],
+                    set_={"count": RateLimitCounter.count + amount},
+                ).returning(RateLimitCounter.count)
+                current = (await session.execute(stmt)).scalar_one()
+            else:
+                row = await session.get(RateLimitCounter, (key, window), with_for_update=True)
+                if row is None:
+                    row = RateLimitCounter(key=key, window=window, count=0)
+                    session.add(row)
+                row.count += amount
+                await session.flush()
+                current = row.count
+            
+            previous = (await session.execute(
+                select(RateLimitCounter.count).where(
+                    RateLimitCounter.key == key,
+                    RateLimitCounter.window == window - 1,
+                )
+            )).scalar() or 0
+            counts[(key, window)] = (previous, current)
+        return counts
+    
+    async def add(self, debits: Dict[Tuple[str, int], int]) -> WindowCounts:
+        """Apply several debits in one transaction (see BatchingLimiter)."""
+        async with self.session_maker() as session:
+            counts = await self._add(session, debits)
+            await session.commit()
+        return counts
+    
+    async def acquire(self, key: str, capacity: int, cost: int = 1) -> float:
+        now = time.time()
+        window, elapsed = int(now // self.window), (now % self.window) / self.window
+        counter = (RateLimitCounter.key == key) & (RateLimitCounter.window == window)
         
-        logger.warning(f"Rate limit exceeded for user {user_id}: {current_count}/{max_requests}")
-        raise RateLimitExceeded(retry_after=max(1, retry_after))
+        async with self.session_maker() as session:
+            counts = await self._add(session, {(key, window): cost})
+            previous, current = counts[(key, window)]
+            
+            wait = _sliding_wait(previous, current, elapsed, capacity, self.window)
+            if wait:
+                await session.execute(
+                    update(RateLimitCounter).where(counter).values(count=RateLimitCounter.count - cost)
+                )
+            await session.commit()
+        return wait
+    
+    async def cleanup(self) -> None:
+        """Delete counters for windows no longer read."""
+        oldest = int(time.time() // self.window) - 1
+        async with self.session_maker() as session:
+            await session.execute(delete(RateLimitCounter).where(RateLimitCounter.window < oldest))
+            await session.commit()
     
-    # Record this request
-    _request_times[user_id].append(now)
-    logger.debug(f"Rate limit check passed for user {user_id}: {current_count + 1}/{max_requests}")
+    def stats(self) -> dict:
+        return {}
 
 
-def get_remaining_requests(user_id: str) -> int:
-    """Get remaining requests for user in current window."""
-    now = time.time()
-    window_start = now - WINDOW_SECONDS
+class RedisRateLimiter:
+    """
+    Counters shared through a Redis-protocol server.
+    
+    INCRBY on the current window, PEXPIRE and GET of the previous window
+    go out as one pipeline, so a check costs a single round trip; each
+    command is atomic on the server. Keys expire on their own after two
+    windows.
+    """
+    
+    def __init__(self, client: RespClient, window_seconds: float = WINDOW_SECONDS, prefix: str = "spendx:rl:"):
+        self.client = client
+        self.window = window_seconds
+        self.prefix = prefix
     
-    current_requests = [
-        t for t in _request_times.get(user_id, []) if t > window_start
-    ]
+    async def add(self, debits: Dict[Tuple[str, int], int]) -> WindowCounts:
+        """Apply several debits in one pipeline; returns the counts each leaves."""
+        commands = []
+        for (key, window), amount in debits.items():
+            current_key = f"{self.prefix}{key}:{window}"
+            commands += [
+                ("INCRBY", current_key, amount),
+                ("PEXPIRE", current_key, int(self.window * 2000)),
+                ("GET", f"{self.prefix}{key}:{window - 1}"),
+            ]
+        replies = await self.client.pipeline(commands)
+        for reply in replies:
+            if isinstance(reply, RespError):
+                raise reply
+        return {
+            entry: (int(replies[3 * i + 2] or 0), replies[3 * i])
+            for i, entry in enumerate(debits)
+        }
     
-    return max(0, MAX_REQUESTS_PER_MINUTE - len(current_requests))
+    async def acquire(self, key: str, capacity: int, cost: int = 1) -> float:
+        now = time.time()
+        window, elapsed = int(now // self.window), (now % self.window) / self.window
+        
+        previous, current = (await self.add({(key, window): cost}))[(key, window)]
+        
+        wait = _sliding_wait(previous, current, elapsed, capacity, self.window)
+        if wait:
+            await self.client.execute("INCRBY", f"{self.prefix}{key}:{window}", -cost)
+        return wait
+    
+    async def cleanup(self) -> None:
+        pass
+    
+    def stats(self) -> dict:
+        return {}
+
+
+class BatchingLimiter:
+    """
+    Batches counter updates for a shared backend (database or redis).
+    
+    The first check of a key in a window, or once the key's snapshot is
+    older than the flush interval, goes straight to the backend and
+    snapshots both window counts. Later checks are decided locally from
+    that snapshot plus this worker's unflushed debits. Allowed debits (and
+    refunds of rejected write-through checks) are summed per (key, window)
+    and written for all keys in one round trip every interval, or as soon
+    as FLUSH_MAX_PENDING entries are waiting.
+    
+    Allowance: a worker cannot see what other workers admitted after its
+    snapshot, so within one interval each of N workers may spend the
+    headroom it last saw. A key can then be admitted up to N times its
+    limit in the worst case (exactly its limit with one worker), instead
+    of exactly its limit with write-through checks. Keep the interval
+    short next to WINDOW_SECONDS.
+    """
+    
+    def __init__(self, backend, interval_seconds: float):
+        self.backend = backend
+        self.interval = interval_seconds
+        self.window = backend.window
+        self._snapshots: Dict[str, list] = {}  # key -> [window, previous, current, synced_at]
+        self._pending: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._flushing: Dict[Tuple[str, int], int] = {}  # written but not yet in a snapshot
+        self._flushes = 0
+    
+    def _snapshot(self, counts: WindowCounts, synced_at: float) -> None:
+        for (key, window), (previous, current) in counts.items():
+            snapshot = self._snapshots.get(key)
+            if snapshot is None or snapshot[0] <= window:
+                self._snapshots[key] = [window, previous, current, synced_at]
+    
+    async def acquire(self, key: str, capacity: int, cost: int = 1) -> float:
+        now = time.time()
+        window, elapsed = int(now // self.window), (now % self.window) / self.window
+        entry = (key, window)
+        
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or snapshot[0] != window or now - snapshot[3] > self.interval:
+            counts = await self.backend.add({entry: cost})
+            self._snapshot(counts, now)
+            previous, current = counts[entry]
+            wait = _sliding_wait(previous, current + self._pending.get(entry, 0), elapsed, capacity, self.window)
+            if wait:
+                self._pending[entry] -= cost
+        else:
+            current = snapshot[2] + self._flushing.get(entry, 0) + self._pending.get(entry, 0) + cost
+            wait = _sliding_wait(snapshot[1], current, elapsed, capacity, self.window)
+            if not wait:
+                self._pending[entry] += cost
+        
+        if len(self._pending) >= FLUSH_MAX_PENDING:
+            await self.flush()
+        return wait
+    
+    async def flush(self) -> None:
+        """Write all pending debits in one round trip and refresh those snapshots."""
+        if self._flushing:
+            return  # one flush at a time; the next one picks these up
+        pending = {entry: amount for entry, amount in self._pending.items() if amount}
+        self._pending = defaultdict(int)
+        if not pending:
+            return
+        self._flushing = pending
+        synced_at = time.time()
+        try:
+            counts = await self.backend.add(pending)
+        except (RespError, SQLAlchemyError, OSError, asyncio.CancelledError):
+            # Keep the debits for the next flush
+            for entry, amount in pending.items():
+                self._pending[entry] += amount
+            raise
+        else:
+            self._flushes += 1
+            self._snapshot(counts, synced_at)
+        finally:
+            self._flushing = {}
+    
+    async def cleanup(self) -> None:
+        """Drop snapshots from past windows, then let the backend expire its counters."""
+        window = int(time.time() // self.window)
+        for key in [key for key, snapshot in self._snapshots.items() if snapshot[0] < window]:
+            del self._snapshots[key]
+        await self.backend.cleanup()
+    
+    def stats(self) -> dict:
+        return {
+            "flush_interval_ms": int(self.interval * 1000),
+            "pending": len(self._pending),
+            "flushes": self._flushes,
+            **self.backend.stats(),
+        }
+
+
+# In-process backend (also what get_remaining_requests/reset_rate_limit inspect)
+limiter = TokenBucketLimiter()
+
+# Singleton instance for the configured backend
+_backend = None
+_backend_errors = 0
+
+
+def get_rate_limiter():
+    """Get or create the limiter backend selected by RATE_LIMIT_BACKEND."""
+    global _backend
+    if _backend is None:
+        if settings.rate_limit_backend == "redis":
+            _backend = RedisRateLimiter(RespClient(settings.rate_limit_redis_url))
+        elif settings.rate_limit_backend == "database":
+            from app.database import async_session_maker
+            _backend = DatabaseRateLimiter(async_session_maker)
+        else:
+            _backend = limiter
+        if _backend is not limiter and settings.rate_limit_flush_interval_ms > 0:
+            _backend = BatchingLimiter(_backend, settings.rate_limit_flush_interval_ms / 1000)
+    return _backend
+
+
+async def check_rate_limit(
+    user_id: str,
+    max_requests: int = MAX_REQUESTS_PER_MINUTE,
+    cost: int = 1,
+) -> None:
+    """
+    Check if user has exceeded rate limit.
+    
+    Args:
+        user_id: Unique identifier for the user
+        max_requests: Bucket size (requests of cost 1 allowed per minute)
+        cost: Tokens this call consumes (see ROUTE_COSTS)
+    
+    Raises:
+        RateLimitExceeded: If user has exceeded the limit
+        RateLimiterUnavailable: If the shared backend failed and fail-open is off
+    """
+    global _backend_errors
+    try:
+        wait = await get_rate_limiter().acquire(user_id, max_requests, cost)
+    except (RespError, SQLAlchemyError, OSError) as e:
+        _backend_errors += 1
+        if settings.rate_limit_fail_open:
+            logger.warning(f"Rate limiter backend failed, allowing request: {e}")
+            return
+        logger.error(f"Rate limiter backend failed, rejecting request: {e}")
+        raise RateLimiterUnavailable()
+    
+    if wait:
+        logger.warning(f"Rate limit exceeded for user {user_id} (cost {cost}, limit {max_requests}/min)")
+        raise RateLimitExceeded(retry_after=max(1, math.ceil(wait)))
+
+
+async def run_cleanup(interval: float = EVICTION_INTERVAL_SECONDS) -> None:
+    """Background task: periodically drop idle buckets / expired counters."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await get_rate_limiter().cleanup()
+        except (RespError, SQLAlchemyError, OSError) as e:
+            logger.warning(f"Rate limiter cleanup failed: {e}")
+
+
+async def run_flush() -> None:
+    """Background task: write batched counter updates (RATE_LIMIT_FLUSH_INTERVAL_MS)."""
+    backend = get_rate_limiter()
+    if not isinstance(backend, BatchingLimiter):
+        return
+    while True:
+        await asyncio.sleep(backend.interval)
+        try:
+            await backend.flush()
+        except (RespError, SQLAlchemyError, OSError) as e:
+            logger.warning(f"Rate limiter flush failed: {e}")
+
+
+async def flush_pending() -> None:
+    """Write any batched counter updates now (shutdown)."""
+    backend = get_rate_limiter()
+    if isinstance(backend, BatchingLimiter):
+        try:
+            await backend.flush()
+        except (RespError, SQLAlchemyError, OSError) as e:
+            logger.warning(f"Rate limiter flush failed: {e}")
+
+
+def rate_limit_stats() -> dict:
+    """Backend name, error count and backend-specific figures for /health."""
+    return {
+        "backend": settings.rate_limit_backend,
+        "fail_open": settings.rate_limit_fail_open,
+        "errors": _backend_errors,
+        **get_rate_limiter().stats(),
+    }
+
+
+def get_remaining_requests(user_id: str) -> int:
+    """Get remaining requests (tokens) for user (in-process backend)."""
+    return limiter.remaining(user_id, MAX_REQUESTS_PER_MINUTE)
 
 
 def reset_rate_limit(user_id: Optional[str] = None) -> None:
     """
-    Reset rate limit tracking.
+    Reset rate limit tracking (in-process backend).
     
     Args:
         user_id: If provided, reset only for this user. Otherwise reset all.
     """
-    global _request_times
-    if user_id:
-        _request_times.pop(user_id, None)
-    else:
-        _request_times.clear()
+    limiter.reset(user_id)
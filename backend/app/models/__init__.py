@@ -1,15 +1,23 @@
 # Models Package
-from app.models.user import User
+from app.models.user import User, UserDataVersion
 from app.models.category import Category
-from app.models.expense import Expense
+from app.models.expense import Expense, ExpenseMonthlyRollup
 from app.models.budget import Budget, BudgetCategory
 from app.models.chat import ChatMessage
+from app.models.rate_limit import RateLimitCounter
+from app.models.token import RevokedToken
+from app.models.ai_result import AIResult
 
 __all__ = [
     "User",
+    "UserDataVersion",
     "Category", 
     "Expense",
+    "ExpenseMonthlyRollup",
     "Budget",
     "BudgetCategory",
     "ChatMessage",
+    "RateLimitCounter",
+    "RevokedToken",
+    "AIResult",
 ]
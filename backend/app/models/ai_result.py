@@ -0,0 +1,42 @@
+# AI Result Model
+# Persisted Gemini results for insights and predictions
+
+import uuid
+from sqlalchemy import String, Text, Integer, BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class AIResult(Base):
+    """
+    Latest AI result per user and endpoint, with the hash of its prompt.
+    
+    A result is reused only while the prompt built from the user's current
+    data hashes the same; a new result for the endpoint replaces the row.
+    created_at is Unix seconds.
+    """
+    
+    __tablename__ = "ai_results"
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    endpoint: Mapped[str] = mapped_column(
+        String(20),
+        primary_key=True,
+    )
+    input_hash: Mapped[str] = mapped_column(
+        String(64),
+        nullable=False,
+    )
+    payload: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+    )
+    created_at: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        nullable=False,
+    )
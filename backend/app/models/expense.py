@@ -4,7 +4,7 @@
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import String, Date, DateTime, ForeignKey, Numeric, Boolean, Enum, func, Index
+from sqlalchemy import String, Date, DateTime, ForeignKey, Numeric, Boolean, Enum, Integer, func, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
@@ -73,8 +73,66 @@ class Expense(Base):
     # Indexes for common queries
     __table_args__ = (
         Index("ix_expenses_user_date", "user_id", "date"),
+        Index("ix_expenses_user_keyset", "user_id", "date", "created_at", "id"),
         Index("ix_expenses_user_type", "user_id", "type"),
     )
     
     def __repr__(self) -> str:
         return f"<Expense {self.amount} {self.type.value}>"
+
+
+def description_tsvector():
+    """Document expression behind the Postgres full-text index on descriptions."""
+    return func.to_tsvector(
+        text("'simple'"),
+        func.coalesce(Expense.__table__.c.description, text("''")),
+    )
+
+
+# Postgres-only GIN index; SQLite uses the expenses_search FTS5 table instead
+description_fts_index = Index(
+    "ix_expenses_description_fts",
+    description_tsvector(),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+
+class ExpenseMonthlyRollup(Base):
+    """Per-user monthly totals by category and type, maintained on every write."""
+    
+    __tablename__ = "expense_monthly_rollups"
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    year: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+    )
+    month: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+    )
+    category_id: Mapped[int] = mapped_column(
+        ForeignKey("categories.id"),
+        primary_key=True,
+    )
+    type: Mapped[TransactionType] = mapped_column(
+        Enum(TransactionType),
+        primary_key=True,
+    )
+    total: Mapped[Decimal] = mapped_column(
+        Numeric(14, 2),
+        nullable=False,
+        default=Decimal("0"),
+    )
+    count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    
+    def __repr__(self) -> str:
+        return f"<ExpenseMonthlyRollup {self.year}-{self.month:02d} {self.type.value} {self.total}>"
@@ -0,0 +1,33 @@
+# Rate Limit Model
+# Shared request counters for the database rate-limit backend
+
+from sqlalchemy import String, Integer, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class RateLimitCounter(Base):
+    """
+    Tokens spent by one limiter key in one fixed time window.
+    
+    Rows are upserted atomically per request and removed once the window
+    is more than one window old (the previous window is still read to
+    smooth the boundary).
+    """
+    
+    __tablename__ = "rate_limit_counters"
+    
+    key: Mapped[str] = mapped_column(
+        String(64),
+        primary_key=True,
+    )
+    window: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        index=True,
+    )
+    count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
@@ -0,0 +1,40 @@
+# Token Model
+# Revoked JWT ids (logout, refresh rotation)
+
+import uuid
+from sqlalchemy import String, Integer, BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class RevokedToken(Base):
+    """
+    A token id (jti) that must no longer be accepted.
+    
+    Rows are only needed until the token would have expired anyway, so
+    they are deleted once expires_at has passed. Times are Unix seconds,
+    like the JWT exp claim.
+    """
+    
+    __tablename__ = "revoked_tokens"
+    
+    jti: Mapped[str] = mapped_column(
+        String(32),
+        primary_key=True,
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    expires_at: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        nullable=False,
+        index=True,
+    )
+    revoked_at: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        nullable=False,
+        index=True,
+    )
@@ -3,7 +3,7 @@
 
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, func
+from sqlalchemy import String, Boolean, DateTime, Integer, BigInteger, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
@@ -78,3 +78,25 @@ class User(Base):
     
     def __repr__(self) -> str:
         return f"<User {self.email}>"
+
+
+class UserDataVersion(Base):
+    """
+    Per-user counter bumped in the same transaction as every data write.
+    
+    Read endpoints derive ETags from it, so an unchanged dashboard can be
+    answered with 304 after a single primary-key lookup.
+    """
+    
+    __tablename__ = "user_data_versions"
+    
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        nullable=False,
+        default=0,
+    )
@@ -1,4 +1,5 @@
 # Schemas Package
+from app.schemas.common import *
 from app.schemas.auth import *
 from app.schemas.user import *
 from app.schemas.expense import *
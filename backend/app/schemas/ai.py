@@ -8,6 +8,8 @@ from typing import Optional, List
 from enum import Enum
 from decimal import Decimal
 
+from app.schemas.common import Money
+
 
 class ChatRole(str, Enum):
     """Chat message role."""
@@ -50,8 +52,8 @@ class CategoryPrediction(BaseModel):
     category_name: str
     category_icon: str
     category_color: str
-    predicted_amount: Decimal
-    last_month_amount: Decimal
+    predicted_amount: Money
+    last_month_amount: Money
     change_percentage: float
     trend: str  # "up", "down", "stable"
 
@@ -59,9 +61,9 @@ class CategoryPrediction(BaseModel):
 class PredictionResponse(BaseModel):
     """AI budget prediction."""
     next_month: str  # "February 2026"
-    predicted_total: Decimal
-    last_month_total: Decimal
-    potential_savings: Decimal
+    predicted_total: Money
+    last_month_total: Money
+    potential_savings: Money
     risk_level: str  # "low", "medium", "high"
     category_predictions: List[CategoryPrediction]
     recommendations: List[str]
@@ -2,6 +2,7 @@
 # Pydantic models for auth requests/responses
 
 from pydantic import BaseModel, EmailStr, Field
+from typing import Optional
 from uuid import UUID
 
 
@@ -29,6 +30,8 @@ class TokenData(BaseModel):
     """Decoded token data."""
     user_id: UUID
     email: str
+    jti: Optional[str] = None  # absent on tokens issued before revocation support
+    expires_at: Optional[int] = None
 
 
 class RefreshRequest(BaseModel):
@@ -36,6 +39,11 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
+class LogoutRequest(BaseModel):
+    """Logout request; the refresh token is revoked too when given."""
+    refresh_token: Optional[str] = None
+
+
 class MessageResponse(BaseModel):
     """Generic message response."""
     message: str
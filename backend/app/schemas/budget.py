@@ -7,6 +7,8 @@ from datetime import datetime
 from typing import Optional, List
 from decimal import Decimal
 
+from app.schemas.common import Money
+
 
 class BudgetCategoryCreate(BaseModel):
     """Category budget limit."""
@@ -28,9 +30,9 @@ class BudgetCategoryResponse(BaseModel):
     category_name: str
     category_icon: str
     category_color: str
-    limit_amount: Decimal
-    spent_amount: Decimal
-    remaining: Decimal
+    limit_amount: Money
+    spent_amount: Money
+    remaining: Money
     percentage_used: float
 
     class Config:
@@ -42,9 +44,9 @@ class BudgetResponse(BaseModel):
     id: UUID
     year: int
     month: int
-    total_limit: Decimal
-    total_spent: Decimal
-    remaining: Decimal
+    total_limit: Money
+    total_spent: Money
+    remaining: Money
     percentage_used: float
     category_limits: List[BudgetCategoryResponse]
     created_at: datetime
@@ -0,0 +1,18 @@
+# Common Schema Types
+# Shared field types for API responses
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated
+from pydantic import PlainSerializer
+
+
+_CENTS = Decimal("0.01")
+
+
+def format_money(value: Decimal) -> str:
+    """Render an amount as a string with exactly two decimal places."""
+    return str(Decimal(value).quantize(_CENTS, rounding=ROUND_HALF_UP))
+
+
+# Monetary amount: a Decimal in Python, always "123.40" (never 123.4 or "123.4") in JSON
+Money = Annotated[Decimal, PlainSerializer(format_money, return_type=str, when_used="json")]
@@ -3,11 +3,14 @@
 
 from pydantic import BaseModel, Field
 from uuid import UUID
+import datetime as dt
 from datetime import date, datetime
 from typing import Optional, List
 from enum import Enum
 from decimal import Decimal
 
+from app.schemas.common import Money
+
 
 class TransactionType(str, Enum):
     """Transaction type."""
@@ -41,13 +44,13 @@ class ExpenseUpdate(BaseModel):
     category_id: Optional[int] = None
     type: Optional[TransactionType] = None
     description: Optional[str] = Field(None, max_length=255)
-    date: Optional[date] = None
+    date: Optional[dt.date] = None  # dt.date: the field name shadows the type
 
 
 class ExpenseResponse(BaseModel):
     """Expense response."""
     id: UUID
-    amount: Decimal
+    amount: Money
     type: TransactionType
     description: Optional[str]
     date: date
@@ -68,11 +71,19 @@ class ExpenseListResponse(BaseModel):
     pages: int
 
 
+class ExpenseCursorListResponse(BaseModel):
+    """Keyset-paginated expense list."""
+    items: List[ExpenseResponse]
+    next_cursor: Optional[str] = None
+    per_page: int
+    total: Optional[int] = None
+
+
 class ExpenseSummary(BaseModel):
     """Monthly expense summary."""
-    total_income: Decimal
-    total_expense: Decimal
-    balance: Decimal
+    total_income: Money
+    total_expense: Money
+    balance: Money
     category_breakdown: List["CategoryBreakdown"]
 
 
@@ -82,7 +93,7 @@ class CategoryBreakdown(BaseModel):
     category_name: str
     category_icon: str
     category_color: str
-    amount: Decimal
+    amount: Money
     percentage: float
     transaction_count: int
 
@@ -90,5 +101,59 @@ class CategoryBreakdown(BaseModel):
 class DailySummary(BaseModel):
     """Daily spending summary."""
     date: date
-    total: Decimal
+    total: Money
     count: int
+
+
+class ImportRowError(BaseModel):
+    """A statement row that could not be imported."""
+    row: int
+    message: str
+
+
+class ImportSummary(BaseModel):
+    """Statement import result."""
+    format: str
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError]
+    duration_ms: float
+    rows_per_second: float
+
+
+class BatchOperationType(str, Enum):
+    """Batch mutation kind."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class BatchOperation(BaseModel):
+    """One mutation in a batch request."""
+    op: BatchOperationType
+    id: Optional[UUID] = None  # Required for update/delete; optional client-generated id for create
+    data: Optional[dict] = None  # ExpenseCreate fields for create, ExpenseUpdate fields for update
+
+
+class BatchRequest(BaseModel):
+    """Batch of mixed transaction mutations applied in one DB transaction."""
+    operations: List[BatchOperation] = Field(min_length=1, max_length=500)
+    atomic: bool = False  # Roll back everything if any operation fails
+
+
+class BatchOperationResult(BaseModel):
+    """Outcome of one batch operation."""
+    index: int
+    op: BatchOperationType
+    success: bool
+    id: Optional[UUID] = None
+    item: Optional[ExpenseResponse] = None
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Batch mutation results, in request order."""
+    results: List[BatchOperationResult]
+    applied: int
+    failed: int
@@ -0,0 +1,209 @@
+# AI Result Cache
+# Reuses Gemini results while the prompt inputs are unchanged
+
+import time
+import json
+import asyncio
+import hashlib
+import logging
+from uuid import UUID
+from typing import Awaitable, Callable, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.ai_result import AIResult
+from app.services.cache_service import MemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+ResultT = TypeVar("ResultT", bound=BaseModel)
+
+
+class AIResultCache:
+    """
+    Two-level cache of AI results: process memory in front of the database.
+    
+    Entries are keyed by (user, endpoint, hash of the prompt), so any change
+    to the data that goes into the prompt is a miss. Within `ttl` a hit is
+    served as-is; up to `stale_ttl` after that it is still served at once
+    while one background call refreshes it (stale-while-revalidate). Only
+    real model output is cached; local fallbacks are cheap and should not
+    hide the model once it is available again.
+    """
+    
+    def __init__(self, ttl: float, stale_ttl: float, memory: Optional[MemoryCacheBackend]):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory = memory
+        self._refreshing: set = set()
+        self._tasks: set = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def input_hash(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode()).hexdigest()
+    
+    async def get_or_generate(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        endpoint: str,
+        prompt: str,
+        result_type: Type[ResultT],
+        generate: Callable[[], Awaitable[Optional[ResultT]]],
+    ) -> Optional[ResultT]:
+        """
+        Cached result for this prompt, or generate() and store it.
+        
+        Returns:
+            The result, or None if generate() produced none (model failed)
+        """
+        if not self.ttl:
+            return await generate()
+        
+        digest = self.input_hash(prompt)
+        cached = await self._get(db, user_id, endpoint, digest)
+        if cached is not None:
+            payload, age = cached
+            if age < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh_later(user_id, endpoint, digest, generate)
+            return result_type.model_validate_json(payload)
+        
+        self.misses += 1
+        result = await generate()
+        if result is not None:
+            await self._put(db, user_id, endpoint, digest, result.model_dump_json())
+        return result
+    
+    async def _get(self, db: AsyncSession, user_id: UUID, endpoint: str, digest: str) -> Optional[Tuple[str, float]]:
+        key = f"{user_id.hex}:{endpoint}:{digest}"
+        if self.memory is not None:
+            entry = await self.memory.get(key)
+            if entry is not None:
+                created_at, payload = json.loads(entry)
+                return payload, time.time() - created_at
+        
+        result = await db.execute(
+            select(AIResult.payload, AIResult.created_at).where(
+                AIResult.user_id == user_id,
+                AIResult.endpoint == endpoint,
+                AIResult.input_hash == digest,
+            )
+        )
+        row = result.first()
+        if row is None:
+            return None
+        age = time.time() - row.created_at
+        if age >= self.ttl + self.stale_ttl:
+            return None
+        await self._remember(key, row.created_at, row.payload)
+        return row.payload, age
+    
+    async def _put(self, db: AsyncSession, user_id: UUID, endpoint: str, digest: str, payload: str) -> None:
+        """
+        Store a result, replacing the endpoint's previous row in one statement.
+        
+        Two workers (or a background refresh racing a request) can store the
+        same endpoint at once, so this is an upsert rather than get-then-add.
+        A failed write only costs a future cache miss, so it is logged and
+        the result is still returned to the caller.
+        """
+        now = int(time.time())
+        values = dict(user_id=user_id, endpoint=endpoint, input_hash=digest, payload=payload, created_at=now)
+        try:
+            await self._upsert(db, values)
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.warning(f"Storing {endpoint} AI result failed: {str(e)[:100]}")
+            return
+        await self._remember(f"{user_id.hex}:{endpoint}:{digest}", now, payload)
+    
+    async def _upsert(self, db: AsyncSession, values: dict) -> None:
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            await self._upsert_generic(db, values)
+            return
+        
+        stmt = dialect_insert(AIResult).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "endpoint"],
+            set_={
+                "input_hash": stmt.excluded.input_hash,
+                "payload": stmt.excluded.payload,
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        await db.execute(stmt)
+    
+    async def _upsert_generic(self, db: AsyncSession, values: dict) -> None:
+        """Read-modify-write fallback for dialects without ON CONFLICT."""
+        row = await db.get(AIResult, (values["user_id"], values["endpoint"]))
+        if row is None:
+            db.add(AIResult(**values))
+        else:
+            row.input_hash, row.payload, row.created_at = values["input_hash"], values["payload"], values["created_at"]
+        await db.flush()
+    
+    async def _remember(self, key: str, created_at: int, payload: str) -> None:
+        if self.memory is None:
+            return
+        remaining = created_at + self.ttl + self.stale_ttl - time.time()
+        if remaining > 0:
+            await self.memory.set(key, json.dumps([created_at, payload]).encode(), remaining)
+    
+    def _refresh_later(self, user_id: UUID, endpoint: str, digest: str, generate) -> None:
+        """Regenerate a stale entry in the background (once per key at a time)."""
+        key = (user_id, endpoint, digest)
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        
+        async def refresh():
+            try:
+                result = await generate()
+                if result is not None:
+                    async with async_session_maker() as db:
+                        await self._put(db, user_id, endpoint, digest, result.model_dump_json())
+            except Exception as e:
+                logger.warning(f"Background refresh of {endpoint} failed: {str(e)[:100]}")
+            finally:
+                self._refreshing.discard(key)
+        
+        task = asyncio.create_task(refresh())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+        }
+
+
+# Singleton instance
+_ai_cache: Optional[AIResultCache] = None
+
+
+def get_ai_cache() -> AIResultCache:
+    """Get or create the process-wide AI result cache from settings."""
+    global _ai_cache
+    if _ai_cache is None:
+        memory = MemoryCacheBackend(1000, 8 * 1024 * 1024) if settings.ai_cache_ttl_seconds else None
+        _ai_cache = AIResultCache(settings.ai_cache_ttl_seconds, settings.ai_cache_stale_seconds, memory)
+    return _ai_cache
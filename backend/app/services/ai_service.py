@@ -3,19 +3,25 @@
 
 import uuid
 import json
+import time
+import asyncio
+import logging
 from datetime import datetime, date
 from decimal import Decimal
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
 from app.services.gemini_client import get_gemini_client, GeminiStatus
+from app.services.ai_cache import AIResultCache, get_ai_cache
 
 from app.config import settings
+from app.database import async_session_maker
 from app.models.chat import ChatMessage, ChatRole
 from app.models.user import User
 from app.services.expense_service import ExpenseService
 from app.services.budget_service import BudgetService
+from app.services.category_registry import category_registry
 from app.schemas.ai import (
     ChatRequest,
     ChatResponse,
@@ -27,6 +33,7 @@ from app.schemas.ai import (
     AIInsight,
     InsightType,
 )
+from app.utils.singleflight import SingleFlight
 from app.utils.prompts import (
     SYSTEM_PROMPT,
     CHAT_PROMPT_TEMPLATE,
@@ -36,6 +43,20 @@ from app.utils.prompts import (
     format_history_for_prediction,
 )
 
+logger = logging.getLogger(__name__)
+
+# Saves started after a stream was cancelled (kept referenced until done)
+_background_tasks: set = set()
+
+# Shared in-flight insight/prediction generations, keyed by (user, endpoint, prompt hash)
+ai_flights = SingleFlight()
+
+
+def _sse(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 
 class AIService:
     """Gemini AI integration service."""
@@ -52,7 +73,115 @@ class AIService:
     ) -> ChatResponse:
         """Process a chat message and return AI response."""
         conversation_id = request.conversation_id or uuid.uuid4()
+        full_prompt, summary_dict = await self._build_chat_prompt(user, request.message)
+        
+        if self.gemini.is_configured:
+            result = await self.gemini.generate(full_prompt)
+            if result.success:
+                ai_response = result.content
+            else:
+                # Use fallback on API failure
+                ai_response = self._generate_mock_response(request.message, summary_dict)
+        else:
+            # Fallback when no API key
+            ai_response = self._generate_mock_response(request.message, summary_dict)
+        
+        ai_message = await self._save_exchange(
+            self.db, user.id, conversation_id, request.message, ai_response
+        )
         
+        return ChatResponse(
+            message=ChatMessageResponse(
+                id=ai_message.id,
+                role=ChatRole.ASSISTANT,
+                content=ai_response,
+                timestamp=ai_message.created_at,
+            ),
+            conversation_id=conversation_id,
+        )
+    
+    async def chat_stream(self, user: User, request: ChatRequest) -> AsyncIterator[str]:
+        """
+        Process a chat message, streaming the AI response as Server-Sent Events.
+        
+        The spending context is read here, before the response starts, so
+        errors still surface as normal HTTP errors. The returned generator
+        emits `start` (conversation id), unnamed events with text deltas,
+        then `done` with the saved message, or `error` if the model fails
+        mid-answer. It saves the exchange with its own session, since it
+        outlives the request's; on client disconnect the partial answer is
+        saved instead.
+        """
+        started = time.perf_counter()
+        conversation_id = request.conversation_id or uuid.uuid4()
+        full_prompt, summary_dict = await self._build_chat_prompt(user, request.message)
+        fallback = self._generate_mock_response(request.message, summary_dict)
+        return self._stream_reply(
+            user.id, conversation_id, request.message, full_prompt, fallback, started
+        )
+    
+    async def _stream_reply(
+        self,
+        user_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+        message: str,
+        prompt: str,
+        fallback: str,
+        started: float,
+    ) -> AsyncIterator[str]:
+        parts: List[str] = []
+        first_token: Optional[float] = None
+        outcome = "completed"
+        
+        yield _sse({"conversation_id": str(conversation_id)}, event="start")
+        try:
+            try:
+                async for text in self.gemini.generate_stream(prompt):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    parts.append(text)
+                    yield _sse({"delta": text})
+            except Exception as e:
+                if not parts:
+                    raise
+                outcome = "failed"
+                logger.error(f"Chat stream {conversation_id} failed mid-answer: {str(e)[:100]}")
+                yield _sse({"detail": "The response was interrupted. Please try again."}, event="error")
+                return
+            
+            if not parts:
+                # Model unavailable: send the local fallback as one delta
+                first_token = time.perf_counter()
+                parts.append(fallback)
+                yield _sse({"delta": fallback})
+            
+            ai_message = await self._save_in_new_session(user_id, conversation_id, message, "".join(parts))
+            yield _sse(ChatMessageResponse(
+                id=ai_message.id,
+                role=ChatRole.ASSISTANT,
+                content=ai_message.content,
+                timestamp=ai_message.created_at,
+            ).model_dump(mode="json"), event="done")
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away: keep what it saw so the conversation stays coherent
+            # (in a separate task: this one is being cancelled)
+            outcome = "disconnected"
+            if parts:
+                task = asyncio.create_task(
+                    self._save_in_new_session(user_id, conversation_id, message, "".join(parts))
+                )
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+            raise
+        finally:
+            ttfb = f"{(first_token - started) * 1000:.0f} ms" if first_token else "n/a"
+            logger.info(
+                f"Chat stream {conversation_id} {outcome}: first token {ttfb}, "
+                f"total {(time.perf_counter() - started) * 1000:.0f} ms, {sum(map(len, parts))} chars"
+            )
+    
+    async def _build_chat_prompt(self, user: User, message: str) -> Tuple[str, dict]:
+        """Prompt with the user's recent spending context, plus the summary used for fallbacks."""
         # Get user's spending context
         expense_service = ExpenseService(self.db)
         today = date.today()
@@ -65,7 +194,7 @@ class AIService:
         expense_dicts = [
             {
                 "date": str(e.date),
-                "description": e.description or e.category.name,
+                "description": e.description or category_registry.get(e.category_id).name,
                 "amount": float(e.amount),
                 "type": e.type.value,
             }
@@ -91,50 +220,44 @@ class AIService:
         # Build context
         context = format_spending_context(expense_dicts, summary_dict)
         
-        # Generate AI response using production-ready client
         full_prompt = SYSTEM_PROMPT.format(context=context)
-        full_prompt += "\n\n" + CHAT_PROMPT_TEMPLATE.format(message=request.message)
-        
-        if self.gemini.is_configured:
-            result = await self.gemini.generate(full_prompt)
-            if result.success:
-                ai_response = result.content
-            else:
-                # Use fallback on API failure
-                ai_response = self._generate_mock_response(request.message, summary_dict)
-        else:
-            # Fallback when no API key
-            ai_response = self._generate_mock_response(request.message, summary_dict)
-        
+        full_prompt += "\n\n" + CHAT_PROMPT_TEMPLATE.format(message=message)
+        return full_prompt, summary_dict
+    
+    async def _save_exchange(
+        self,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        conversation_id: uuid.UUID,
+        message: str,
+        ai_response: str,
+    ) -> ChatMessage:
+        """Store the user's message and the AI response; returns the latter."""
         # Save user message
         user_message = ChatMessage(
-            user_id=user.id,
+            user_id=user_id,
             conversation_id=conversation_id,
             role=ChatRole.USER,
-            content=request.message,
+            content=message,
         )
-        self.db.add(user_message)
+        db.add(user_message)
         
         # Save AI response
         ai_message = ChatMessage(
-            user_id=user.id,
+            user_id=user_id,
             conversation_id=conversation_id,
             role=ChatRole.ASSISTANT,
             content=ai_response,
         )
-        self.db.add(ai_message)
-        await self.db.commit()
-        await self.db.refresh(ai_message)
-        
-        return ChatResponse(
-            message=ChatMessageResponse(
-                id=ai_message.id,
-                role=ChatRole.ASSISTANT,
-                content=ai_response,
-                timestamp=ai_message.created_at,
-            ),
-            conversation_id=conversation_id,
-        )
+        db.add(ai_message)
+        await db.commit()
+        await db.refresh(ai_message)
+        return ai_message
+    
+    async def _save_in_new_session(self, *args) -> ChatMessage:
+        """_save_exchange() with a session of its own (for streams)."""
+        async with async_session_maker() as db:
+            return await self._save_exchange(db, *args)
     
     async def get_chat_history(
         self,
@@ -171,14 +294,13 @@ class AIService:
         """Get AI-powered spending prediction for next month."""
         expense_service = ExpenseService(self.db)
         
-        # Get historical data
-        monthly_data = await expense_service.get_monthly_data(user.id, months=3)
-        
-        # Get current month progress
+        # Historical data and current month progress from one rollup query
         today = date.today()
-        current_summary = await expense_service.get_summary(
-            user.id, today.year, today.month
+        history = await expense_service.get_monthly_summaries(
+            user.id, today.year, today.month, months=settings.prediction_history_months
         )
+        monthly_data = [ExpenseService.monthly_data_entry(*month) for month in history]
+        current_summary = history[0][2]
         
         current_month_data = {
             "day_of_month": today.day,
@@ -195,16 +317,26 @@ class AIService:
             history_str = format_history_for_prediction(monthly_data)
             prompt = PREDICTION_PROMPT.format(
                 spending_history=history_str,
+                history_months=len(monthly_data),
                 current_month=json.dumps(current_month_data, indent=2),
             )
             
-            result = await self.gemini.generate(prompt)
-            if result.success:
-                try:
-                    prediction_data = self._parse_json_response(result.content)
-                    return self._build_prediction_response(prediction_data, monthly_data)
-                except Exception:
-                    pass
+            async def generate() -> Optional[PredictionResponse]:
+                result = await self.gemini.generate(prompt)
+                if result.success:
+                    try:
+                        prediction_data = self._parse_json_response(result.content)
+                        return self._build_prediction_response(prediction_data, monthly_data)
+                    except Exception:
+                        pass
+                return None
+            
+            # Unchanged history and month-to-date totals reuse the last result
+            prediction = await self._cached_generation(
+                user.id, "predict", prompt, PredictionResponse, generate
+            )
+            if prediction is not None:
+                return prediction
         
         # Fallback prediction based on averages
         return self._generate_fallback_prediction(monthly_data, current_summary)
@@ -243,29 +375,53 @@ class AIService:
                 budget_status=json.dumps(budget_status, indent=2) if budget_status else "No budget set",
             )
             
-            result = await self.gemini.generate(prompt)
-            if result.success:
-                try:
-                    insights_data = self._parse_json_response(result.content)
-                    if isinstance(insights_data, list):
-                        return InsightsResponse(
-                            insights=[
-                                AIInsight(
-                                    type=InsightType(i.get("type", "tip")),
-                                    title=i.get("title", "Insight"),
-                                    description=i.get("description", ""),
-                                    icon=i.get("icon", "lightbulb-on"),
-                                )
-                                for i in insights_data[:3]
-                            ],
-                            generated_at=datetime.now(),
-                        )
-                except Exception:
-                    pass
+            async def generate() -> Optional[InsightsResponse]:
+                result = await self.gemini.generate(prompt)
+                if result.success:
+                    try:
+                        insights_data = self._parse_json_response(result.content)
+                        if isinstance(insights_data, list):
+                            return InsightsResponse(
+                                insights=[
+                                    AIInsight(
+                                        type=InsightType(i.get("type", "tip")),
+                                        title=i.get("title", "Insight"),
+                                        description=i.get("description", ""),
+                                        icon=i.get("icon", "lightbulb-on"),
+                                    )
+                                    for i in insights_data[:3]
+                                ],
+                                generated_at=datetime.now(),
+                            )
+                    except Exception:
+                        pass
+                return None
+            
+            # Unchanged spending and budget figures reuse the last result
+            insights = await self._cached_generation(
+                user.id, "insights", prompt, InsightsResponse, generate
+            )
+            if insights is not None:
+                return insights
         
         # Fallback insights
         return self._generate_fallback_insights(summary, budget)
     
+    async def _cached_generation(self, user_id: uuid.UUID, endpoint: str, prompt: str, result_type, generate):
+        """
+        AI result from the result cache, generating it at most once at a time.
+        
+        Concurrent identical requests (several screens mounting, double
+        taps) share one cache lookup and model call. The shared call uses
+        its own session, as it can outlive the request that started it.
+        """
+        async def run():
+            async with async_session_maker() as db:
+                return await get_ai_cache().get_or_generate(db, user_id, endpoint, prompt, result_type, generate)
+        
+        key = (user_id, endpoint, AIResultCache.input_hash(prompt))
+        return await ai_flights.do(key, run)
+    
     def _generate_mock_response(self, message: str, summary: dict) -> str:
         """Generate mock response when no API key."""
         lower = message.lower()
@@ -284,11 +440,12 @@ class AIService:
     
     def _parse_json_response(self, text: str) -> dict:
         """Extract JSON from AI response."""
-        # Try to find JSON in the response
+        # Try to find JSON in the response (an object, or a list of them)
         start = text.find("{")
         end = text.rfind("}") + 1
-        if start == -1:
-            start = text.find("[")
+        list_start = text.find("[")
+        if list_start != -1 and (start == -1 or list_start < start):
+            start = list_start
             end = text.rfind("]") + 1
         
         if start != -1 and end > start:
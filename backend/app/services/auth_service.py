@@ -2,15 +2,16 @@
 # Business logic for user authentication
 
 from uuid import UUID
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException, status
 
 from app.models.user import User
-from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse
+from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse, TokenData
+from app.utils.password_pool import get_password_pool
+from app.utils.revocation import revocation_store
 from app.utils.security import (
-    hash_password,
-    verify_password,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -38,7 +39,7 @@ class AuthService:
         # Create user
         user = User(
             email=data.email,
-            password_hash=hash_password(data.password),
+            password_hash=await get_password_pool().hash(data.password),
             name=data.name,
         )
         self.db.add(user)
@@ -62,7 +63,7 @@ class AuthService:
         )
         user = result.scalar_one_or_none()
         
-        if not user or not verify_password(data.password, user.password_hash):
+        if not user or not await get_password_pool().verify(data.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
@@ -99,6 +100,17 @@ class AuthService:
                 detail="Invalid refresh token",
             )
         
+        # Rotate: the presented refresh token can be spent only once
+        if token_data.jti is not None:
+            if not await revocation_store.revoke(
+                self.db, token_data.jti, user.id, token_data.expires_at
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid refresh token",
+                )
+            await self.db.commit()
+        
         # Generate new tokens
         access_token = create_access_token(user.id, user.email)
         new_refresh_token = create_refresh_token(user.id, user.email)
@@ -107,3 +119,49 @@ class AuthService:
             access_token=access_token,
             refresh_token=new_refresh_token,
         )
+    
+    async def logout(
+        self,
+        access_token: Optional[str] = None,
+        refresh_token: Optional[str] = None,
+    ) -> None:
+        """
+        Revoke the access token and/or refresh token presented.
+        
+        Either one is enough, so a client whose access token has already
+        expired can still end its session with the refresh token alone.
+        When both are sent, the refresh token is only revoked if it belongs
+        to the same user.
+        """
+        access_data = self._decode_or_none(access_token, "access")
+        refresh_data = self._decode_or_none(refresh_token, "refresh")
+        
+        if refresh_data is not None:
+            if access_data is not None:
+                same_user = refresh_data.user_id == access_data.user_id
+            else:
+                same_user = await self.db.get(User, refresh_data.user_id) is not None
+            if not same_user or refresh_data.jti is None:
+                refresh_data = None
+        
+        tokens = [t for t in (access_data, refresh_data) if t is not None and t.jti is not None]
+        if access_data is None and not tokens:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        for token in tokens:
+            await revocation_store.revoke(self.db, token.jti, token.user_id, token.expires_at)
+        await self.db.commit()
+    
+    @staticmethod
+    def _decode_or_none(token: Optional[str], token_type: str) -> Optional[TokenData]:
+        """Decoded token, or None if absent, expired or already revoked."""
+        if not token:
+            return None
+        try:
+            return decode_token(token, token_type)
+        except HTTPException:
+            return None
@@ -6,12 +6,14 @@ from datetime import date
 from decimal import Decimal
 from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
 from app.models.budget import Budget, BudgetCategory
-from app.models.expense import Expense, TransactionType
-from app.models.category import Category
+from app.models.expense import ExpenseMonthlyRollup, TransactionType
+from app.services.category_registry import category_registry
+from app.services.version_service import DataVersionService
+from app.services.cache_service import get_response_cache
 from app.schemas.budget import (
     BudgetCreate,
     BudgetResponse,
@@ -24,13 +26,14 @@ class BudgetService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.versions = DataVersionService(db)
     
     async def create_or_update(self, user_id: UUID, data: BudgetCreate) -> Budget:
         """Create or update a budget for a specific month."""
         # Check if budget exists for this month
         result = await self.db.execute(
             select(Budget)
-            .options(selectinload(Budget.category_limits).selectinload(BudgetCategory.category))
+            .options(selectinload(Budget.category_limits))
             .where(
                 and_(
                     Budget.user_id == user_id,
@@ -70,6 +73,7 @@ class BudgetService:
             )
             self.db.add(budget_category)
         
+        await self.versions.bump(user_id)
         await self.db.commit()
         await self.db.refresh(budget, ["category_limits"])
         
@@ -86,14 +90,27 @@ class BudgetService:
         year: int,
         month: int,
     ) -> Optional[BudgetResponse]:
-        """Get budget for a specific month with spent amounts."""
+        """Get budget for a specific month with spent amounts (cached)."""
+        return await get_response_cache().get_or_compute(
+            user_id,
+            "budget",
+            {"year": year, "month": month},
+            await self.versions.get(user_id),
+            Optional[BudgetResponse],
+            lambda: self._build_for_month(user_id, year, month),
+        )
+    
+    async def _build_for_month(
+        self,
+        user_id: UUID,
+        year: int,
+        month: int,
+    ) -> Optional[BudgetResponse]:
+        """Load a month's budget and spent amounts from the database."""
         # Get budget
         result = await self.db.execute(
             select(Budget)
-            .options(
-                selectinload(Budget.category_limits)
-                .selectinload(BudgetCategory.category)
-            )
+            .options(selectinload(Budget.category_limits))
             .where(
                 and_(
                     Budget.user_id == user_id,
@@ -107,21 +124,22 @@ class BudgetService:
         if not budget:
             return None
         
-        # Get spent amounts by category
+        await category_registry.ensure_loaded(self.db)
+        
+        # Get spent amounts by category (from monthly rollups)
         spent_query = (
             select(
-                Expense.category_id,
-                func.sum(Expense.amount).label("spent"),
+                ExpenseMonthlyRollup.category_id,
+                ExpenseMonthlyRollup.total.label("spent"),
             )
             .where(
                 and_(
-                    Expense.user_id == user_id,
-                    Expense.type == TransactionType.EXPENSE,
-                    extract("year", Expense.date) == year,
-                    extract("month", Expense.date) == month,
+                    ExpenseMonthlyRollup.user_id == user_id,
+                    ExpenseMonthlyRollup.type == TransactionType.EXPENSE,
+                    ExpenseMonthlyRollup.year == year,
+                    ExpenseMonthlyRollup.month == month,
                 )
             )
-            .group_by(Expense.category_id)
         )
         
         spent_result = await self.db.execute(spent_query)
@@ -136,12 +154,13 @@ class BudgetService:
             spent = spent_by_category.get(cat_limit.category_id, Decimal("0"))
             remaining = cat_limit.limit_amount - spent
             pct = float(spent / cat_limit.limit_amount * 100) if cat_limit.limit_amount > 0 else 0
+            category = category_registry.get(cat_limit.category_id)
             
             category_responses.append(BudgetCategoryResponse(
                 category_id=cat_limit.category_id,
-                category_name=cat_limit.category.name,
-                category_icon=cat_limit.category.icon,
-                category_color=cat_limit.category.color,
+                category_name=category.name,
+                category_icon=category.icon,
+                category_color=category.color,
                 limit_amount=cat_limit.limit_amount,
                 spent_amount=spent,
                 remaining=remaining,
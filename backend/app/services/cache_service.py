@@ -0,0 +1,197 @@
+# Response Cache
+# Read-through cache for per-user aggregates, keyed by data version
+
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from uuid import UUID
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.utils.resp import RespClient, RespError
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU with per-entry TTL and an entry/byte cap.
+    
+    Entries are tagged with their user so a write can drop that user's
+    entries at once instead of waiting for them to age out.
+    """
+    
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value, tag)
+        self._tags: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self.evictions = 0
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    async def set(self, key: str, value: bytes, ttl: float, tag: Optional[str] = None) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tag)
+        self._bytes += size
+        if tag:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+    
+    async def invalidate(self, tag: str) -> None:
+        for key in list(self._tags.get(tag, ())):
+            self._remove(key)
+    
+    def _remove(self, key: str) -> None:
+        _, value, tag = self._entries.pop(key)
+        self._bytes -= len(key) + len(value)
+        if tag and tag in self._tags:
+            self._tags[tag].discard(key)
+            if not self._tags[tag]:
+                del self._tags[tag]
+    
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class RedisCacheBackend:
+    """
+    Shared cache on a Redis-protocol server (SET ... PX for TTL).
+    
+    Eviction is left to the server's maxmemory policy. Stale entries need
+    no explicit delete: keys embed the data version, so after a write they
+    are simply never requested again and expire. Connection errors are
+    logged and treated as misses.
+    """
+    
+    def __init__(self, client: RespClient, prefix: str = "spendx:cache:"):
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.client.execute("GET", self.prefix + key)
+        except RespError as e:
+            self._failed("GET", e)
+            return None
+    
+    async def set(self, key: str, value: bytes, ttl: float, tag: Optional[str] = None) -> None:
+        try:
+            await self.client.execute("SET", self.prefix + key, value, "PX", int(ttl * 1000))
+        except RespError as e:
+            self._failed("SET", e)
+    
+    async def invalidate(self, tag: str) -> None:
+        pass
+    
+    def _failed(self, command: str, error: RespError) -> None:
+        self.errors += 1
+        logger.warning(f"Response cache {command} failed: {error}")
+    
+    def stats(self) -> dict:
+        return {"errors": self.errors}
+
+
+class ResponseCache:
+    """
+    Read-through cache for pure functions of a user's data.
+    
+    Keys combine (user, endpoint, params, data version). Every write bumps
+    the version (see DataVersionService), so a hit can never be stale;
+    writes also drop the user's in-process entries to free memory early.
+    Values are stored as JSON and revalidated into the result type.
+    """
+    
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._adapters: Dict[Any, TypeAdapter] = {}
+    
+    @staticmethod
+    def make_key(user_id: UUID, endpoint: str, params: dict, version: int) -> str:
+        """Cache key for one call; params are order-independent."""
+        encoded = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        digest = hashlib.blake2b(encoded.encode(), digest_size=8).hexdigest()
+        return f"{user_id.hex}:{version}:{endpoint}:{digest}"
+    
+    async def get_or_compute(
+        self,
+        user_id: UUID,
+        endpoint: str,
+        params: dict,
+        version: int,
+        result_type: Any,
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached result, or compute, store and return it."""
+        if self.backend is None:
+            return await compute()
+        
+        adapter = self._adapters.get(result_type)
+        if adapter is None:
+            adapter = self._adapters[result_type] = TypeAdapter(result_type)
+        
+        key = self.make_key(user_id, endpoint, params, version)
+        cached = await self.backend.get(key)
+        if cached is not None:
+            self.hits += 1
+            return adapter.validate_json(cached)
+        
+        self.misses += 1
+        result = await compute()
+        await self.backend.set(key, adapter.dump_json(result), self.ttl, tag=user_id.hex)
+        return result
+    
+    async def invalidate_user(self, user_id: UUID) -> None:
+        """Drop a user's entries (called when their data version is bumped)."""
+        if self.backend is not None:
+            await self.backend.invalidate(user_id.hex)
+    
+    def stats(self) -> dict:
+        """Hit/miss counters plus backend-specific figures."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.cache_backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            **(self.backend.stats() if self.backend is not None else {}),
+        }
+
+
+# Singleton instance
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the process-wide response cache from settings."""
+    global _cache
+    if _cache is None:
+        if settings.cache_backend == "redis":
+            backend = RedisCacheBackend(RespClient(settings.cache_redis_url))
+        elif settings.cache_backend == "memory":
+            backend = MemoryCacheBackend(settings.cache_max_entries, settings.cache_max_mb * 1024 * 1024)
+        else:
+            backend = None
+        _cache = ResponseCache(backend, settings.cache_ttl_seconds)
+    return _cache
@@ -0,0 +1,83 @@
+# Category Registry
+# Process-wide in-memory copy of the categories table
+
+import json
+import hashlib
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, event
+
+from app.models.category import Category
+from app.schemas.expense import CategoryResponse
+
+
+class CategoryRegistry:
+    """
+    Resolves category ids to name/icon/color without a database round trip.
+    
+    Categories are seeded once and almost never change, so the whole table
+    is loaded at startup (or on first use, e.g. from the CLI). ORM writes
+    to Category in this process invalidate it and the next ensure_loaded()
+    reloads; readers keep seeing the previous snapshot until then.
+    """
+    
+    def __init__(self):
+        self._by_id: Dict[int, CategoryResponse] = {}
+        self._by_name: Dict[str, int] = {}
+        self._etag: Optional[str] = None
+        self._loaded = False
+    
+    async def load(self, db: AsyncSession) -> None:
+        """(Re)load every category from the database."""
+        result = await db.execute(
+            select(Category.id, Category.name, Category.icon, Category.color).order_by(Category.id)
+        )
+        by_id = {
+            row.id: CategoryResponse(id=row.id, name=row.name, icon=row.icon, color=row.color)
+            for row in result
+        }
+        payload = json.dumps([c.model_dump() for c in by_id.values()], sort_keys=True)
+        
+        self._by_id = by_id
+        self._by_name = {c.name.lower(): c.id for c in by_id.values()}
+        self._etag = f'"{hashlib.sha256(payload.encode()).hexdigest()[:16]}"'
+        self._loaded = True
+    
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """Load the registry if it has not been loaded or was invalidated."""
+        if not self._loaded:
+            await self.load(db)
+    
+    def invalidate(self) -> None:
+        """Mark the registry stale (call after Core-level category writes)."""
+        self._loaded = False
+    
+    def get(self, category_id: int) -> Optional[CategoryResponse]:
+        """Category by id, or None if unknown."""
+        return self._by_id.get(category_id)
+    
+    def id_for_name(self, name: str) -> Optional[int]:
+        """Category id by case-insensitive name, or None if unknown."""
+        return self._by_name.get(name.lower())
+    
+    def all(self) -> List[CategoryResponse]:
+        """All categories ordered by id."""
+        return list(self._by_id.values())
+    
+    @property
+    def etag(self) -> Optional[str]:
+        """Strong validator for the current category list."""
+        return self._etag
+    
+    def __contains__(self, category_id: int) -> bool:
+        return category_id in self._by_id
+
+
+category_registry = CategoryRegistry()
+
+
+@event.listens_for(Category, "after_insert")
+@event.listens_for(Category, "after_update")
+@event.listens_for(Category, "after_delete")
+def _invalidate_on_write(mapper, connection, target) -> None:
+    category_registry.invalidate()
@@ -1,16 +1,23 @@
 # Expense Service
 # Business logic for transactions (expenses and income)
 
-from uuid import UUID
+import json
+import base64
+from uuid import UUID, uuid4
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, extract
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, select, insert, update, delete, func, and_, tuple_, literal, type_coerce, Date, String
+from pydantic import ValidationError
 
-from app.models.expense import Expense, TransactionType
-from app.models.category import Category
+from app.models.expense import Expense, ExpenseMonthlyRollup, TransactionType
+from app.services.rollup_service import RollupService, RollupDeltas
+from app.services.search_service import SearchIndex
+from app.services.category_registry import category_registry
+from app.services.version_service import DataVersionService
+from app.services.cache_service import get_response_cache
+from app.utils.periods import Period, add_months, date_range_filters
 from app.schemas.expense import (
     ExpenseCreate,
     ExpenseUpdate,
@@ -18,18 +25,63 @@ from app.schemas.expense import (
     ExpenseListResponse,
     ExpenseSummary,
     CategoryBreakdown,
+    DailySummary,
     CategoryResponse,
+    BatchRequest,
+    BatchResponse,
+    BatchOperationType,
+    BatchOperationResult,
 )
 
 
+# Longest history served by get_monthly_summaries (36 months = 3 years)
+MAX_HISTORY_MONTHS = 36
+
+# Columns behind ExpenseResponse, selected as plain rows by the list paths
+_LIST_COLUMNS = (
+    Expense.id,
+    Expense.amount,
+    Expense.type,
+    Expense.description,
+    Expense.date,
+    Expense.category_id,
+    Expense.is_auto_detected,
+    Expense.created_at,
+)
+
+# Columns loaded for rows touched by a batch, and the ones it may write
+_BATCH_COLUMNS = (
+    Expense.id,
+    Expense.category_id,
+    Expense.amount,
+    Expense.type,
+    Expense.description,
+    Expense.date,
+    Expense.is_auto_detected,
+    Expense.created_at,
+)
+_BATCH_WRITABLE = ("category_id", "amount", "type", "description", "date")
+
+
 class ExpenseService:
     """Expense/transaction business logic."""
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.rollups = RollupService(db)
+        self.search_index = SearchIndex(db)
+        self.versions = DataVersionService(db)
     
     async def create(self, user_id: UUID, data: ExpenseCreate) -> Expense:
-        """Create a new expense/income transaction."""
+        """
+        Create a new expense/income transaction.
+        
+        Raises:
+            ValueError: If the category does not exist
+        """
+        await category_registry.ensure_loaded(self.db)
+        self._check_category(data.category_id)
+        
         expense = Expense(
             user_id=user_id,
             category_id=data.category_id,
@@ -39,15 +91,18 @@ class ExpenseService:
             date=data.date,
         )
         self.db.add(expense)
+        await self.db.flush()
+        await self.search_index.add([expense.id])
+        await self.rollups.apply(RollupDeltas().add_expense(expense))
+        await self.versions.bump(user_id)
         await self.db.commit()
-        await self.db.refresh(expense, ["category"])
         return expense
     
     async def get_by_id(self, expense_id: UUID, user_id: UUID) -> Optional[Expense]:
         """Get expense by ID for a specific user."""
+        await category_registry.ensure_loaded(self.db)
         result = await self.db.execute(
             select(Expense)
-            .options(selectinload(Expense.category))
             .where(
                 and_(
                     Expense.id == expense_id,
@@ -57,6 +112,35 @@ class ExpenseService:
         )
         return result.scalar_one_or_none()
     
+    def _filters(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+    ) -> list:
+        """Build WHERE conditions shared by list, cursor and count queries."""
+        filters = [Expense.user_id == user_id]
+        filters.extend(date_range_filters(Expense.date, start_date, end_date))
+        if category_id:
+            filters.append(Expense.category_id == category_id)
+        if transaction_type:
+            filters.append(Expense.type == TransactionType(transaction_type))
+        return filters
+    
+    async def count(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+    ) -> int:
+        """Count transactions matching the list filters."""
+        filters = self._filters(user_id, start_date, end_date, category_id, transaction_type)
+        return (await self.db.execute(select(func.count(Expense.id)).where(*filters))).scalar() or 0
+    
     async def list(
         self,
         user_id: UUID,
@@ -66,40 +150,159 @@ class ExpenseService:
         end_date: Optional[date] = None,
         category_id: Optional[int] = None,
         transaction_type: Optional[str] = None,
-    ) -> Tuple[List[Expense], int]:
-        """List expenses with filters and pagination."""
-        query = (
-            select(Expense)
-            .options(selectinload(Expense.category))
-            .where(Expense.user_id == user_id)
-        )
+    ) -> Tuple[List[Row], int]:
+        """
+        List expenses with filters and offset pagination.
         
-        # Apply filters
-        if start_date:
-            query = query.where(Expense.date >= start_date)
-        if end_date:
-            query = query.where(Expense.date <= end_date)
-        if category_id:
-            query = query.where(Expense.category_id == category_id)
-        if transaction_type:
-            query = query.where(Expense.type == TransactionType(transaction_type))
+        Returns plain rows of the ExpenseResponse columns rather than ORM
+        objects, skipping identity-map and relationship overhead.
+        """
+        await category_registry.ensure_loaded(self.db)
+        filters = self._filters(user_id, start_date, end_date, category_id, transaction_type)
         
         # Count total
-        count_query = select(func.count()).select_from(query.subquery())
-        total = (await self.db.execute(count_query)).scalar() or 0
+        total = (await self.db.execute(select(func.count(Expense.id)).where(*filters))).scalar() or 0
         
         # Apply pagination and ordering
         query = (
-            query
-            .order_by(Expense.date.desc(), Expense.created_at.desc())
+            select(*_LIST_COLUMNS)
+            .where(*filters)
+            .order_by(Expense.date.desc(), Expense.created_at.desc(), Expense.id.desc())
             .offset((page - 1) * per_page)
             .limit(per_page)
         )
         
         result = await self.db.execute(query)
-        expenses = list(result.scalars().all())
+        return list(result.all()), total
+    
+    async def list_after(
+        self,
+        user_id: UUID,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """
+        List expenses with keyset (cursor) pagination.
         
-        return expenses, total
+        Pages are ordered by (date, created_at, id) descending and resume
+        strictly after the row encoded in `cursor`, so every page is an
+        index range scan of `per_page` rows regardless of depth.
+        
+        Returns:
+            Tuple of (rows like list(), next_cursor); next_cursor is None on the last page
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        await category_registry.ensure_loaded(self.db)
+        created_key = self._created_at_key()
+        query = (
+            select(*_LIST_COLUMNS, created_key.label("created_key"))
+            .where(*self._filters(user_id, start_date, end_date, category_id, transaction_type))
+        )
+        
+        if cursor:
+            last_date, last_created, last_id = self._decode_cursor(cursor)
+            query = query.where(
+                tuple_(Expense.date, created_key, Expense.id)
+                < tuple_(literal(last_date, Date), literal(last_created, created_key.type), literal(last_id, Expense.id.type))
+            )
+        
+        query = (
+            query
+            .order_by(Expense.date.desc(), created_key.desc(), Expense.id.desc())
+            .limit(per_page + 1)
+        )
+        
+        rows = list((await self.db.execute(query)).all())
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = self._encode_cursor(last.date, last.created_key, last.id)
+        
+        return rows, next_cursor
+    
+    async def search(
+        self,
+        user_id: UUID,
+        query: str,
+        page: int = 1,
+        per_page: int = 20,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        category_id: Optional[int] = None,
+        transaction_type: Optional[str] = None,
+    ) -> Tuple[List[Row], int]:
+        """
+        Full-text search over descriptions, best matches first.
+        
+        Uses the FTS5 table on SQLite and the GIN expression index on
+        Postgres; the usual list filters are applied on top. Returns rows
+        like list().
+        """
+        await category_registry.ensure_loaded(self.db)
+        match = self.search_index.match(user_id, query)
+        if match is None:
+            return [], 0
+        joins, condition, rank = match
+        
+        filters = self._filters(user_id, start_date, end_date, category_id, transaction_type)
+        filters.append(condition)
+        
+        count_query = select(func.count(Expense.id))
+        query = select(*_LIST_COLUMNS)
+        for target, onclause in joins:
+            count_query = count_query.join(target, onclause)
+            query = query.join(target, onclause)
+        
+        total = (await self.db.execute(count_query.where(*filters))).scalar() or 0
+        
+        query = (
+            query
+            .where(*filters)
+            .order_by(rank, Expense.date.desc(), Expense.id.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        result = await self.db.execute(query)
+        return list(result.all()), total
+    
+    def _created_at_key(self):
+        """
+        created_at expression used for keyset ordering and comparison.
+        
+        SQLite stores server-default timestamps as 'YYYY-MM-DD HH:MM:SS'
+        text while bound datetimes carry microseconds, which breaks
+        equality on the cursor row. Compare the raw stored text there.
+        """
+        if self.db.bind.dialect.name == "sqlite":
+            return type_coerce(Expense.created_at, String)
+        return Expense.created_at
+    
+    def _encode_cursor(self, last_date: date, created_key, last_id: UUID) -> str:
+        """Encode a keyset position as an opaque URL-safe token."""
+        if isinstance(created_key, datetime):
+            created_key = created_key.isoformat()
+        payload = json.dumps([last_date.isoformat(), created_key, str(last_id)])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+    
+    def _decode_cursor(self, cursor: str) -> tuple:
+        """Decode a cursor produced by _encode_cursor."""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            last_date, created_key, last_id = json.loads(base64.urlsafe_b64decode(padded))
+            if not isinstance(self._created_at_key().type, String):
+                created_key = datetime.fromisoformat(created_key)
+            return date.fromisoformat(last_date), created_key, UUID(last_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
     
     async def update(
         self,
@@ -107,19 +310,38 @@ class ExpenseService:
         user_id: UUID,
         data: ExpenseUpdate,
     ) -> Optional[Expense]:
-        """Update an expense."""
+        """
+        Update an expense.
+        
+        Raises:
+            ValueError: If the new category does not exist
+        """
         expense = await self.get_by_id(expense_id, user_id)
         if not expense:
             return None
         
         update_data = data.model_dump(exclude_unset=True)
+        if update_data.get("category_id") is not None:
+            self._check_category(update_data["category_id"])
+        
+        deltas = RollupDeltas().add_expense(expense, -1)
+        reindex = "description" in update_data
+        if reindex:
+            await self.search_index.remove([expense.id])
+        
         for field, value in update_data.items():
             if field == "type" and value:
                 value = TransactionType(value.value)
             setattr(expense, field, value)
         
+        if reindex:
+            await self.db.flush()
+            await self.search_index.add([expense.id])
+        
+        deltas.add_expense(expense)
+        await self.rollups.apply(deltas)
+        await self.versions.bump(user_id)
         await self.db.commit()
-        await self.db.refresh(expense, ["category"])
         return expense
     
     async def delete(self, expense_id: UUID, user_id: UUID) -> bool:
@@ -128,75 +350,289 @@ class ExpenseService:
         if not expense:
             return False
         
+        await self.search_index.remove([expense.id])
         await self.db.delete(expense)
+        await self.rollups.apply(RollupDeltas().add_expense(expense, -1))
+        await self.versions.bump(user_id)
         await self.db.commit()
         return True
     
+    async def apply_batch(
+        self,
+        user_id: UUID,
+        request: BatchRequest,
+    ) -> BatchResponse:
+        """
+        Apply mixed create/update/delete operations in one transaction.
+        
+        Categories and all referenced rows are loaded with one query each,
+        then creates, updates and deletes are written with one bulk
+        statement per kind plus a single rollup upsert and commit.
+        Operations are applied in request order, so later operations see
+        the effect of earlier ones (e.g. create then update the same id).
+        """
+        await category_registry.ensure_loaded(self.db)
+        
+        # Load every referenced row up front
+        ids = {op.id for op in request.operations if op.id}
+        originals = {}
+        if ids:
+            result = await self.db.execute(
+                select(*_BATCH_COLUMNS).where(
+                    Expense.user_id == user_id,
+                    Expense.id.in_(ids),
+                )
+            )
+            originals = {row.id: dict(row._mapping) for row in result}
+        
+        # Client-generated create ids are primary keys, so check them across all users
+        create_ids = {
+            op.id for op in request.operations
+            if op.op == BatchOperationType.CREATE and op.id
+        }
+        taken = set()
+        if create_ids:
+            result = await self.db.execute(select(Expense.id).where(Expense.id.in_(create_ids)))
+            taken = set(result.scalars())
+        
+        state = {expense_id: dict(row) for expense_id, row in originals.items()}
+        created, updated, deleted = set(), set(), set()
+        results = []
+        
+        for index, op in enumerate(request.operations):
+            result = BatchOperationResult(index=index, op=op.op, success=False, id=op.id)
+            try:
+                if op.op == BatchOperationType.CREATE:
+                    data = ExpenseCreate(**(op.data or {}))
+                    expense_id = op.id or uuid4()
+                    if expense_id in state or expense_id in deleted or expense_id in taken:
+                        raise ValueError("Transaction id already exists")
+                    self._check_category(data.category_id)
+                    state[expense_id] = {
+                        "id": expense_id,
+                        "category_id": data.category_id,
+                        "amount": data.amount,
+                        "type": TransactionType(data.type.value),
+                        "description": data.description,
+                        "date": data.date,
+                        "is_auto_detected": False,
+                        "created_at": None,
+                    }
+                    created.add(expense_id)
+                
+                elif op.op == BatchOperationType.UPDATE:
+                    expense_id = op.id
+                    if expense_id not in state:
+                        raise LookupError("Transaction not found")
+                    data = ExpenseUpdate(**(op.data or {}))
+                    changes = data.model_dump(exclude_unset=True)
+                    if changes.get("category_id") is not None:
+                        self._check_category(changes["category_id"])
+                    for field, value in changes.items():
+                        if value is None and field != "description":
+                            continue
+                        if field == "type":
+                            value = TransactionType(value.value)
+                        state[expense_id][field] = value
+                    if expense_id not in created:
+                        updated.add(expense_id)
+                
+                else:
+                    expense_id = op.id
+                    if expense_id not in state:
+                        raise LookupError("Transaction not found")
+                    del state[expense_id]
+                    if expense_id in created:
+                        created.discard(expense_id)
+                    else:
+                        updated.discard(expense_id)
+                        deleted.add(expense_id)
+                
+                result.id = expense_id
+                result.success = True
+            except (ValueError, LookupError) as e:
+                result.error = self._batch_error(e)
+            results.append(result)
+        
+        failed = sum(1 for r in results if not r.success)
+        if request.atomic and failed:
+            for r in results:
+                if r.success:
+                    r.success = False
+                    r.error = "Batch aborted: another operation failed"
+            return BatchResponse(results=results, applied=0, failed=len(results))
+        
+        # Rollup deltas: remove original values, add final values
+        deltas = RollupDeltas()
+        for expense_id in updated | deleted:
+            row = originals[expense_id]
+            deltas.add(user_id, row["category_id"], row["type"], row["date"], row["amount"], -1)
+        for expense_id in updated | created:
+            row = state[expense_id]
+            deltas.add(user_id, row["category_id"], row["type"], row["date"], row["amount"])
+        
+        await self.search_index.remove(updated | deleted)
+        
+        if created:
+            rows = [
+                {key: value for key, value in state[i].items() if key != "created_at"} | {"user_id": user_id}
+                for i in created
+            ]
+            inserted = await self.db.execute(
+                insert(Expense).returning(Expense.id, Expense.created_at, sort_by_parameter_order=True),
+                rows,
+            )
+            for row in inserted:
+                state[row.id]["created_at"] = row.created_at
+        if updated:
+            await self.db.execute(
+                update(Expense),
+                [
+                    {field: state[i][field] for field in _BATCH_WRITABLE} | {"id": i}
+                    for i in updated
+                ],
+            )
+        if deleted:
+            await self.db.execute(
+                delete(Expense).where(
+                    Expense.user_id == user_id,
+                    Expense.id.in_(deleted),
+                )
+            )
+        
+        await self.search_index.add(created | updated)
+        await self.rollups.apply(deltas)
+        if created or updated or deleted:
+            await self.versions.bump(user_id)
+        await self.db.commit()
+        
+        # Attach the final state of each surviving row
+        for r in results:
+            if r.success and r.op != BatchOperationType.DELETE and r.id in state:
+                row = state[r.id]
+                r.item = ExpenseResponse(
+                    id=row["id"],
+                    amount=row["amount"],
+                    type=row["type"],
+                    description=row["description"],
+                    date=row["date"],
+                    category=category_registry.get(row["category_id"]),
+                    is_auto_detected=row["is_auto_detected"],
+                    created_at=row["created_at"],
+                )
+        
+        return BatchResponse(results=results, applied=len(results) - failed, failed=failed)
+    
+    def _check_category(self, category_id: int) -> None:
+        """Reject unknown category ids."""
+        if category_id not in category_registry:
+            raise ValueError(f"Unknown category_id {category_id}")
+    
+    def _batch_error(self, error: Exception) -> str:
+        """Flatten a batch operation error into one readable line."""
+        if isinstance(error, ValidationError):
+            return "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+            )
+        return str(error).strip("'\"")
+    
     async def get_summary(
         self,
         user_id: UUID,
         year: int,
         month: int,
     ) -> ExpenseSummary:
-        """Get monthly expense summary with category breakdown."""
-        # Get totals by type
-        totals_query = (
+        """Get monthly expense summary with category breakdown (from rollups, cached)."""
+        async def compute() -> ExpenseSummary:
+            history = await self.get_monthly_summaries(user_id, year, month, months=1)
+            return history[0][2]
+        
+        return await get_response_cache().get_or_compute(
+            user_id,
+            "summary",
+            {"year": year, "month": month},
+            await self.versions.get(user_id),
+            ExpenseSummary,
+            compute,
+        )
+    
+    async def get_monthly_summaries(
+        self,
+        user_id: UUID,
+        year: int,
+        month: int,
+        months: int = 3,
+    ) -> List[Tuple[int, int, ExpenseSummary]]:
+        """
+        Get summaries for the N months ending with (year, month), newest first.
+        
+        All months come from one range query over the rollup primary key
+        (user_id, year, month, ...), so the query count does not grow with N.
+        Months without transactions get an empty summary.
+        """
+        if not 1 <= months <= MAX_HISTORY_MONTHS:
+            raise ValueError(f"months must be between 1 and {MAX_HISTORY_MONTHS}")
+        
+        await category_registry.ensure_loaded(self.db)
+        first = add_months(year, month, -(months - 1))
+        month_key = tuple_(ExpenseMonthlyRollup.year, ExpenseMonthlyRollup.month)
+        rollup_query = (
             select(
-                Expense.type,
-                func.sum(Expense.amount).label("total"),
+                ExpenseMonthlyRollup.year,
+                ExpenseMonthlyRollup.month,
+                ExpenseMonthlyRollup.type,
+                ExpenseMonthlyRollup.total,
+                ExpenseMonthlyRollup.count,
+                ExpenseMonthlyRollup.category_id,
             )
             .where(
                 and_(
-                    Expense.user_id == user_id,
-                    extract("year", Expense.date) == year,
-                    extract("month", Expense.date) == month,
+                    ExpenseMonthlyRollup.user_id == user_id,
+                    month_key >= tuple_(literal(first[0]), literal(first[1])),
+                    month_key <= tuple_(literal(year), literal(month)),
+                    ExpenseMonthlyRollup.count > 0,
                 )
             )
-            .group_by(Expense.type)
         )
         
-        totals_result = await self.db.execute(totals_query)
-        totals = {row.type: row.total for row in totals_result}
+        rows_by_month = {}
+        for row in (await self.db.execute(rollup_query)).all():
+            rows_by_month.setdefault((row.year, row.month), []).append(row)
+        
+        history = []
+        for i in range(months):
+            y, m = add_months(year, month, -i)
+            history.append((y, m, self._build_summary(rows_by_month.get((y, m), []))))
+        return history
+    
+    def _build_summary(self, rows: list) -> ExpenseSummary:
+        """Assemble an ExpenseSummary from one month's rollup rows."""
+        # Totals by type
+        totals = {}
+        for row in rows:
+            totals[row.type] = totals.get(row.type, Decimal("0")) + row.total
         
         total_income = totals.get(TransactionType.INCOME, Decimal("0"))
         total_expense = totals.get(TransactionType.EXPENSE, Decimal("0"))
         
-        # Get category breakdown (expenses only)
-        category_query = (
-            select(
-                Category.id,
-                Category.name,
-                Category.icon,
-                Category.color,
-                func.sum(Expense.amount).label("amount"),
-                func.count(Expense.id).label("count"),
-            )
-            .join(Expense, Expense.category_id == Category.id)
-            .where(
-                and_(
-                    Expense.user_id == user_id,
-                    Expense.type == TransactionType.EXPENSE,
-                    extract("year", Expense.date) == year,
-                    extract("month", Expense.date) == month,
-                )
-            )
-            .group_by(Category.id, Category.name, Category.icon, Category.color)
-            .order_by(func.sum(Expense.amount).desc())
+        # Category breakdown (expenses only)
+        categories = sorted(
+            (row for row in rows if row.type == TransactionType.EXPENSE),
+            key=lambda row: row.total,
+            reverse=True,
         )
         
-        category_result = await self.db.execute(category_query)
-        categories = list(category_result.all())
-        
         # Calculate percentages
         breakdown = []
         for cat in categories:
-            pct = float(cat.amount / total_expense * 100) if total_expense > 0 else 0
+            pct = float(cat.total / total_expense * 100) if total_expense > 0 else 0
+            category = category_registry.get(cat.category_id)
             breakdown.append(CategoryBreakdown(
-                category_id=cat.id,
-                category_name=cat.name,
-                category_icon=cat.icon,
-                category_color=cat.color,
-                amount=cat.amount,
+                category_id=cat.category_id,
+                category_name=category.name,
+                category_icon=category.icon,
+                category_color=category.color,
+                amount=cat.total,
                 percentage=round(pct, 1),
                 transaction_count=cat.count,
             ))
@@ -208,39 +644,73 @@ class ExpenseService:
             category_breakdown=breakdown,
         )
     
-    async def get_all_categories(self) -> List[Category]:
-        """Get all expense categories."""
-        result = await self.db.execute(select(Category).order_by(Category.id))
-        return list(result.scalars().all())
+    async def get_all_categories(self) -> List[CategoryResponse]:
+        """Get all expense categories (from the in-process registry)."""
+        await category_registry.ensure_loaded(self.db)
+        return category_registry.all()
+    
+    async def get_daily_series(
+        self,
+        user_id: UUID,
+        start_date: date,
+        end_date: date,
+        category_id: Optional[int] = None,
+        transaction_type: str = TransactionType.EXPENSE.value,
+    ) -> List[DailySummary]:
+        """
+        Get per-day totals for start_date..end_date (inclusive).
+        
+        One GROUP BY over the (user_id, date) index range; days without
+        transactions are filled with zeros so the series is dense.
+        """
+        period = Period.days(start_date, end_date)
+        query = (
+            select(
+                Expense.date,
+                func.sum(Expense.amount).label("total"),
+                func.count(Expense.id).label("count"),
+            )
+            .where(
+                Expense.user_id == user_id,
+                period.filter(Expense.date),
+                Expense.type == TransactionType(transaction_type),
+            )
+            .group_by(Expense.date)
+        )
+        if category_id:
+            query = query.where(Expense.category_id == category_id)
+        
+        totals = {row.date: row for row in (await self.db.execute(query)).all()}
+        
+        series = []
+        for day in period.iter_days():
+            row = totals.get(day)
+            series.append(DailySummary(
+                date=day,
+                total=row.total if row else Decimal("0"),
+                count=row.count if row else 0,
+            ))
+        return series
     
     async def get_monthly_data(
         self,
         user_id: UUID,
         months: int = 3,
     ) -> List[dict]:
-        """Get spending data for the last N months (for AI predictions)."""
+        """Get spending data for the last N months (for AI predictions), newest first."""
         today = date.today()
-        data = []
-        
-        for i in range(months):
-            # Calculate year/month
-            month = today.month - i
-            year = today.year
-            if month <= 0:
-                month += 12
-                year -= 1
-            
-            # Get summary for this month
-            summary = await self.get_summary(user_id, year, month)
-            
-            data.append({
-                "year": year,
-                "month": month,
-                "total": float(summary.total_expense),
-                "categories": {
-                    cat.category_name: float(cat.amount)
-                    for cat in summary.category_breakdown
-                },
-            })
-        
-        return data
+        history = await self.get_monthly_summaries(user_id, today.year, today.month, months)
+        return [self.monthly_data_entry(year, month, summary) for year, month, summary in history]
+    
+    @staticmethod
+    def monthly_data_entry(year: int, month: int, summary: ExpenseSummary) -> dict:
+        """Flatten a month's summary into the history shape used by AI prompts."""
+        return {
+            "year": year,
+            "month": month,
+            "total": float(summary.total_expense),
+            "categories": {
+                cat.category_name: float(cat.amount)
+                for cat in summary.category_breakdown
+            },
+        }
@@ -0,0 +1,235 @@
+# Export Service
+# Streaming transaction export (CSV / NDJSON) and full account archives
+
+import io
+import csv
+import enum
+import json
+import zipfile
+from uuid import UUID
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.user import User
+from app.models.expense import Expense
+from app.models.category import Category
+from app.models.budget import Budget, BudgetCategory
+from app.models.chat import ChatMessage
+from app.utils.periods import date_range_filters
+
+
+# Rows fetched per server-side cursor round trip (and emitted per chunk)
+EXPORT_BATCH_SIZE = 1000
+
+TRANSACTION_FIELDS = [
+    "id",
+    "date",
+    "type",
+    "amount",
+    "category",
+    "description",
+    "is_auto_detected",
+    "created_at",
+]
+
+
+def _plain(value):
+    """Convert DB values to JSON/CSV-friendly primitives."""
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only buffer that zipfile writes into and we drain between yields."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportService:
+    """
+    Streams user data without materialising it.
+    
+    Every query runs through AsyncSession.stream() with yield_per, which
+    uses server-side cursors where the driver supports them, and selects
+    plain columns (category joined in SQL) so no ORM objects are built.
+    Memory use is bounded by EXPORT_BATCH_SIZE rows regardless of history size.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _stream_rows(self, query) -> AsyncIterator[list]:
+        """Yield lists of row mappings, one per fetched batch."""
+        result = await self.db.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.mappings().partitions():
+            yield partition
+    
+    async def iter_transaction_batches(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> AsyncIterator[list]:
+        """Yield batches of transaction dicts, oldest first."""
+        query = (
+            select(
+                Expense.id,
+                Expense.date,
+                Expense.type,
+                Expense.amount,
+                Category.name.label("category"),
+                Expense.description,
+                Expense.is_auto_detected,
+                Expense.created_at,
+            )
+            .join(Category, Expense.category_id == Category.id)
+            .where(
+                Expense.user_id == user_id,
+                *date_range_filters(Expense.date, start_date, end_date),
+            )
+            .order_by(Expense.date, Expense.created_at, Expense.id)
+        )
+        async for partition in self._stream_rows(query):
+            yield [{field: _plain(row[field]) for field in TRANSACTION_FIELDS} for row in partition]
+    
+    async def stream_csv(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream transactions as CSV with a header row."""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=TRANSACTION_FIELDS)
+        writer.writeheader()
+        yield buffer.getvalue().encode()
+        
+        async for batch in self.iter_transaction_batches(user_id, start_date, end_date):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+    
+    async def stream_ndjson(
+        self,
+        user_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream transactions as newline-delimited JSON."""
+        async for batch in self.iter_transaction_batches(user_id, start_date, end_date):
+            yield "".join(json.dumps(row) + "\n" for row in batch).encode()
+    
+    async def stream_budgets_ndjson(self, user_id: UUID) -> AsyncIterator[bytes]:
+        """Stream budgets, each with its category limits, as NDJSON."""
+        limits_result = await self.db.execute(
+            select(
+                BudgetCategory.budget_id,
+                BudgetCategory.category_id,
+                Category.name.label("category"),
+                BudgetCategory.limit_amount,
+            )
+            .join(Budget, BudgetCategory.budget_id == Budget.id)
+            .join(Category, BudgetCategory.category_id == Category.id)
+            .where(Budget.user_id == user_id)
+        )
+        limits = {}
+        for row in limits_result:
+            limits.setdefault(row.budget_id, []).append({
+                "category_id": row.category_id,
+                "category": row.category,
+                "limit_amount": _plain(row.limit_amount),
+            })
+        
+        query = (
+            select(Budget.id, Budget.year, Budget.month, Budget.total_limit, Budget.created_at)
+            .where(Budget.user_id == user_id)
+            .order_by(Budget.year, Budget.month)
+        )
+        async for partition in self._stream_rows(query):
+            yield "".join(
+                json.dumps({
+                    **{key: _plain(value) for key, value in row.items()},
+                    "category_limits": limits.get(row["id"], []),
+                }) + "\n"
+                for row in partition
+            ).encode()
+    
+    async def stream_chat_ndjson(self, user_id: UUID) -> AsyncIterator[bytes]:
+        """Stream chat history as NDJSON."""
+        query = (
+            select(
+                ChatMessage.id,
+                ChatMessage.conversation_id,
+                ChatMessage.role,
+                ChatMessage.content,
+                ChatMessage.created_at,
+            )
+            .where(ChatMessage.user_id == user_id)
+            .order_by(ChatMessage.created_at)
+        )
+        async for partition in self._stream_rows(query):
+            yield "".join(
+                json.dumps({key: _plain(value) for key, value in row.items()}) + "\n"
+                for row in partition
+            ).encode()
+    
+    async def stream_archive(self, user: User) -> AsyncIterator[bytes]:
+        """
+        Stream a zip archive of the user's profile, transactions, budgets and chats.
+        
+        zipfile writes to a non-seekable sink (data descriptors instead of
+        header back-patching), and the sink is drained after every batch.
+        """
+        profile = {
+            "id": str(user.id),
+            "email": user.email,
+            "name": user.name,
+            "phone": user.phone,
+            "dob": user.dob,
+            "gender": user.gender,
+            "created_at": _plain(user.created_at),
+            "exported_at": datetime.now().isoformat(),
+        }
+        entries = [
+            ("transactions.csv", self.stream_csv(user.id)),
+            ("budgets.ndjson", self.stream_budgets_ndjson(user.id)),
+            ("chat_messages.ndjson", self.stream_chat_ndjson(user.id)),
+        ]
+        
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("profile.json", json.dumps(profile, indent=2))
+            yield sink.drain()
+            
+            for name, chunks in entries:
+                with archive.open(name, mode="w", force_zip64=True) as entry:
+                    async for chunk in chunks:
+                        entry.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                yield sink.drain()
+        
+        yield sink.drain()
@@ -1,15 +1,22 @@
 # Gemini Client Wrapper
 # Production-ready Gemini API client with retry, fallback, and error handling
 
+import re
 import asyncio
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
 
+from app.config import settings
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.latency_tracker import LatencyTracker
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,6 +27,7 @@ class GeminiStatus(Enum):
     QUOTA_EXCEEDED = "quota_exceeded"
     INVALID_KEY = "invalid_key"
     MODEL_NOT_FOUND = "model_not_found"
+    TIMEOUT = "timeout"
     ERROR = "error"
 
 
@@ -31,6 +39,26 @@ class GeminiResponse:
     status: GeminiStatus
     model_used: Optional[str] = None
     error_message: Optional[str] = None
+    retry_after: Optional[float] = None  # server hint, seconds
+
+
+# A missing model will not appear on its own; check again rarely
+MODEL_NOT_FOUND_COOLDOWN = 3600
+
+# Successful calls a model needs before its latency percentile triggers hedging
+HEDGE_MIN_SAMPLES = 10
+
+_RETRY_HINT = re.compile(r"retry in (\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+def _retry_after_hint(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (RetryInfo detail or message text), if any."""
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return delay.seconds + delay.nanos / 1e9
+    match = _RETRY_HINT.search(str(error))
+    return float(match.group(1)) if match else None
 
 
 # Supported models in fallback order
@@ -50,12 +78,40 @@ class GeminiClient:
     - Model fallback chain when quota exceeded
     - Structured error handling
     - Request logging
+    - Bounded concurrency: at most GEMINI_MAX_CONCURRENCY calls in flight,
+      using the SDK's async API, or a dedicated thread pool when that is
+      unavailable, so slow calls never tie up the default executor
+    - Per-model circuit breakers: models that are out of quota, rate
+      limited (honoring retry-after hints), missing or failing are skipped
+      until their cooldown ends, so outages fall back in milliseconds
+    - Per-call deadline: retries, backoff and fallback share one
+      GEMINI_DEADLINE_SECONDS budget, so a hung call cannot hold a request
+    - Latency-aware routing: models are tried fastest-and-most-reliable
+      first, from their recent calls; optionally a slow first attempt is
+      hedged to the next model once it passes that model's latency
+      percentile (GEMINI_HEDGE_PERCENTILE), and the first answer wins
     """
     
     def __init__(self, api_key: str):
         self.api_key = api_key
         self._configured = False
         self._models: dict = {}
+        self._semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.completed = 0
+        self._breakers = {
+            model_name: CircuitBreaker(
+                settings.gemini_breaker_threshold,
+                settings.gemini_breaker_cooldown_seconds,
+            )
+            for model_name in FALLBACK_MODELS
+        }
+        self._latency = {model_name: LatencyTracker() for model_name in FALLBACK_MODELS}
+        self.timeouts = 0
+        self.hedges_started = 0
+        self.hedges_won = 0
         
         if api_key:
             self._configure()
@@ -81,11 +137,218 @@ class GeminiClient:
         """Check if client is properly configured."""
         return self._configured
     
+    @asynccontextmanager
+    async def _slot(self):
+        """Hold one of the GEMINI_MAX_CONCURRENCY call slots."""
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+    
+    async def _call_model(self, model, prompt: str):
+        """One generate_content call, waiting for a concurrency slot first."""
+        async with self._slot():
+            if settings.gemini_use_async and hasattr(model, "generate_content_async"):
+                return await model.generate_content_async(prompt)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.gemini_max_concurrency,
+                    thread_name_prefix="gemini",
+                )
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, model.generate_content, prompt
+            )
+    
+    def _route(self) -> List[str]:
+        """Models in the order to try them: best recent latency/success first, untried first of all."""
+        return sorted(FALLBACK_MODELS, key=lambda model_name: self._latency[model_name].score())
+    
+    async def _measured(self, model_name: str, prompt: str):
+        """_call_model, recording latency and outcome in the model's routing stats."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            response = await self._call_model(self._get_model(model_name), prompt)
+        except Exception:
+            self._latency[model_name].record(loop.time() - started, False)
+            raise
+        self._latency[model_name].record(loop.time() - started, True)
+        return response
+    
+    async def _timed_call(
+        self,
+        model_name: str,
+        prompt: str,
+        deadline_at: float,
+        hedge_model: Optional[str] = None,
+    ) -> Tuple[str, object]:
+        """
+        One call to model_name that gives up at deadline_at.
+        
+        With hedge_model, if the call is still running after that model's
+        hedge percentile and a concurrency slot is free, the same prompt is
+        also sent to hedge_model; the first success wins and the other call
+        is cancelled. The primary's error is raised if neither succeeds.
+        A call that times out can only be abandoned, not stopped, in
+        executor mode: its thread runs on but its slot is released.
+        
+        Returns:
+            (model that answered, response)
+        
+        Raises:
+            asyncio.TimeoutError: If the deadline passed first
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        primary = asyncio.ensure_future(self._measured(model_name, prompt))
+        tasks = {primary: model_name}
+        
+        hedge_after = None
+        if hedge_model is not None and len(self._latency[model_name]) >= HEDGE_MIN_SAMPLES:
+            hedge_after = self._latency[model_name].percentile(settings.gemini_hedge_percentile)
+        
+        try:
+            if hedge_after is not None and hedge_after < deadline_at - loop.time():
+                await asyncio.wait({primary}, timeout=hedge_after)
+                if (
+                    not primary.done()
+                    and not self._semaphore.locked()
+                    and self._breakers[hedge_model].state == CircuitBreaker.CLOSED
+                ):
+                    logger.info(f"{model_name} slower than {hedge_after:.2f}s, hedging to {hedge_model}")
+                    self.hedges_started += 1
+                    tasks[asyncio.ensure_future(self._measured(hedge_model, prompt))] = hedge_model
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline_at - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    for task in pending:
+                        self._latency[tasks[task]].record(loop.time() - started, False)
+                    raise asyncio.TimeoutError()
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        return tasks[task], task.result()
+            raise primary.exception()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+    
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield response text as the model produces it.
+        
+        Models are tried in fallback order until one starts producing text;
+        an error after that is raised to the caller, who already has part
+        of the answer. Yields nothing if every model fails (callers send
+        their own fallback). Without the async API the whole response is
+        generated first and yielded as one chunk.
+        
+        The first chunk must arrive within GEMINI_DEADLINE_SECONDS, shared
+        across fallback models as in generate(); after that each chunk may
+        take up to GEMINI_STREAM_IDLE_SECONDS. A model that misses either
+        counts as a failure for its circuit breaker.
+        """
+        if not self._configured:
+            return
+        if not settings.gemini_use_async:
+            result = await self.generate(prompt)
+            if result.success:
+                yield result.content
+            return
+        
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + settings.gemini_deadline_seconds
+        for model_name in self._route():
+            breaker = self._breakers[model_name]
+            if not breaker.allow():
+                continue
+            model = self._get_model(model_name)
+            produced = False
+            try:
+                async with self._slot():
+                    response = await asyncio.wait_for(
+                        model.generate_content_async(prompt, stream=True),
+                        max(0.0, deadline_at - loop.time()),
+                    )
+                    chunks = response.__aiter__()
+                    while True:
+                        timeout = settings.gemini_stream_idle_seconds if produced else deadline_at - loop.time()
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, timeout))
+                        except StopAsyncIteration:
+                            break
+                        if chunk.text:
+                            if not produced:
+                                breaker.record_success()
+                            produced = True
+                            yield chunk.text
+                if not produced:
+                    breaker.record_success()
+                return
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                breaker.record_failure("timeout")
+                if produced:
+                    logger.error(f"Streaming with {model_name} stalled for {settings.gemini_stream_idle_seconds}s")
+                    raise
+                # The deadline is shared, so there is no time left for another model
+                logger.error(f"Streaming with {model_name} produced nothing before the deadline")
+                return
+            except Exception as e:
+                if produced:
+                    raise
+                if isinstance(e, google_exceptions.ResourceExhausted):
+                    breaker.record_failure("resource_exhausted", open_for=_retry_after_hint(e) or breaker.cooldown)
+                elif isinstance(e, google_exceptions.NotFound):
+                    breaker.record_failure("model_not_found", open_for=MODEL_NOT_FOUND_COOLDOWN)
+                else:
+                    breaker.record_failure(str(e)[:100])
+                logger.warning(f"Streaming with {model_name} failed: {str(e)[:100]}, trying next...")
+            except BaseException:
+                if not produced:
+                    breaker.release()
+                raise
+        
+        logger.error("All Gemini models failed to stream")
+    
+    def stats(self) -> dict:
+        """Concurrency gauges for /health."""
+        return {
+            "mode": "async" if settings.gemini_use_async else "executor",
+            "max_concurrency": settings.gemini_max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "deadline_seconds": settings.gemini_deadline_seconds,
+            "timeouts": self.timeouts,
+            "hedges": {"started": self.hedges_started, "won": self.hedges_won},
+            "routing": [{"model": name, **self._latency[name].stats()} for name in self._route()],
+            "circuits": {name: breaker.stats() for name, breaker in self._breakers.items()},
+        }
+    
     async def generate(
         self,
         prompt: str,
         max_retries: int = 3,
         initial_delay: float = 1.0,
+        deadline: Optional[float] = None,
     ) -> GeminiResponse:
         """
         Generate content with automatic retry and model fallback.
@@ -94,6 +357,8 @@ class GeminiClient:
             prompt: The prompt to send to Gemini
             max_retries: Max retry attempts per model
             initial_delay: Initial delay for exponential backoff (seconds)
+            deadline: Total seconds for all attempts, backoff and fallback
+                (default GEMINI_DEADLINE_SECONDS)
             
         Returns:
             GeminiResponse with success status and content
@@ -107,22 +372,54 @@ class GeminiClient:
                 error_message="Gemini API not configured"
             )
         
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + (deadline if deadline is not None else settings.gemini_deadline_seconds)
         last_error = None
+        attempted = False
+        timed_out = False
         
-        # Try each model in fallback order
-        for model_name in FALLBACK_MODELS:
-            result = await self._try_model_with_retry(
-                model_name=model_name,
-                prompt=prompt,
-                max_retries=max_retries,
-                initial_delay=initial_delay,
-            )
+        # Try each model in routing order, skipping those with an open circuit
+        route = self._route()
+        for index, model_name in enumerate(route):
+            breaker = self._breakers[model_name]
+            if loop.time() >= deadline_at:
+                timed_out = True
+                break
+            if not breaker.allow():
+                logger.debug(f"Circuit open for {model_name}, skipping")
+                continue
+            attempted = True
+            
+            hedge_model = None
+            if settings.gemini_hedge_percentile and index + 1 < len(route):
+                hedge_model = route[index + 1]
+            try:
+                result = await self._try_model_with_retry(
+                    model_name=model_name,
+                    prompt=prompt,
+                    max_retries=max_retries,
+                    initial_delay=initial_delay,
+                    deadline_at=deadline_at,
+                    hedge_model=hedge_model,
+                )
+            except BaseException:
+                breaker.release()
+                raise
+            if result.model_used not in (None, model_name):
+                # The hedge answered; the primary was only slow
+                breaker.release()
+                self._breakers[result.model_used].record_success()
+            else:
+                self._record_outcome(breaker, result)
             
             if result.success:
-                logger.info(f"Successfully generated with model: {model_name}")
+                logger.info(f"Successfully generated with model: {result.model_used}")
                 return result
             
             last_error = result.error_message
+            if result.status == GeminiStatus.TIMEOUT:
+                timed_out = True
+                break
             
             # Don't try other models for certain errors
             if result.status == GeminiStatus.INVALID_KEY:
@@ -131,6 +428,25 @@ class GeminiClient:
             
             logger.warning(f"Model {model_name} failed: {result.status.value}, trying next...")
         
+        if not attempted:
+            # Every circuit is open: answer locally without waiting
+            return GeminiResponse(
+                success=False,
+                content=self._get_fallback_message(),
+                status=GeminiStatus.RATE_LIMITED,
+                error_message="All models temporarily unavailable (circuit open)"
+            )
+        
+        if timed_out:
+            self.timeouts += 1
+            logger.error(f"Gemini deadline exceeded. Last error: {last_error}")
+            return GeminiResponse(
+                success=False,
+                content=self._get_fallback_message(),
+                status=GeminiStatus.TIMEOUT,
+                error_message=last_error or "Deadline exceeded"
+            )
+        
         # All models failed - return fallback
         logger.error(f"All Gemini models failed. Last error: {last_error}")
         return GeminiResponse(
@@ -140,31 +456,59 @@ class GeminiClient:
             error_message=last_error
         )
     
+    def _record_outcome(self, breaker: CircuitBreaker, result: GeminiResponse) -> None:
+        """Feed a model's result into its circuit breaker."""
+        if result.success:
+            breaker.record_success()
+        elif result.status in (GeminiStatus.QUOTA_EXCEEDED, GeminiStatus.RATE_LIMITED):
+            breaker.record_failure(
+                result.status.value,
+                open_for=result.retry_after or breaker.cooldown,
+            )
+        elif result.status == GeminiStatus.MODEL_NOT_FOUND:
+            breaker.record_failure(result.status.value, open_for=MODEL_NOT_FOUND_COOLDOWN)
+        elif result.status == GeminiStatus.INVALID_KEY:
+            breaker.release()  # a key problem, not this model's
+        else:
+            breaker.record_failure(result.error_message or result.status.value)
+    
     async def _try_model_with_retry(
         self,
         model_name: str,
         prompt: str,
         max_retries: int,
         initial_delay: float,
+        deadline_at: float,
+        hedge_model: Optional[str] = None,
     ) -> GeminiResponse:
-        """Try a specific model with exponential backoff retry."""
-        model = self._get_model(model_name)
+        """
+        Try a specific model with exponential backoff retry.
+        
+        Attempts and backoff stop at deadline_at; only the first attempt
+        may be hedged to hedge_model.
+        """
+        loop = asyncio.get_running_loop()
         delay = initial_delay
         
         for attempt in range(max_retries):
             try:
-                # Run in executor since genai is synchronous
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: model.generate_content(prompt)
+                answered_by, response = await self._timed_call(
+                    model_name, prompt, deadline_at, hedge_model if attempt == 0 else None
                 )
                 
                 return GeminiResponse(
                     success=True,
                     content=response.text,
                     status=GeminiStatus.OK,
-                    model_used=model_name
+                    model_used=answered_by
+                )
+                
+            except asyncio.TimeoutError:
+                return GeminiResponse(
+                    success=False,
+                    content="",
+                    status=GeminiStatus.TIMEOUT,
+                    error_message=f"Model {model_name} did not answer before the deadline"
                 )
                 
             except google_exceptions.ResourceExhausted as e:
@@ -174,20 +518,31 @@ class GeminiClient:
                     status = GeminiStatus.QUOTA_EXCEEDED
                 else:
                     status = GeminiStatus.RATE_LIMITED
+                retry_after = _retry_after_hint(e)
                 
-                if attempt < max_retries - 1:
+                # Quota does not come back within a request; neither does a
+                # rate limit whose hint is longer than our next backoff step
+                # or than the time left before the deadline
+                wait = retry_after if retry_after is not None else delay
+                if (
+                    status == GeminiStatus.RATE_LIMITED
+                    and attempt < max_retries - 1
+                    and wait <= delay
+                    and wait < deadline_at - loop.time()
+                ):
                     logger.warning(
                         f"Rate limited on {model_name}, "
-                        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})"
+                        f"retrying in {wait:.1f}s (attempt {attempt + 1}/{max_retries})"
                     )
-                    await asyncio.sleep(delay)
+                    await asyncio.sleep(wait)
                     delay *= 2  # Exponential backoff
                 else:
                     return GeminiResponse(
                         success=False,
                         content="",
                         status=status,
-                        error_message=str(e)[:100]
+                        error_message=str(e)[:100],
+                        retry_after=retry_after,
                     )
                     
             except google_exceptions.NotFound as e:
@@ -223,7 +578,7 @@ class GeminiClient:
                     )
                 
                 if "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                    if attempt < max_retries - 1:
+                    if attempt < max_retries - 1 and delay < deadline_at - loop.time():
                         await asyncio.sleep(delay)
                         delay *= 2
                         continue
@@ -0,0 +1,329 @@
+# Import Service
+# Streaming bank/UPI statement import (CSV and OFX) into expenses
+
+import io
+import codecs
+import re
+import csv
+import time
+import uuid
+from uuid import UUID
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
+
+from app.models.expense import Expense, TransactionType
+from app.schemas.expense import ExpenseCreate, ImportRowError, ImportSummary
+from app.services.rollup_service import RollupService, RollupDeltas
+from app.services.search_service import SearchIndex
+from app.services.category_registry import category_registry
+from app.services.version_service import DataVersionService
+
+
+# Rows inserted (and committed) per multi-row INSERT
+CHUNK_SIZE = 1000
+
+# Per-row errors returned to the client; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%b-%Y", "%d %b %Y"]
+
+# Accepted CSV header aliases (lower-cased)
+CSV_COLUMNS = {
+    "date": ["date", "transaction date", "txn date", "value date", "posted date"],
+    "amount": ["amount", "transaction amount"],
+    "debit": ["debit", "withdrawal", "withdrawal amt.", "debit amount"],
+    "credit": ["credit", "deposit", "deposit amt.", "credit amount"],
+    "type": ["type", "transaction type"],
+    "description": ["description", "narration", "remarks", "details", "memo", "particulars"],
+    "category": ["category"],
+    "category_id": ["category_id"],
+}
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+# Debit/credit marker before or after an amount ("500.00 Dr", "CR 1,200")
+_DR_CR = re.compile(r"(?<![a-z])(dr|cr)(?![a-z])\.?", re.IGNORECASE)
+
+
+class StatementImportError(ValueError):
+    """Raised when a statement cannot be parsed at all."""
+
+
+def parse_date(value: str) -> date:
+    """Parse a statement date in any of the supported formats."""
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def parse_amount(value: str) -> Optional[Decimal]:
+    """
+    Parse an amount, tolerating currency symbols and commas.
+    
+    A Dr marker makes the amount negative (money out) and a Cr marker
+    positive (money in), whatever sign was written.
+    """
+    marker = _DR_CR.search(value or "")
+    cleaned = re.sub(r"[^0-9.\-]", "", _DR_CR.sub("", value or ""))
+    if not cleaned:
+        return None
+    try:
+        amount = Decimal(cleaned)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+    if marker:
+        amount = -abs(amount) if marker.group(1).lower() == "dr" else abs(amount)
+    return amount
+
+
+def iter_csv(stream: BinaryIO) -> Iterator[Tuple[int, dict]]:
+    """Yield (row_number, normalised_row) from a CSV statement, one line at a time."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if not header:
+        raise StatementImportError("CSV file is empty")
+    
+    header = [h.strip().lower() for h in header]
+    positions = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                positions[field] = header.index(alias)
+                break
+    
+    if "date" not in positions or not (
+        "amount" in positions or "debit" in positions or "credit" in positions
+    ):
+        raise StatementImportError("CSV needs a date column and an amount or debit/credit columns")
+    
+    for line_number, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        yield line_number, {
+            field: values[index].strip() if index < len(values) else ""
+            for field, index in positions.items()
+        }
+
+
+def iter_ofx(stream: BinaryIO, chunk_size: int = 65536) -> Iterator[Tuple[int, dict]]:
+    """
+    Yield (transaction_number, normalised_row) from an OFX/QFX statement.
+    
+    OFX 1.x is SGML with optional closing tags and no guaranteed line
+    breaks, so the file is tokenised chunk by chunk instead of per line.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    current = None
+    number = 0
+    
+    def finish(txn: dict) -> dict:
+        posted = txn.get("DTPOSTED", "")[:8]
+        description = txn.get("NAME") or txn.get("MEMO") or ""
+        if txn.get("NAME") and txn.get("MEMO"):
+            description = f"{txn['NAME']} - {txn['MEMO']}"
+        return {
+            "date": f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}" if len(posted) == 8 else posted,
+            "amount": txn.get("TRNAMT", ""),
+            "description": description,
+        }
+    
+    while True:
+        raw = stream.read(chunk_size)
+        chunk = decoder.decode(raw, final=not raw)
+        buffer += chunk
+        
+        # Keep a possibly truncated trailing tag for the next chunk
+        cut = len(buffer) if not raw else buffer.rfind("<")
+        for match in _OFX_TAG.finditer(buffer, 0, max(cut, 0)):
+            closing, tag, value = match.group(1), match.group(2).upper(), match.group(3).strip()
+            if tag == "STMTTRN":
+                if current is not None:
+                    number += 1
+                    yield number, finish(current)
+                current = None if closing else {}
+            elif tag == "BANKTRANLIST" and closing and current is not None:
+                number += 1
+                yield number, finish(current)
+                current = None
+            elif current is not None and not closing and value:
+                current[tag] = value
+        buffer = buffer[max(cut, 0):]
+        
+        if not raw:
+            break
+    
+    if current is not None:
+        number += 1
+        yield number, finish(current)
+
+
+class ImportService:
+    """Bulk statement import with batched inserts."""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.rollups = RollupService(db)
+        self.search_index = SearchIndex(db)
+        self.versions = DataVersionService(db)
+    
+    async def import_statement(
+        self,
+        user_id: UUID,
+        stream: BinaryIO,
+        file_format: str,
+    ) -> ImportSummary:
+        """
+        Parse and import a statement.
+        
+        Rows are validated against ExpenseCreate and inserted with one
+        multi-row INSERT and one commit per CHUNK_SIZE rows. Reading and
+        validating each chunk runs in the threadpool, so a large upload
+        does not hold up the event loop between inserts.
+        
+        Raises:
+            StatementImportError: If the file cannot be parsed at all
+        """
+        started = time.perf_counter()
+        categories = await self._load_categories()
+        rows = iter_ofx(stream) if file_format == "ofx" else iter_csv(stream)
+        
+        total_rows = imported = failed = 0
+        errors = []
+        
+        while True:
+            chunk, seen, rejected, finished = await run_in_threadpool(
+                self._parse_chunk, rows, user_id, categories, errors
+            )
+            total_rows += seen
+            failed += rejected
+            if chunk:
+                imported += await self._insert_chunk(chunk)
+            if finished:
+                break
+        
+        duration = time.perf_counter() - started
+        return ImportSummary(
+            format=file_format,
+            total_rows=total_rows,
+            imported=imported,
+            failed=failed,
+            errors=errors,
+            duration_ms=round(duration * 1000, 1),
+            rows_per_second=round(imported / duration, 1) if duration > 0 else 0,
+        )
+    
+    def _parse_chunk(
+        self,
+        rows: Iterator[Tuple[int, dict]],
+        user_id: UUID,
+        categories: dict,
+        errors: List[ImportRowError],
+    ) -> Tuple[list, int, int, bool]:
+        """
+        Pull rows until CHUNK_SIZE are valid or the statement ends (blocking).
+        
+        Invalid rows are counted and, up to MAX_REPORTED_ERRORS, appended
+        to errors.
+        
+        Returns:
+            (valid rows, rows read, rows rejected, whether the statement ended)
+        """
+        chunk = []
+        seen = rejected = 0
+        for row_number, raw in rows:
+            seen += 1
+            try:
+                chunk.append(self._to_expense_row(user_id, raw, categories))
+            except (ValueError, ValidationError) as e:
+                rejected += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append(ImportRowError(row=row_number, message=self._error_message(e)))
+                continue
+            if len(chunk) >= CHUNK_SIZE:
+                return chunk, seen, rejected, False
+        return chunk, seen, rejected, True
+    
+    async def _load_categories(self) -> dict:
+        """Snapshot category ids by lower-cased name once per import."""
+        await category_registry.ensure_loaded(self.db)
+        return {c.name.lower(): c.id for c in category_registry.all()}
+    
+    def _to_expense_row(self, user_id: UUID, raw: dict, categories: dict) -> dict:
+        """Validate one parsed statement row and map it to an insertable dict."""
+        amount = parse_amount(raw.get("amount", ""))
+        if amount is None:
+            debit = parse_amount(raw.get("debit", ""))
+            credit = parse_amount(raw.get("credit", ""))
+            amount = -abs(debit) if debit else credit
+        if amount is None:
+            raise ValueError("Missing amount")
+        
+        type_value = (raw.get("type") or "").lower()
+        if type_value in ("income", "credit", "cr"):
+            transaction_type = TransactionType.INCOME
+        elif type_value in ("expense", "debit", "dr"):
+            transaction_type = TransactionType.EXPENSE
+        else:
+            transaction_type = TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE
+        
+        if raw.get("category_id"):
+            category_id = int(raw["category_id"])
+            if category_id not in categories.values():
+                raise ValueError(f"Unknown category_id {category_id}")
+        elif raw.get("category"):
+            category_id = categories.get(raw["category"].lower())
+            if category_id is None:
+                raise ValueError(f"Unknown category '{raw['category']}'")
+        else:
+            default = "income" if transaction_type == TransactionType.INCOME else "other"
+            category_id = categories.get(default) or min(categories.values())
+        
+        data = ExpenseCreate(
+            amount=abs(amount),
+            category_id=category_id,
+            type=transaction_type.value,
+            description=(raw.get("description") or "")[:255] or None,
+            date=parse_date(raw.get("date", "")),
+        )
+        return {
+            "id": uuid.uuid4(),
+            "user_id": user_id,
+            "category_id": data.category_id,
+            "amount": data.amount,
+            "type": TransactionType(data.type.value),
+            "description": data.description,
+            "date": data.date,
+            "is_auto_detected": True,
+        }
+    
+    async def _insert_chunk(self, rows: list) -> int:
+        """Insert one chunk with its rollup deltas and search entries, then commit."""
+        deltas = RollupDeltas()
+        for row in rows:
+            deltas.add(row["user_id"], row["category_id"], row["type"], row["date"], row["amount"])
+        
+        await self.db.execute(insert(Expense), rows)
+        await self.search_index.add(row["id"] for row in rows)
+        await self.rollups.apply(deltas)
+        await self.versions.bump(rows[0]["user_id"])
+        await self.db.commit()
+        return len(rows)
+    
+    def _error_message(self, error: Exception) -> str:
+        """Flatten a validation error into one readable line."""
+        if isinstance(error, ValidationError):
+            return "; ".join(
+                f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+            )
+        return str(error)
@@ -0,0 +1,189 @@
+# Rollup Service
+# Incrementally maintained monthly totals behind summaries and budgets
+
+from uuid import UUID
+from datetime import date
+from decimal import Decimal
+from collections import defaultdict
+from typing import Optional, Dict, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func, cast, extract, Integer
+
+from app.models.expense import Expense, ExpenseMonthlyRollup, TransactionType
+
+
+# (user_id, year, month, category_id, type)
+RollupKey = Tuple[UUID, int, int, int, TransactionType]
+
+_KEY_COLUMNS = ["user_id", "year", "month", "category_id", "type"]
+
+
+class RollupDeltas:
+    """Accumulates rollup changes for one unit of work."""
+
+    def __init__(self):
+        self._deltas: Dict[RollupKey, list] = defaultdict(lambda: [Decimal("0"), 0])
+
+    def add(
+        self,
+        user_id: UUID,
+        category_id: int,
+        transaction_type: TransactionType,
+        on: date,
+        amount: Decimal,
+        sign: int = 1,
+    ) -> "RollupDeltas":
+        """Record one transaction being added (sign=1) or removed (sign=-1)."""
+        key = (user_id, on.year, on.month, category_id, TransactionType(transaction_type))
+        delta = self._deltas[key]
+        delta[0] += Decimal(amount) * sign
+        delta[1] += sign
+        return self
+
+    def add_expense(self, expense: Expense, sign: int = 1) -> "RollupDeltas":
+        """Record an Expense row being added (sign=1) or removed (sign=-1)."""
+        return self.add(
+            expense.user_id,
+            expense.category_id,
+            expense.type,
+            expense.date,
+            expense.amount,
+            sign,
+        )
+
+    def rows(self) -> list:
+        """Non-zero deltas as insertable rollup rows."""
+        return [
+            dict(zip(_KEY_COLUMNS, key), total=total, count=count)
+            for key, (total, count) in self._deltas.items()
+            if total != 0 or count != 0
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.rows())
+
+
+class RollupService:
+    """Maintains ExpenseMonthlyRollup alongside writes to expenses."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(self, deltas: RollupDeltas) -> None:
+        """
+        Apply accumulated deltas inside the caller's transaction.
+
+        The caller commits; rollup rows therefore change atomically with
+        the expense rows they describe.
+        """
+        rows = deltas.rows()
+        if not rows:
+            return
+
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            await self._apply_generic(rows)
+            return
+
+        stmt = dialect_insert(ExpenseMonthlyRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_KEY_COLUMNS,
+            set_={
+                "total": ExpenseMonthlyRollup.total + stmt.excluded.total,
+                "count": ExpenseMonthlyRollup.count + stmt.excluded.count,
+            },
+        )
+        await self.db.execute(stmt)
+
+        if any(row["count"] < 0 for row in rows):
+            await self._prune({row["user_id"] for row in rows})
+
+    async def _apply_generic(self, rows: list) -> None:
+        """Read-modify-write fallback for dialects without ON CONFLICT."""
+        for row in rows:
+            key = tuple(row[col] for col in _KEY_COLUMNS)
+            existing = await self.db.get(ExpenseMonthlyRollup, key)
+            if existing:
+                existing.total += row["total"]
+                existing.count += row["count"]
+            else:
+                self.db.add(ExpenseMonthlyRollup(**row))
+        await self.db.flush()
+        await self._prune({row["user_id"] for row in rows})
+
+    async def _prune(self, user_ids: set) -> None:
+        """Drop rollup rows whose last transaction was removed."""
+        await self.db.execute(
+            delete(ExpenseMonthlyRollup).where(
+                ExpenseMonthlyRollup.user_id.in_(user_ids),
+                ExpenseMonthlyRollup.count <= 0,
+            )
+        )
+
+    async def rebuild(self, user_id: Optional[UUID] = None) -> int:
+        """
+        Recompute rollups from the expenses table (backfill/repair).
+
+        Args:
+            user_id: If provided, rebuild only this user. Otherwise rebuild all.
+
+        Returns:
+            Number of rollup rows written
+        """
+        clear = delete(ExpenseMonthlyRollup)
+        source = select(
+            Expense.user_id,
+            cast(extract("year", Expense.date), Integer).label("year"),
+            cast(extract("month", Expense.date), Integer).label("month"),
+            Expense.category_id,
+            Expense.type,
+            func.sum(Expense.amount).label("total"),
+            func.count(Expense.id).label("count"),
+        )
+        if user_id:
+            clear = clear.where(ExpenseMonthlyRollup.user_id == user_id)
+            source = source.where(Expense.user_id == user_id)
+        source = source.group_by(
+            Expense.user_id,
+            extract("year", Expense.date),
+            extract("month", Expense.date),
+            Expense.category_id,
+            Expense.type,
+        )
+
+        await self.db.execute(clear)
+        await self.db.execute(
+            insert(ExpenseMonthlyRollup).from_select(
+                _KEY_COLUMNS + ["total", "count"],
+                source,
+            )
+        )
+
+        count_query = select(func.count()).select_from(ExpenseMonthlyRollup)
+        if user_id:
+            count_query = count_query.where(ExpenseMonthlyRollup.user_id == user_id)
+        return (await self.db.execute(count_query)).scalar() or 0
+
+
+async def ensure_rollups(db: AsyncSession) -> int:
+    """
+    Backfill rollups when the table is empty but expenses exist (run at startup).
+
+    Covers a freshly created rollup table on a database with existing
+    history, so summaries and budgets are right without a manual
+    rebuild-rollups. Commits; returns the number of rows written (0 if
+    nothing was needed).
+    """
+    has_rollups = (await db.execute(select(ExpenseMonthlyRollup.user_id).limit(1))).first()
+    if has_rollups is not None:
+        return 0
+    has_expenses = (await db.execute(select(Expense.id).limit(1))).first()
+    if has_expenses is None:
+        return 0
+    count = await RollupService(db).rebuild()
+    await db.commit()
+    return count
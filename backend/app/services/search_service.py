@@ -0,0 +1,208 @@
+# Search Service
+# Full-text index over transaction descriptions (SQLite FTS5 / Postgres GIN)
+
+import re
+from uuid import UUID
+from typing import Iterable, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+from sqlalchemy import text, func, literal_column, select, insert, delete, and_, table, column
+from sqlalchemy import MetaData, Table, Column, Integer
+from sqlalchemy.sql import ColumnElement
+from sqlalchemy.schema import CreateIndex
+
+from app.models.expense import Expense, description_tsvector, description_fts_index
+
+
+FTS_TABLE = "expenses_search"
+
+# Contentless FTS5 table. Every description word is indexed as
+# <user id hex><word>, so a search only touches the searching user's terms:
+# prefix expansion and bm25's document counts stay per-user instead of
+# walking postings for every user's rows
+_SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "terms, content='', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+_fts_table = table(FTS_TABLE, column("rowid"))
+
+# FTS rowids must be integers and expenses is keyed by UUID. Its implicit
+# rowid is not stable (VACUUM may renumber it), so each indexed expense gets
+# its own integer key here. SQLite only; Postgres indexes expenses directly
+_search_metadata = MetaData()
+search_keys = Table(
+    "expenses_search_keys",
+    _search_metadata,
+    Column("key", Integer, primary_key=True),
+    Column("expense_id", Expense.__table__.c.id.type, nullable=False, unique=True),
+)
+
+# Word characters as the unicode61 tokenizer sees them (underscore separates)
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Rows read per batch when (re)building the SQLite index
+_BUILD_BATCH = 5000
+
+
+def _tokens(query: str) -> list:
+    """Split a user query into plain word tokens (operators are not exposed)."""
+    return _TOKEN.findall(query.lower())[:10]
+
+
+def _scoped_terms(user_id: UUID, description: Optional[str]) -> str:
+    """Indexed text for one row: each word prefixed with the owner's id."""
+    key = user_id.hex
+    return " ".join(key + word for word in _TOKEN.findall((description or "").lower()))
+
+
+def _index_rows(rows) -> list:
+    return [{"rowid": row.key, "terms": _scoped_terms(row.user_id, row.description)} for row in rows]
+
+
+def _keyed_rows():
+    """Index key, owner and description of indexed expenses."""
+    return select(search_keys.c.key, Expense.user_id, Expense.description).join(
+        Expense, Expense.id == search_keys.c.expense_id
+    )
+
+
+async def _populate(conn: AsyncConnection) -> None:
+    """Fill the SQLite index from expenses, in key order and bounded batches."""
+    await conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"))
+    await conn.execute(delete(search_keys))
+    await conn.execute(insert(search_keys).from_select(["expense_id"], select(Expense.id)))
+    last = 0
+    while True:
+        result = await conn.execute(
+            _keyed_rows()
+            .where(search_keys.c.key > last)
+            .order_by(search_keys.c.key)
+            .limit(_BUILD_BATCH)
+        )
+        rows = result.all()
+        if not rows:
+            return
+        await conn.execute(text(f"INSERT INTO {FTS_TABLE}(rowid, terms) VALUES (:rowid, :terms)"), _index_rows(rows))
+        last = rows[-1].key
+
+
+async def ensure_search_index(conn: AsyncConnection) -> None:
+    """
+    Create the full-text index if missing (run at startup).
+    
+    On SQLite a freshly created FTS table (and its key table) is
+    backfilled from expenses.
+    Postgres uses the expression GIN index declared on the Expense model,
+    which the database keeps current by itself; create_all only builds it
+    with a new expenses table, so existing databases get it here.
+    """
+    if conn.dialect.name == "postgresql":
+        await conn.execute(CreateIndex(description_fts_index, if_not_exists=True))
+        return
+    if conn.dialect.name != "sqlite":
+        return
+    existing = await conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    )
+    if existing.first():
+        return
+    await conn.run_sync(_search_metadata.create_all)
+    await conn.execute(text(_SQLITE_DDL))
+    await _populate(conn)
+
+
+async def rebuild_search_index(conn: AsyncConnection) -> None:
+    """Repopulate the SQLite FTS table from expenses (e.g. after bulk SQL edits)."""
+    if conn.dialect.name != "sqlite":
+        return
+    await conn.run_sync(_search_metadata.create_all)
+    await conn.execute(text(_SQLITE_DDL))
+    await _populate(conn)
+
+
+class SearchIndex:
+    """
+    Keeps the description index in sync with writes and builds match clauses.
+    
+    Writers call remove() before changing or deleting rows (a contentless
+    FTS table can only drop a row given the exact text it indexed, which
+    is rebuilt from expenses itself) and add() once new values are
+    flushed. Both are no-ops on Postgres.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    @property
+    def _sqlite(self) -> bool:
+        return self.db.bind.dialect.name == "sqlite"
+    
+    async def _rows(self, ids: list):
+        result = await self.db.execute(_keyed_rows().where(search_keys.c.expense_id.in_(ids)))
+        return result.all()
+    
+    async def add(self, expense_ids: Iterable[UUID]) -> None:
+        """Index flushed expense rows."""
+        ids = list(expense_ids)
+        if not ids or not self._sqlite:
+            return
+        await self.db.execute(insert(search_keys), [{"expense_id": i} for i in ids])
+        rows = await self._rows(ids)
+        if rows:
+            await self.db.execute(
+                text(f"INSERT INTO {FTS_TABLE}(rowid, terms) VALUES (:rowid, :terms)"),
+                _index_rows(rows),
+            )
+    
+    async def remove(self, expense_ids: Iterable[UUID]) -> None:
+        """Drop index entries for rows about to change or be deleted."""
+        ids = list(expense_ids)
+        if not ids or not self._sqlite:
+            return
+        rows = await self._rows(ids)
+        if rows:
+            await self.db.execute(
+                text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, terms) VALUES ('delete', :rowid, :terms)"),
+                _index_rows(rows),
+            )
+        await self.db.execute(delete(search_keys).where(search_keys.c.expense_id.in_(ids)))
+    
+    def match(self, user_id: UUID, query: str) -> Optional[Tuple[list, ColumnElement, ColumnElement]]:
+        """
+        Build the full-text part of a search query.
+        
+        Returns:
+            Tuple of (extra FROM/join clauses as (target, onclause) pairs,
+            WHERE condition, rank expression where lower sorts first),
+            or None when the query has no searchable words
+        """
+        tokens = _tokens(query)
+        if not tokens:
+            return None
+        
+        dialect = self.db.bind.dialect.name
+        if dialect == "sqlite":
+            # Every word must match; the last one also as a prefix (search-as-you-type)
+            key = user_id.hex
+            words = " ".join(f'"{key}{t}"' for t in tokens[:-1])
+            expression = f'{words} "{key}{tokens[-1]}"*'.strip()
+            fts = literal_column(FTS_TABLE)
+            join = [
+                (search_keys, search_keys.c.expense_id == Expense.id),
+                (_fts_table, _fts_table.c.rowid == search_keys.c.key),
+            ]
+            return join, fts.op("MATCH")(expression), func.bm25(fts)
+        
+        if dialect == "postgresql":
+            tsquery = func.to_tsquery(
+                literal_column("'simple'"),
+                " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"]),
+            )
+            document = description_tsvector()
+            return [], document.op("@@")(tsquery), -func.ts_rank(document, tsquery)
+        
+        # Other dialects: unindexed substring match, unranked
+        condition = and_(*[Expense.description.ilike(f"%{t}%") for t in tokens])
+        return [], condition, literal_column("0")
@@ -0,0 +1,63 @@
+# Data Version Service
+# Per-user change counter behind ETag / If-None-Match on read endpoints
+
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.models.user import UserDataVersion
+from app.services.cache_service import get_response_cache
+
+
+class DataVersionService:
+    """
+    Reads and bumps a user's data version.
+    
+    Every service that writes user data calls bump() before committing,
+    so the new version becomes visible atomically with the data. Readers
+    compare it against If-None-Match and key cached results by it. The
+    value is memoized on the session, so one request reads it only once.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get(self, user_id: UUID) -> int:
+        """Current version (0 if the user has never written anything)."""
+        versions = self.db.info.setdefault("data_versions", {})
+        if user_id not in versions:
+            result = await self.db.execute(
+                select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+            )
+            versions[user_id] = result.scalar() or 0
+        return versions[user_id]
+    
+    def remember(self, user_id: UUID, version: int) -> None:
+        """Memoize a version read elsewhere in this request (e.g. joined to the user)."""
+        self.db.info.setdefault("data_versions", {})[user_id] = version
+    
+    async def bump(self, user_id: UUID) -> None:
+        """Increment the version inside the caller's transaction."""
+        self.db.info.get("data_versions", {}).pop(user_id, None)
+        await get_response_cache().invalidate_user(user_id)
+        
+        dialect = self.db.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            existing = await self.db.get(UserDataVersion, user_id)
+            if existing:
+                existing.version += 1
+            else:
+                self.db.add(UserDataVersion(user_id=user_id, version=1))
+            await self.db.flush()
+            return
+        
+        stmt = dialect_insert(UserDataVersion).values(user_id=user_id, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"version": UserDataVersion.version + 1},
+        )
+        await self.db.execute(stmt)
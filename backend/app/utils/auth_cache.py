@@ -0,0 +1,125 @@
+# Auth Cache
+# Short-lived in-process cache of authenticated users and verified tokens
+
+import time
+from collections import OrderedDict
+from uuid import UUID
+from typing import Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models.user import User
+from app.schemas.auth import TokenData
+
+# Columns needed to rebuild a User for authorization and profile reads
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class AuthCache:
+    """
+    Saves the users lookup and JWT signature check on repeat requests.
+    
+    User entries hold the row's column values plus the user's data version
+    when they were read. Within `ttl` they are trusted as-is; after that
+    they are revalidated against the data version (one primary-key read
+    that later ETag checks reuse) and kept if it has not moved. Profile,
+    password and activation changes bump the version, so other workers
+    notice within `ttl`; this worker drops the entry immediately.
+    
+    Verified tokens are memoized until their own expiry.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._users: "OrderedDict[UUID, list]" = OrderedDict()  # id -> [checked_at, version, values]
+        self._tokens: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (expires_at, type, TokenData)
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+    
+    # Users
+    
+    def get_user(self, user_id: UUID) -> Optional[Tuple[bool, int, dict]]:
+        """
+        Cached (fresh, version, values) for a user, or None.
+        
+        `fresh` is False once the entry is older than the TTL and must be
+        revalidated against the current data version.
+        """
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        self._users.move_to_end(user_id)
+        return time.monotonic() - entry[0] < self.ttl, entry[1], entry[2]
+    
+    def put_user(self, user: User, version: int) -> None:
+        if not self.enabled:
+            return
+        values = {key: getattr(user, key) for key in _USER_COLUMNS}
+        self._users[user.id] = [time.monotonic(), version, values]
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.max_entries:
+            self._users.popitem(last=False)
+    
+    def touch_user(self, user_id: UUID) -> None:
+        """Mark an entry fresh again after a successful revalidation."""
+        entry = self._users.get(user_id)
+        if entry is not None:
+            entry[0] = time.monotonic()
+    
+    def invalidate(self, user_id: UUID) -> None:
+        """Drop a user's entry (after profile, password or status changes)."""
+        self._users.pop(user_id, None)
+    
+    @staticmethod
+    def build_user(values: dict) -> User:
+        """A detached User carrying cached values, ready for session.add()."""
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+    
+    # Tokens
+    
+    def get_token(self, token: str, token_type: str) -> Optional[TokenData]:
+        entry = self._tokens.get(token)
+        if entry is None or entry[1] != token_type:
+            return None
+        if entry[0] <= time.time():
+            del self._tokens[token]
+            return None
+        return entry[2]
+    
+    def put_token(self, token: str, token_type: str, data: TokenData, expires_at: float) -> None:
+        if not self.enabled:
+            return
+        self._tokens[token] = (expires_at, token_type, data)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._users.clear()
+        self._tokens.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "users": len(self._users),
+            "tokens": len(self._tokens),
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+        }
+
+
+auth_cache = AuthCache(settings.auth_cache_ttl_seconds, settings.auth_cache_max_entries)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_write(mapper, connection, target) -> None:
+    auth_cache.invalidate(target.id)
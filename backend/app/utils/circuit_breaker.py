@@ -0,0 +1,81 @@
+# Circuit Breaker
+# Per-dependency closed/open/half-open state for failing upstream calls
+
+import time
+from typing import Optional
+
+
+class CircuitBreaker:
+    """
+    Stops calling an upstream that keeps failing.
+    
+    Closed: calls go through; `threshold` consecutive failures open it.
+    Open: calls are refused until the cooldown (or the server's
+    retry-after hint) has passed. Half-open: one probe call is let
+    through; success closes the breaker, failure opens it again.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._open_until = 0.0
+        self._opened = False
+        self._probing = False
+    
+    @property
+    def state(self) -> str:
+        if not self._opened:
+            return self.CLOSED
+        if time.monotonic() < self._open_until:
+            return self.OPEN
+        return self.HALF_OPEN
+    
+    def allow(self) -> bool:
+        """Whether a call may be made now (claims the probe when half-open)."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened = False
+        self._probing = False
+    
+    def record_failure(self, error: str, open_for: Optional[float] = None) -> None:
+        """
+        Count a failure.
+        
+        Args:
+            error: Short description for /health
+            open_for: Open immediately for this long (quota, retry-after
+                hints, missing model); otherwise open after `threshold`
+                consecutive failures for the default cooldown
+        """
+        self.failures += 1
+        self.last_error = error
+        self._probing = False
+        if open_for is not None or self.failures >= self.threshold or self._opened:
+            self._opened = True
+            self._open_until = time.monotonic() + (open_for if open_for is not None else self.cooldown)
+    
+    def release(self) -> None:
+        """Give back a claimed probe without an outcome (e.g. the call was cancelled)."""
+        self._probing = False
+    
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(max(0.0, self._open_until - time.monotonic()), 1) if self._opened else 0,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,56 @@
+# Latency Tracker
+# Rolling latency percentiles and success rate for one upstream
+
+import math
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """
+    Keeps the last `size` call outcomes for one upstream.
+    
+    Percentiles are taken over successful calls only (a fast error is not
+    a fast answer). The success rate is Laplace-smoothed, so one early
+    failure does not condemn a model and an untried one starts at 0.5.
+    """
+    
+    def __init__(self, size: int = 50):
+        self._samples: deque = deque(maxlen=size)  # (seconds, ok)
+    
+    def record(self, seconds: float, ok: bool) -> None:
+        self._samples.append((seconds, ok))
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """Latency at quantile p (0-1) of recent successes, or None if there are none."""
+        latencies = sorted(seconds for seconds, ok in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[max(0, math.ceil(p * len(latencies)) - 1)]  # nearest rank
+    
+    @property
+    def successes(self) -> int:
+        return sum(1 for _, ok in self._samples if ok)
+    
+    @property
+    def success_rate(self) -> float:
+        return (self.successes + 1) / (len(self._samples) + 2)
+    
+    def score(self) -> float:
+        """Expected seconds per useful answer (lower is better; 0 until measured)."""
+        median = self.percentile(0.5)
+        if median is None:
+            return 0.0 if not self._samples else float("inf")
+        return median / self.success_rate
+    
+    def stats(self) -> dict:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "samples": len(self._samples),
+            "success_rate": round(self.success_rate, 3),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._samples)
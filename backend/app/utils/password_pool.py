@@ -0,0 +1,134 @@
+# Password Pool
+# Bounded thread pool for bcrypt so hashing never blocks the event loop
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.utils.security import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPool:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+    
+    bcrypt releases the GIL while hashing, so threads give real
+    parallelism while the event loop keeps serving other requests. At most
+    `max_queue` calls may be waiting or running; beyond that new calls are
+    rejected with 503 instead of piling up behind a login burst.
+    
+    A call counts as in flight until its thread finishes, not until the
+    awaiting request goes away: a client that disconnects mid-login does
+    not free a slot while bcrypt is still burning a worker. The executor
+    is created on first use, so the pool works again after shutdown().
+    """
+    
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()  # counters are updated from worker threads
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self.max_wait = 0.0
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password using bcrypt off the event loop."""
+        return await self._submit(hash_password, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash off the event loop."""
+        return await self._submit(verify_password, plain_password, hashed_password)
+    
+    async def _submit(self, fn, *args):
+        with self._lock:
+            full = self._in_flight >= self.max_queue
+            if full:
+                self.rejected += 1
+            else:
+                self._in_flight += 1
+        if full:
+            logger.warning(f"Password pool full ({self._in_flight} queued/running), rejecting")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+        
+        submitted = time.perf_counter()
+        
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self._record(started - submitted, time.perf_counter() - started)
+        
+        try:
+            future = self._get_executor().submit(run)
+        except BaseException:
+            self._release(None)
+            raise
+        # Runs when the work itself ends (or is cancelled before starting)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+    
+    def _release(self, future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+    
+    def _record(self, wait: float, duration: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self._wait_total += wait
+            self._run_total += duration
+            self.max_wait = max(self.max_wait, wait)
+    
+    def stats(self) -> dict:
+        """Pool size, queue depth and timing counters for /health."""
+        done = self.completed or 1
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_total / done * 1000, 1),
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_run_ms": round(self._run_total / done * 1000, 1),
+        }
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads; the next call starts a fresh executor."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_pool: Optional[PasswordPool] = None
+
+
+def get_password_pool() -> PasswordPool:
+    """Get or create the process-wide password pool from settings."""
+    global _pool
+    if _pool is None:
+        workers = settings.password_pool_workers or min(4, os.cpu_count() or 1)
+        _pool = PasswordPool(workers, settings.password_pool_max_queue)
+    return _pool
@@ -0,0 +1,70 @@
+# Date Periods
+# Half-open date windows that compile to index-friendly range predicates
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_
+from sqlalchemy.sql import ColumnElement
+
+
+def add_months(year: int, month: int, delta: int) -> Tuple[int, int]:
+    """Shift a (year, month) pair by delta months."""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+@dataclass(frozen=True)
+class Period:
+    """
+    Half-open date range [start, end).
+
+    Filtering with ``column >= start AND column < end`` keeps the bare
+    column on the left-hand side, so SQLite and Postgres can use range
+    scans on indexes such as ix_expenses_user_date. Wrapping the column
+    in extract()/strftime() would force a scan of every user row.
+    """
+    start: date
+    end: date
+
+    @classmethod
+    def month(cls, year: int, month: int) -> "Period":
+        """Calendar month window."""
+        next_year, next_month = add_months(year, month, 1)
+        return cls(date(year, month, 1), date(next_year, next_month, 1))
+
+    @classmethod
+    def days(cls, start: date, end: date) -> "Period":
+        """Window covering start..end with both days included."""
+        return cls(start, end + timedelta(days=1))
+
+    def filter(self, column) -> ColumnElement:
+        """Sargable predicate restricting `column` to this period."""
+        return and_(column >= self.start, column < self.end)
+
+    def iter_days(self) -> Iterator[date]:
+        """Every day in the period, in order."""
+        day = self.start
+        while day < self.end:
+            yield day
+            day += timedelta(days=1)
+
+
+def date_range_filters(
+    column,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[ColumnElement]:
+    """
+    Predicates for an optionally bounded, inclusive start..end filter.
+
+    The inclusive end date is converted to an exclusive bound on the next
+    day so the predicate stays a plain range over the indexed column.
+    """
+    filters = []
+    if start:
+        filters.append(column >= start)
+    if end:
+        filters.append(column < end + timedelta(days=1))
+    return filters
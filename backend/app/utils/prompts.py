@@ -32,7 +32,7 @@ Provide a helpful, personalized response about their finances. If the question i
 
 PREDICTION_PROMPT = """Based on the user's spending history provided below, predict their expenses for next month.
 
-SPENDING HISTORY (last 3 months):
+SPENDING HISTORY (last {history_months} months):
 {spending_history}
 
 CURRENT MONTH PROGRESS:
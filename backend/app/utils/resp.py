@@ -0,0 +1,153 @@
+# RESP Client
+# Minimal asyncio client for the Redis wire protocol (RESP2)
+
+import asyncio
+from typing import Any, List, Optional, Sequence
+from urllib.parse import urlparse
+
+
+class RespError(Exception):
+    """Error reply from the server, or a failed/timed-out connection."""
+
+
+class RespClient:
+    """
+    Pooled client for Redis-protocol servers.
+    
+    Speaks just enough RESP2 for caching and counters (strings, integers,
+    arrays, errors), so it works against Redis, Valkey, KeyDB or a local
+    stand-in without adding a dependency. Up to `pool_size` connections
+    are opened on demand and reused; each carries one command batch at a
+    time, so a slow reply holds up only the callers queued on that
+    connection. pipeline() writes a batch at once and reads all replies.
+    """
+    
+    def __init__(self, url: str, timeout: float = 1.0, pool_size: int = 4):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle: List["_Connection"] = []
+    
+    async def execute(self, *args: Any) -> Any:
+        """Run one command and return its reply."""
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+    
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        Send several commands in one round trip.
+        
+        Returns:
+            One reply per command; error replies are returned as RespError
+            instances rather than raised, so earlier results are not lost
+        
+        Raises:
+            RespError: If the connection fails or times out (waiting for a
+                free connection counts toward the timeout)
+        """
+        try:
+            return await asyncio.wait_for(self._pipeline(commands), self.timeout)
+        except (OSError, EOFError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            raise RespError(str(e) or type(e).__name__) from e
+    
+    async def close(self) -> None:
+        """Close idle connections (new ones are opened on the next command)."""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+    
+    async def _pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else _Connection()
+            try:
+                if not connection.connected:
+                    await connection.connect(self.host, self.port, self.password, self.db)
+                replies = await connection.round_trip(commands)
+            except BaseException:
+                # The stream may hold a half-read reply; never reuse it
+                connection.abort()
+                raise
+            self._idle.append(connection)
+            return replies
+
+
+class _Connection:
+    """One socket speaking RESP2; used by a single caller at a time."""
+    
+    def __init__(self):
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+    
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+    
+    async def connect(self, host: str, port: int, password: Optional[str], db: int) -> None:
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+        setup = []
+        if password:
+            setup.append(("AUTH", password))
+        if db:
+            setup.append(("SELECT", db))
+        if setup:
+            for reply in await self.round_trip(setup):
+                if isinstance(reply, RespError):
+                    raise reply
+    
+    async def round_trip(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        self._writer.write(b"".join(_encode(command) for command in commands))
+        await self._writer.drain()
+        return [await self._read_reply() for _ in commands]
+    
+    def abort(self) -> None:
+        """Drop the socket without waiting (safe while being cancelled)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    async def close(self) -> None:
+        writer = self._writer
+        self.abort()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+    
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readuntil(b"\r\n")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return RespError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if kind == b"*":
+            length = int(body)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise EOFError(f"Unexpected RESP reply type {kind!r}")
+
+
+def _encode(command: Sequence[Any]) -> bytes:
+    """Encode one command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(command)]
+    for arg in command:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
@@ -0,0 +1,49 @@
+# Response Classes
+# Fast JSON rendering shared by the API routers
+
+from typing import Any
+from fastapi import Request, status
+from fastapi.responses import Response, JSONResponse as _StarletteJSONResponse
+from pydantic_core import to_json
+
+
+# Per-user data: clients may store it but must revalidate every time
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """
+    JSON response rendered by pydantic-core in a single pass.
+    
+    Accepts Pydantic models (field serializers such as Money apply), plain
+    dicts/lists, and Decimal/UUID/date/datetime values directly. Routes
+    return it with an already-built response model so FastAPI neither
+    re-validates the model nor walks it through jsonable_encoder.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag built from the values a representation depends on."""
+    return 'W/"' + ":".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether If-None-Match names `etag` (weak comparison, as RFC 9110 requires)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str = PRIVATE_REVALIDATE) -> Response:
+    """Empty 304 carrying the validator and caching policy."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
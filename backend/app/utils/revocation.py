@@ -0,0 +1,112 @@
+# Token Revocation
+# In-memory set of revoked token ids, backed by the revoked_tokens table
+
+import time
+import asyncio
+import logging
+from uuid import UUID
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# How often other workers' revocations are pulled in and expired ids dropped
+SYNC_INTERVAL_SECONDS = 5
+# Re-read this far behind the last sync, to catch rows committed late
+SYNC_OVERLAP_SECONDS = 30
+
+
+class RevocationStore:
+    """
+    Answers "is this jti revoked?" from a dict, without a query.
+    
+    The set is loaded from the database at startup and updated in place
+    on revoke. A background task pulls ids revoked by other workers (so
+    they take effect everywhere within SYNC_INTERVAL_SECONDS) and drops
+    ids whose tokens have expired, from memory and from the table.
+    """
+    
+    def __init__(self):
+        self._revoked: Dict[str, int] = {}  # jti -> expires_at
+        self._synced_at = 0
+    
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+    
+    async def revoke(self, db: AsyncSession, jti: str, user_id: UUID, expires_at: int) -> bool:
+        """
+        Revoke a token id inside the caller's transaction.
+        
+        Returns:
+            False if it was already revoked (here or by another worker),
+            so a refresh token can be spent only once
+        """
+        if jti in self._revoked:
+            return False
+        self._revoked[jti] = expires_at
+        
+        values = dict(jti=jti, user_id=user_id, expires_at=expires_at, revoked_at=int(time.time()))
+        dialect = db.bind.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            if await db.get(RevokedToken, jti) is not None:
+                return False
+            db.add(RevokedToken(**values))
+            await db.flush()
+            return True
+        
+        result = await db.execute(
+            dialect_insert(RevokedToken).values(**values).on_conflict_do_nothing(index_elements=["jti"])
+        )
+        return result.rowcount == 1
+    
+    async def load(self, db: AsyncSession) -> None:
+        """Rebuild the set from unexpired rows (run at startup)."""
+        now = int(time.time())
+        result = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        )
+        self._revoked = {row.jti: row.expires_at for row in result}
+        self._synced_at = now
+    
+    async def sync(self, db: AsyncSession) -> None:
+        """Pull recent revocations from other workers and purge expired ids."""
+        now = int(time.time())
+        result = await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(
+                RevokedToken.revoked_at >= self._synced_at - SYNC_OVERLAP_SECONDS,
+                RevokedToken.expires_at > now,
+            )
+        )
+        for row in result:
+            self._revoked[row.jti] = row.expires_at
+        self._synced_at = now
+        
+        expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+        for jti in expired:
+            del self._revoked[jti]
+        await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        await db.commit()
+    
+    async def run_sync(self, session_maker, interval: float = SYNC_INTERVAL_SECONDS) -> None:
+        """Background task: sync() every `interval` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_maker() as session:
+                    await self.sync(session)
+            except SQLAlchemyError as e:
+                logger.warning(f"Revocation sync failed: {e}")
+    
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+revocation_store = RevocationStore()
@@ -3,7 +3,7 @@
 
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 from jose import jwt, JWTError
 import bcrypt
 from fastapi import Depends, HTTPException, status
@@ -13,12 +13,16 @@ from sqlalchemy import select
 
 from app.config import settings
 from app.database import get_db
-from app.models.user import User
+from app.models.user import User, UserDataVersion
 from app.schemas.auth import TokenData
+from app.utils.auth_cache import auth_cache
+from app.utils.revocation import revocation_store
 
 
 # Bearer token security
 security = HTTPBearer()
+# For routes that also accept other credentials (logout with a refresh token)
+optional_security = HTTPBearer(auto_error=False)
 
 
 def hash_password(password: str) -> str:
@@ -46,6 +50,7 @@ def create_access_token(user_id: UUID, email: str) -> str:
         "email": email,
         "exp": expire,
         "type": "access",
+        "jti": uuid4().hex,
     }
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
@@ -60,17 +65,25 @@ def create_refresh_token(user_id: UUID, email: str) -> str:
         "email": email,
         "exp": expire,
         "type": "refresh",
+        "jti": uuid4().hex,
     }
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
 def decode_token(token: str, token_type: str = "access") -> TokenData:
-    """Decode and validate a JWT token."""
+    """Decode and validate a JWT token (memoized until the token expires)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    
+    cached = auth_cache.get_token(token, token_type)
+    if cached is not None:
+        if revocation_store.is_revoked(cached.jti):
+            raise credentials_exception
+        return cached
+    
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -86,10 +99,59 @@ def decode_token(token: str, token_type: str = "access") -> TokenData:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Invalid token type. Expected {token_type}",
             )
-            
-        return TokenData(user_id=UUID(user_id), email=email)
+        
+        token_data = TokenData(
+            user_id=UUID(user_id),
+            email=email,
+            jti=payload.get("jti"),
+            expires_at=payload["exp"],
+        )
+        auth_cache.put_token(token, token_type, token_data, payload["exp"])
     except JWTError:
         raise credentials_exception
+    
+    if revocation_store.is_revoked(token_data.jti):
+        raise credentials_exception
+    return token_data
+
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> Optional[User]:
+    """
+    The user row, from the auth cache when it is still valid.
+    
+    Cached users are attached to the request session, so handlers can
+    modify and commit them exactly like a freshly loaded row.
+    """
+    from app.services.version_service import DataVersionService
+    versions = DataVersionService(db)
+    
+    cached = auth_cache.get_user(user_id)
+    if cached is not None:
+        fresh, version, values = cached
+        if not fresh:
+            fresh = await versions.get(user_id) == version
+            if fresh:
+                auth_cache.revalidations += 1
+                auth_cache.touch_user(user_id)
+        if fresh:
+            auth_cache.hits += 1
+            user = auth_cache.build_user(values)
+            db.add(user)
+            return user
+    
+    auth_cache.misses += 1
+    result = await db.execute(
+        select(User, UserDataVersion.version)
+        .outerjoin(UserDataVersion, UserDataVersion.user_id == User.id)
+        .where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    user, version = row
+    versions.remember(user_id, version or 0)
+    auth_cache.put_user(user, version or 0)
+    return user
 
 
 async def get_current_user(
@@ -100,10 +162,7 @@ async def get_current_user(
     token = credentials.credentials
     token_data = decode_token(token, "access")
     
-    result = await db.execute(
-        select(User).where(User.id == token_data.user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await _load_user(db, token_data.user_id)
     
     if user is None:
         raise HTTPException(
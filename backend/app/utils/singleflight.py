@@ -0,0 +1,56 @@
+# Single Flight
+# Coalesces concurrent identical async calls into one execution
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share it.
+    
+    The first caller for a key starts the call as a task, later callers
+    await the same task, and all of them get its result or exception. A
+    caller that is cancelled stops waiting without affecting the others;
+    the task itself is cancelled only when no caller is left waiting.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, list] = {}  # key -> [task, waiters]
+        self.started = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.create_task(fn())
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self.started += 1
+        else:
+            self.coalesced += 1
+        
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled():
+                raise
+            # This caller was cancelled; drop the call if nobody else waits.
+            # Unregister first: the task only finishes cancelling later, and
+            # a caller arriving before then must start a fresh call.
+            if call[1] == 1:
+                self._forget(key, task)
+                task.cancel()
+            raise
+        finally:
+            call[1] -= 1
+    
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+    
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "started": self.started, "coalesced": self.coalesced}
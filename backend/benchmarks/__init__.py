@@ -0,0 +1,2 @@
+# Benchmarks
+# Scratch-database performance checks; run from backend/ as python -m benchmarks.<name>
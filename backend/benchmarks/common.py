@@ -0,0 +1,90 @@
+# Benchmark Helpers
+# Throwaway SQLite database, an app client and timing utilities
+
+import gc
+import os
+import math
+import time
+import statistics
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Tuple
+
+DB_PATH = os.path.join(tempfile.gettempdir(), f"spendx_benchmark_{os.getpid()}.db")
+
+# Settings are read at import time, so point the app at the scratch database first
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+os.environ["GEMINI_API_KEY"] = ""
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-at-least-32-chars")
+
+
+def reset_database() -> None:
+    """Delete the scratch database so the next app start recreates it."""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(DB_PATH + suffix):
+            os.remove(DB_PATH + suffix)
+
+
+@contextmanager
+def app_client(email: str = "bench@example.com") -> Iterator[Tuple[object, dict]]:
+    """Start the app on a fresh database; yields (TestClient, auth headers)."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    reset_database()
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/api/auth/signup",
+                json={"email": email, "password": "password1", "name": "Bench"},
+            )
+            response.raise_for_status()
+            yield client, {"Authorization": f"Bearer {response.json()['access_token']}"}
+    finally:
+        reset_database()
+
+
+def seed_transactions(client, headers: dict, count: int, months: int = 12) -> None:
+    """Create `count` transactions through the batch endpoint."""
+    for offset in range(0, count, 500):
+        operations = [
+            {
+                "op": "create",
+                "data": {
+                    "amount": i % 97 + 1,
+                    "category_id": i % 9 + 1,
+                    "date": f"2026-{i % months + 1:02d}-{i % 28 + 1:02d}",
+                    "description": f"row {i} coffee",
+                },
+            }
+            for i in range(offset, min(count, offset + 500))
+        ]
+        client.post("/api/transactions/batch", json={"operations": operations}, headers=headers).raise_for_status()
+
+
+def measure(fn: Callable[[], object], repeat: int = 200, warmup: int = 20) -> List[float]:
+    """Run fn warmup + repeat times; returns the timed durations in seconds."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()  # don't bill this run for the previous one's garbage
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def percentile(durations: List[float], p: float) -> float:
+    ordered = sorted(durations)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]  # nearest rank
+
+
+def report(label: str, durations: List[float], per: int = 1, unit: str = "ms") -> None:
+    """Print median and p95 (divided by `per`, e.g. rows per call)."""
+    scale = 1000 if unit == "ms" else 1e6
+    print(
+        f"{label:32s} median {statistics.median(durations) * scale / per:9.2f} {unit}"
+        f"   p95 {percentile(durations, 0.95) * scale / per:9.2f} {unit}"
+    )
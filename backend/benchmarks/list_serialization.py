@@ -0,0 +1,100 @@
+# List Serialization Benchmark
+# Per-row cost of GET /transactions: ORM objects + response_model vs Core rows
+#
+# Usage (from backend/):
+#   python -m benchmarks.list_serialization [--rows 500] [--per-page 100]
+
+import argparse
+import time
+
+from benchmarks.common import app_client, seed_transactions, measure, report
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.api.expenses import _to_item
+from app.database import async_session_maker
+from app.models.expense import Expense
+from app.schemas.expense import ExpenseResponse, CategoryResponse, ExpenseListResponse
+from app.services.category_registry import category_registry
+from app.services.expense_service import _LIST_COLUMNS
+from app.utils.responses import JSONResponse
+
+
+async def compare(per_page: int, total: int, repeat: int) -> None:
+    """Time both read paths on the same page of rows, query included."""
+    adapter = TypeAdapter(ExpenseListResponse)
+    pages = -(-total // per_page)
+    
+    async with async_session_maker() as session:
+        await category_registry.load(session)
+        
+        async def orm_path() -> bytes:
+            # The previous route: hydrate Expense + Category, build models by hand,
+            # then FastAPI validates and serializes again through response_model
+            session.expunge_all()
+            expenses = (await session.execute(
+                select(Expense).options(selectinload(Expense.category)).limit(per_page)
+            )).scalars().all()
+            response = ExpenseListResponse(
+                items=[
+                    ExpenseResponse(
+                        id=e.id,
+                        amount=e.amount,
+                        type=e.type,
+                        description=e.description,
+                        date=e.date,
+                        category=CategoryResponse(
+                            id=e.category.id,
+                            name=e.category.name,
+                            icon=e.category.icon,
+                            color=e.category.color,
+                        ),
+                        is_auto_detected=e.is_auto_detected,
+                        created_at=e.created_at,
+                    )
+                    for e in expenses
+                ],
+                total=total, page=1, per_page=per_page, pages=pages,
+            )
+            return adapter.dump_json(adapter.validate_python(response.model_dump()))
+        
+        async def core_path() -> bytes:
+            rows = (await session.execute(select(*_LIST_COLUMNS).limit(per_page))).all()
+            return JSONResponse({
+                "items": [_to_item(row) for row in rows],
+                "total": total, "page": 1, "per_page": per_page, "pages": pages,
+            }).body
+        
+        for label, fn in (("ORM + response_model", orm_path), ("Core rows + to_json", core_path)):
+            for _ in range(20):
+                await fn()
+            durations = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await fn()
+                durations.append(time.perf_counter() - started)
+            report(f"{label} (per row)", durations, per=per_page, unit="us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    with app_client() as (client, headers):
+        seed_transactions(client, headers, args.rows)
+        client.portal.call(compare, args.per_page, args.rows, args.repeat)
+        
+        durations = measure(
+            lambda: client.get("/api/transactions", params={"per_page": args.per_page}, headers=headers),
+            repeat=args.repeat,
+        )
+        report(f"GET /transactions per_page={args.per_page}", durations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Rate Limiter Benchmark
+# Token bucket vs the previous per-user timestamp lists at 100k distinct users
+#
+# Usage (from backend/):
+#   python -m benchmarks.rate_limit [--users 100000] [--rounds 10]
+
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict
+
+import benchmarks.common  # noqa: F401  (settings defaults)
+
+from app.middleware.rate_limit import TokenBucketLimiter, EVICTION_BATCH
+
+
+def sliding_list_check(request_times: dict, key: str, max_requests: int = 10, window: float = 60) -> bool:
+    """The previous check_rate_limit core (logging left out): rebuild the timestamp list on every check."""
+    now = time.time()
+    window_start = now - window
+    request_times[key] = [t for t in request_times[key] if t > window_start]
+    if len(request_times[key]) >= max_requests:
+        return False
+    request_times[key].append(now)
+    return True
+
+
+def run(label: str, make_check, users: int, rounds: int) -> None:
+    """Time `rounds` checks per user, then measure live memory on fresh state."""
+    keys = [str(i) for i in range(users)]
+    check = make_check()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            check(key)
+    elapsed = time.perf_counter() - started
+    
+    # Separate pass: tracemalloc slows allocation-heavy code several times over
+    tracemalloc.start()
+    check = make_check()
+    for _ in range(rounds):
+        for key in keys:
+            check(key)
+    live, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:16s} {elapsed / (users * rounds) * 1e6:6.2f} us/check   {live / users:5.0f} B/user live")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    
+    def timestamp_lists():
+        request_times = defaultdict(list)
+        return lambda key: sliding_list_check(request_times, key)
+    
+    def token_bucket():
+        limiter = TokenBucketLimiter()
+        return lambda key: limiter.consume(key, 10, 1)
+    
+    run("timestamp lists", timestamp_lists, args.users, args.rounds)
+    run("token bucket", token_bucket, args.users, args.rounds)
+    
+    idle = TokenBucketLimiter(window_seconds=0.01)
+    for i in range(args.users):
+        idle.consume(str(i), 10)
+    time.sleep(0.02)
+    batches = []
+    while len(idle):
+        started = time.perf_counter()
+        idle.evict_idle(EVICTION_BATCH)
+        batches.append(time.perf_counter() - started)
+    print(f"evicted {args.users} idle buckets: {sum(batches) * 1e3:.1f} ms total, "
+          f"{max(batches) * 1e3:.2f} ms worst batch of {EVICTION_BATCH}")
+
+
+if __name__ == "__main__":
+    main()
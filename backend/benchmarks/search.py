@@ -0,0 +1,116 @@
+# Search Benchmark
+# Full-text q= search vs an unindexed ILIKE scan on a large expenses table
+#
+# Usage (from backend/):
+#   python -m benchmarks.search [--rows 1000000] [--users 1000]
+#
+# Rows are spread evenly over --users; fewer users means more matches per
+# search, and ranking and counting cost grows with the number of matches.
+
+import argparse
+import random
+import time
+import uuid
+from datetime import date, timedelta
+
+from benchmarks.common import app_client, report
+
+from sqlalchemy import create_engine, insert, select, func, text
+
+from app.database import async_session_maker, engine
+from app.models.expense import Expense, TransactionType
+from app.services.expense_service import ExpenseService, _LIST_COLUMNS
+from app.services.search_service import rebuild_search_index
+
+MERCHANTS = [
+    "swiggy", "zomato", "uber", "ola", "starbucks", "amazon", "flipkart", "bigbasket",
+    "netflix", "spotify", "airtel", "jio", "irctc", "indigo", "apollo", "dmart",
+    "blinkit", "zepto", "myntra", "bookmyshow",
+]
+WORDS = ["order", "trip", "coffee", "recharge", "ticket", "groceries", "refund", "subscription"]
+
+QUERIES = ["swiggy", "uber trip", "star", "netflix subscription", "bookmyshow ticket"]
+
+
+def seed(db_url: str, user_ids: list, rows: int) -> None:
+    """Bulk insert rows spread evenly over user_ids (bypasses the API for speed)."""
+    rng = random.Random(7)
+    # The running app may briefly hold the write lock (background tasks)
+    sync_engine = create_engine(db_url.replace("+aiosqlite", ""), connect_args={"timeout": 60})
+    start = date(2024, 1, 1)
+    batch = []
+    with sync_engine.begin() as conn:
+        for i in range(rows):
+            batch.append({
+                "id": uuid.uuid4(),
+                "user_id": user_ids[i % len(user_ids)],
+                "category_id": rng.randint(1, 9),
+                "amount": rng.randint(10, 5000),
+                "type": TransactionType.EXPENSE,
+                "description": f"{rng.choice(MERCHANTS)} {rng.choice(WORDS)} {rng.randint(1, 99999)}",
+                "date": start + timedelta(days=rng.randrange(900)),
+                "is_auto_detected": False,
+            })
+            if len(batch) == 20000:
+                conn.execute(insert(Expense), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Expense), batch)
+    sync_engine.dispose()
+
+
+async def run(user_id: uuid.UUID, repeat: int) -> None:
+    async with engine.begin() as conn:
+        await rebuild_search_index(conn)
+        await conn.execute(text("ANALYZE"))
+    
+    async with async_session_maker() as session:
+        service = ExpenseService(session)
+        
+        async def fts(q):
+            return await service.search(user_id, q, per_page=20)
+        
+        async def ilike(q):
+            condition = [Expense.description.ilike(f"%{word}%") for word in q.split()]
+            filters = [Expense.user_id == user_id, *condition]
+            total = (await session.execute(select(func.count(Expense.id)).where(*filters))).scalar()
+            rows = (await session.execute(
+                select(*_LIST_COLUMNS).where(*filters)
+                .order_by(Expense.date.desc(), Expense.id.desc()).limit(20)
+            )).all()
+            return rows, total
+        
+        for q in QUERIES:
+            for label, fn in (("fts", fts), ("ilike", ilike)):
+                for _ in range(3):
+                    await fn(q)
+                durations = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows, total = await fn(q)
+                    durations.append(time.perf_counter() - started)
+                report(f"{label:5s} q={q!r} ({total} hits)", durations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    
+    with app_client() as (client, headers):
+        user_id = uuid.UUID(client.get("/api/users/me", headers=headers).json()["id"])
+        # Other users' rows only need to exist in the table; foreign keys are not enforced on SQLite
+        user_ids = [user_id] + [uuid.uuid4() for _ in range(args.users - 1)]
+        
+        started = time.perf_counter()
+        seed(str(engine.url), user_ids, args.rows)
+        print(f"seeded {args.rows} rows for {args.users} users in {time.perf_counter() - started:.0f}s; "
+              f"searching one user's {args.rows // args.users} rows")
+        
+        client.portal.call(run, user_id, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Serialization Benchmark
+# Per-endpoint response rendering with jsonable_encoder vs pydantic-core paths
+#
+# Usage (from backend/):
+#   python -m benchmarks.serialization [--rows 500]
+
+import argparse
+import json
+from typing import List
+
+from benchmarks.common import app_client, seed_transactions, measure, report
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.budget import BudgetListResponse, BudgetResponse
+from app.schemas.expense import ExpenseListResponse, ExpenseSummary, DailySummary
+from app.utils.responses import JSONResponse
+
+ENDPOINTS = [
+    ("transaction page", "/api/transactions", {"per_page": 100}, ExpenseListResponse),
+    ("monthly summary", "/api/transactions/summary", {"year": 2026, "month": 10}, ExpenseSummary),
+    ("daily series", "/api/transactions/daily", {"start": "2026-01-01", "end": "2026-10-16"}, List[DailySummary]),
+    ("current budget", "/api/budgets/current", {}, BudgetResponse),
+    ("budget history", "/api/budgets/history", {}, BudgetListResponse),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+    
+    with app_client() as (client, headers):
+        seed_transactions(client, headers, args.rows, months=10)
+        for month in range(1, 13):
+            client.post(
+                "/api/budgets",
+                json={
+                    "year": 2026,
+                    "month": month,
+                    "total_limit": 1000,
+                    "category_limits": [{"category_id": k, "limit_amount": 100} for k in range(1, 10)],
+                },
+                headers=headers,
+            ).raise_for_status()
+        
+        for name, url, params, result_type in ENDPOINTS:
+            response = client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            adapter = TypeAdapter(result_type)
+            value = adapter.validate_python(response.json())
+            
+            print(name)
+            # Older FastAPI: jsonable_encoder + json.dumps
+            report("  jsonable_encoder + json.dumps",
+                   measure(lambda: json.dumps(jsonable_encoder(value)).encode(), args.repeat), unit="us")
+            # Newer FastAPI: response_model validation + dump_json
+            report("  validate + dump_json",
+                   measure(lambda: adapter.dump_json(adapter.validate_python(value)), args.repeat), unit="us")
+            report("  JSONResponse (to_json)",
+                   measure(lambda: JSONResponse(value).body, args.repeat), unit="us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Test Configuration
+# Throwaway SQLite database and an app client shared by the API tests
+
+import os
+import tempfile
+import uuid
+
+# Set before anything imports app.config; never point tests at a real database
+_DB_DIR = tempfile.mkdtemp(prefix="spendx-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-that-is-at-least-32-chars")
+os.environ.setdefault("GEMINI_API_KEY", "")
+os.environ["DEBUG"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    """App client with the lifespan (table creation, seeding) run once."""
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def run(client):
+    """Run a coroutine function on the app's event loop."""
+    return client.portal.call
+
+
+@pytest.fixture
+def user(client):
+    """A freshly signed-up user: id, email, password, tokens and auth headers."""
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    password = "password1"
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": email, "password": password, "name": "Test User"},
+    )
+    assert response.status_code == 201, response.text
+    tokens = response.json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    me = client.get("/api/users/me", headers=headers).json()
+    return {
+        "id": uuid.UUID(me["id"]),
+        "email": email,
+        "password": password,
+        "headers": headers,
+        **tokens,
+    }
@@ -0,0 +1,37 @@
+# AI Response Parsing Tests
+# Pulling the JSON payload out of free-form model output
+
+import pytest
+
+from app.services.ai_service import AIService
+
+
+@pytest.fixture
+def parse():
+    return AIService(db=None)._parse_json_response
+
+
+def test_parses_an_object_inside_prose(parse):
+    text = 'Here is the forecast:\n```json\n{"predicted_amount": 1200, "confidence": "medium"}\n```'
+    assert parse(text) == {"predicted_amount": 1200, "confidence": "medium"}
+
+
+def test_parses_a_list_of_objects(parse):
+    text = (
+        'Insights:\n[{"type": "tip", "title": "Cook more"},'
+        ' {"type": "warning", "title": "Dining is up"}]\nHope this helps.'
+    )
+    assert parse(text) == [
+        {"type": "tip", "title": "Cook more"},
+        {"type": "warning", "title": "Dining is up"},
+    ]
+
+
+def test_object_containing_a_list_stays_an_object(parse):
+    text = '{"insights": [{"title": "a"}], "note": "b"}'
+    assert parse(text) == {"insights": [{"title": "a"}], "note": "b"}
+
+
+def test_rejects_text_without_json(parse):
+    with pytest.raises(ValueError):
+        parse("No structured answer today.")
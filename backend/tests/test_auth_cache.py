@@ -0,0 +1,77 @@
+# Auth Cache Tests
+# Cached users must not outlive password, profile or status changes
+
+from sqlalchemy import update
+
+from app.database import async_session_maker
+from app.models.user import User
+from app.services.version_service import DataVersionService
+from app.utils.auth_cache import auth_cache
+from app.utils.security import hash_password
+
+
+def change_password(client, user, current, new):
+    return client.post(
+        "/api/users/me/change-password",
+        json={"current_password": current, "new_password": new, "confirm_password": new},
+        headers=user["headers"],
+    )
+
+
+def login(client, user, password):
+    return client.post("/api/auth/login", json={"email": user["email"], "password": password})
+
+
+def change_elsewhere(run, user_id, **values):
+    """What another worker does: write the row and bump the version, no local invalidation."""
+    async def write():
+        async with async_session_maker() as session:
+            await session.execute(update(User).where(User.id == user_id).values(**values))
+            await DataVersionService(session).bump(user_id)
+            await session.commit()
+
+    run(write)
+
+
+def expire_entry(user_id):
+    """Age this worker's cached entry past the TTL so the next request revalidates it."""
+    auth_cache._users[user_id][0] -= auth_cache.ttl
+
+
+def test_password_change_drops_the_cached_user(client, user):
+    client.get("/api/users/me", headers=user["headers"])  # cache the user
+
+    assert change_password(client, user, "password1", "password2").status_code == 200
+    # Verifying against a stale cached hash would reject the new password here
+    assert change_password(client, user, "password2", "password3").status_code == 200
+    assert change_password(client, user, "password2", "password4").status_code == 400
+
+    assert login(client, user, "password3").status_code == 200
+    assert login(client, user, "password1").status_code == 401
+
+
+def test_profile_update_is_visible_immediately(client, user):
+    client.get("/api/users/me", headers=user["headers"])
+
+    client.patch("/api/users/me", json={"name": "New Name"}, headers=user["headers"])
+
+    assert client.get("/api/users/me", headers=user["headers"]).json()["name"] == "New Name"
+
+
+def test_other_workers_password_change_is_seen_after_ttl(client, run, user):
+    client.get("/api/users/me", headers=user["headers"])
+
+    change_elsewhere(run, user["id"], password_hash=hash_password("changed1"))
+    expire_entry(user["id"])
+
+    assert change_password(client, user, "password1", "password2").status_code == 400
+    assert change_password(client, user, "changed1", "password2").status_code == 200
+
+
+def test_other_workers_deactivation_is_seen_after_ttl(client, run, user):
+    client.get("/api/users/me", headers=user["headers"])
+
+    change_elsewhere(run, user["id"], is_active=False)
+    expire_entry(user["id"])
+
+    assert client.get("/api/users/me", headers=user["headers"]).status_code in (401, 403)
@@ -0,0 +1,109 @@
+# Batch Mutation Tests
+# POST /api/transactions/batch: ordering, partial and atomic semantics
+
+import uuid
+
+from tests.test_rollups import assert_rollups_match, create
+
+
+def batch(client, user, operations, atomic=False):
+    response = client.post(
+        "/api/transactions/batch",
+        json={"operations": operations, "atomic": atomic},
+        headers=user["headers"],
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def new(amount="10.00", **fields):
+    return {"amount": amount, "category_id": 1, "date": "2026-05-04", **fields}
+
+
+def listed_ids(client, user):
+    items = client.get("/api/transactions?per_page=100", headers=user["headers"]).json()["items"]
+    return {item["id"] for item in items}
+
+
+def test_operations_apply_in_order(client, run, user):
+    existing = create(client, user, amount="30.00", date="2026-05-01")
+    doomed = create(client, user, amount="8.00", date="2026-05-02")
+    client_id = str(uuid.uuid4())
+
+    result = batch(client, user, [
+        {"op": "create", "id": client_id, "data": new("12.00")},
+        {"op": "update", "id": client_id, "data": {"amount": "15.00", "category_id": 2}},
+        {"op": "update", "id": existing, "data": {"date": "2026-06-01"}},
+        {"op": "delete", "id": doomed},
+        {"op": "create", "data": new("1.00", type="income", category_id=8)},
+    ])
+
+    assert (result["applied"], result["failed"]) == (5, 0)
+    assert result["results"][1]["item"]["amount"] == "15.00"
+    assert result["results"][1]["item"]["category"]["id"] == 2
+    assert listed_ids(client, user) == {client_id, existing, result["results"][4]["id"]}
+    assert_rollups_match(run, user["id"])
+
+
+def test_partial_batch_keeps_successful_operations(client, run, user):
+    result = batch(client, user, [
+        {"op": "create", "data": new()},
+        {"op": "update", "id": str(uuid.uuid4()), "data": {"amount": "5.00"}},
+        {"op": "create", "data": new(category_id=9999)},
+        {"op": "create", "data": {"amount": "-3", "category_id": 1, "date": "2026-05-04"}},
+    ])
+
+    assert [r["success"] for r in result["results"]] == [True, False, False, False]
+    assert result["results"][1]["error"] == "Transaction not found"
+    assert "9999" in result["results"][2]["error"]
+    assert listed_ids(client, user) == {result["results"][0]["id"]}
+    assert_rollups_match(run, user["id"])
+
+
+def test_atomic_batch_writes_nothing_on_failure(client, run, user):
+    existing = create(client, user)
+
+    result = batch(client, user, [
+        {"op": "create", "data": new()},
+        {"op": "delete", "id": existing},
+        {"op": "delete", "id": str(uuid.uuid4())},
+    ], atomic=True)
+
+    assert (result["applied"], result["failed"]) == (0, 3)
+    assert all(not r["success"] for r in result["results"])
+    assert listed_ids(client, user) == {existing}
+    assert_rollups_match(run, user["id"])
+
+
+def test_duplicate_create_id_fails_that_operation(client, user):
+    client_id = str(uuid.uuid4())
+
+    result = batch(client, user, [
+        {"op": "create", "id": client_id, "data": new()},
+        {"op": "create", "id": client_id, "data": new()},
+    ])
+
+    assert [r["success"] for r in result["results"]] == [True, False]
+    assert result["results"][1]["error"] == "Transaction id already exists"
+
+
+def test_create_with_another_users_id_fails_without_aborting(client, user):
+    other = client.post(
+        "/api/auth/signup",
+        json={"email": f"other-{uuid.uuid4().hex[:12]}@example.com", "password": "password1", "name": "Other"},
+    ).json()
+    other_headers = {"Authorization": f"Bearer {other['access_token']}"}
+    taken = client.post("/api/transactions", json=new(), headers=other_headers).json()["id"]
+
+    result = batch(client, user, [
+        {"op": "create", "id": taken, "data": new()},
+        {"op": "create", "data": new()},
+        {"op": "update", "id": taken, "data": {"amount": "1.00"}},
+        {"op": "delete", "id": taken},
+    ])
+
+    assert [r["success"] for r in result["results"]] == [False, True, False, False]
+    assert result["results"][0]["error"] == "Transaction id already exists"
+    assert listed_ids(client, user) == {result["results"][1]["id"]}
+    other_item = client.get(f"/api/transactions/{taken}", headers=other_headers).json()
+    assert other_item["amount"] == "10.00"
@@ -0,0 +1,88 @@
+# Conditional Request Tests
+# ETag / If-None-Match on dashboard reads, invalidated by the user's writes
+
+from datetime import date
+
+from tests.test_rollups import create
+from tests.test_search import other_user
+
+SUMMARY = "/api/transactions/summary?year=2026&month=3"
+
+
+def set_budget(client, user, total_limit):
+    """Create or replace this month's budget (/budgets/current 404s without one)."""
+    today = date.today()
+    response = client.post(
+        "/api/budgets",
+        json={"year": today.year, "month": today.month, "total_limit": total_limit, "category_limits": []},
+        headers=user["headers"],
+    )
+    assert response.status_code == 201, response.text
+
+
+def etag_of(client, user, path):
+    response = client.get(path, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    return response.headers["ETag"]
+
+
+def revalidate(client, user, path, etag):
+    return client.get(path, headers={**user["headers"], "If-None-Match": etag}).status_code
+
+
+def test_unchanged_reads_return_304(client, user):
+    set_budget(client, user, 500)
+    for path in (SUMMARY, "/api/budgets/current", "/api/users/me"):
+        etag = etag_of(client, user, path)
+        assert revalidate(client, user, path, etag) == 304
+        assert revalidate(client, user, path, f'"other", {etag}') == 304
+        assert revalidate(client, user, path, 'W/"stale"') == 200
+
+
+def test_summary_etag_depends_on_the_month(client, user):
+    march = etag_of(client, user, SUMMARY)
+    april = etag_of(client, user, "/api/transactions/summary?year=2026&month=4")
+
+    assert march != april
+    assert revalidate(client, user, "/api/transactions/summary?year=2026&month=4", march) == 200
+
+
+def test_transaction_writes_invalidate(client, user):
+    set_budget(client, user, 500)
+    paths = (SUMMARY, "/api/budgets/current", "/api/users/me")
+    etags = {path: etag_of(client, user, path) for path in paths}
+
+    expense_id = create(client, user)
+    for path in paths:
+        assert revalidate(client, user, path, etags[path]) == 200
+    etags = {path: etag_of(client, user, path) for path in paths}
+
+    client.patch(f"/api/transactions/{expense_id}", json={"amount": "11.00"}, headers=user["headers"])
+    assert revalidate(client, user, SUMMARY, etags[SUMMARY]) == 200
+    etag = etag_of(client, user, SUMMARY)
+
+    client.post(
+        "/api/transactions/batch",
+        json={"operations": [{"op": "delete", "id": expense_id}]},
+        headers=user["headers"],
+    )
+    assert revalidate(client, user, SUMMARY, etag) == 200
+    assert client.get(SUMMARY, headers=user["headers"]).json()["total_expense"] == "0.00"
+
+
+def test_budget_and_profile_writes_invalidate(client, user):
+    set_budget(client, user, 500)
+    budget = etag_of(client, user, "/api/budgets/current")
+    set_budget(client, user, 750)
+    assert revalidate(client, user, "/api/budgets/current", budget) == 200
+
+    me = etag_of(client, user, "/api/users/me")
+    client.patch("/api/users/me", json={"name": "Renamed User"}, headers=user["headers"])
+    assert revalidate(client, user, "/api/users/me", me) == 200
+
+
+def test_other_users_writes_do_not_invalidate(client, user):
+    etag = etag_of(client, user, SUMMARY)
+    create(client, other_user(client))
+    assert revalidate(client, user, SUMMARY, etag) == 304
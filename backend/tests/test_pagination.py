@@ -0,0 +1,69 @@
+# Cursor Pagination Tests
+# Keyset pages over GET /api/transactions must not skip or repeat rows
+
+DATES = ["2026-03-10"] * 5 + ["2026-03-09"] * 4 + ["2026-03-08"] * 2 + ["2026-02-01"] * 2
+
+
+def create_all(client, user):
+    ids = set()
+    for i, on in enumerate(DATES):
+        response = client.post(
+            "/api/transactions",
+            json={"amount": "5.00", "category_id": 1, "date": on, "description": f"row {i}"},
+            headers=user["headers"],
+        )
+        assert response.status_code == 201, response.text
+        ids.add(response.json()["id"])
+    return ids
+
+
+def walk(client, user, per_page, **params):
+    """Follow next_cursor until exhausted; returns the items in page order."""
+    items, cursor = [], None
+    while True:
+        query = {"paginate": "cursor", "per_page": per_page, **params}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/transactions", params=query, headers=user["headers"])
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= per_page
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_cursor_pages_cover_equal_dates_exactly_once(client, user):
+    ids = create_all(client, user)
+
+    for per_page in (1, 2, 3, 5, 13, 20):
+        items = walk(client, user, per_page)
+        seen = [item["id"] for item in items]
+        assert len(seen) == len(set(seen)), f"duplicates at per_page={per_page}"
+        assert set(seen) == ids, f"gaps at per_page={per_page}"
+        dates = [item["date"] for item in items]
+        assert dates == sorted(dates, reverse=True)
+
+
+def test_cursor_pages_respect_filters(client, user):
+    create_all(client, user)
+
+    items = walk(client, user, 2, start_date="2026-03-09", end_date="2026-03-10")
+    assert len(items) == 9
+    assert {item["date"] for item in items} == {"2026-03-09", "2026-03-10"}
+
+
+def test_cursor_total_is_opt_in(client, user):
+    create_all(client, user)
+
+    params = {"paginate": "cursor", "per_page": 4}
+    page = client.get("/api/transactions", params=params, headers=user["headers"]).json()
+    assert page["total"] is None
+    page = client.get("/api/transactions", params={**params, "include_total": "true"}, headers=user["headers"]).json()
+    assert page["total"] == len(DATES)
+
+
+def test_invalid_cursor_is_rejected(client, user):
+    response = client.get("/api/transactions", params={"cursor": "not-a-cursor"}, headers=user["headers"])
+    assert response.status_code == 400
@@ -0,0 +1,82 @@
+# Rate Limit Tests
+# Shared database counters, with and without batched updates
+
+import uuid
+
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.middleware.rate_limit import BatchingLimiter, DatabaseRateLimiter
+from app.models.rate_limit import RateLimitCounter
+
+# Long windows so a test never straddles a window boundary
+WINDOW = 3600
+
+
+def stored_count(run, key):
+    async def read():
+        async with async_session_maker() as session:
+            counts = (await session.execute(
+                select(RateLimitCounter.count).where(RateLimitCounter.key == key)
+            )).scalars().all()
+        return sum(counts)
+
+    return run(read)
+
+
+def admitted(run, limiter, key, attempts, capacity=10, cost=1):
+    async def check():
+        allowed = 0
+        for _ in range(attempts):
+            if not await limiter.acquire(key, capacity, cost):
+                allowed += 1
+        return allowed
+
+    return run(check)
+
+
+def test_database_counters_are_shared_between_workers(client, run):
+    key = uuid.uuid4().hex
+    workers = [DatabaseRateLimiter(async_session_maker, WINDOW) for _ in range(3)]
+
+    allowed = sum(admitted(run, worker, key, 5) for worker in workers)
+
+    assert allowed == 10
+    assert stored_count(run, key) == 10  # rejected checks were refunded
+
+
+def test_batching_defers_writes_until_flush(client, run):
+    key = uuid.uuid4().hex
+    worker = BatchingLimiter(DatabaseRateLimiter(async_session_maker, WINDOW), interval_seconds=60)
+
+    assert admitted(run, worker, key, 4, cost=2) == 4
+    assert stored_count(run, key) == 2  # only the first, write-through check
+
+    run(worker.flush)
+    assert stored_count(run, key) == 8
+    assert worker.stats()["flushes"] == 1
+
+    # A single worker still enforces the exact limit
+    assert admitted(run, worker, key, 3, cost=2) == 1
+    run(worker.flush)
+    assert stored_count(run, key) == 10
+
+
+def test_batching_allowance_is_bounded_by_workers(client, run):
+    key = uuid.uuid4().hex
+    shared = DatabaseRateLimiter(async_session_maker, WINDOW)
+    workers = [BatchingLimiter(shared, interval_seconds=60) for _ in range(2)]
+
+    # Each worker spends the headroom it saw at its snapshot
+    allowed = sum(admitted(run, worker, key, 15) for worker in workers)
+    for worker in workers:
+        run(worker.flush)
+
+    assert 10 <= allowed <= 20
+    assert stored_count(run, key) == allowed
+    # Once flushed, every worker (and a fresh one) sees the limit as spent
+    fresh = BatchingLimiter(shared, interval_seconds=60)
+    assert admitted(run, fresh, key, 1) == 0
+    assert stored_count(run, key) == allowed + 1  # the rejected check is refunded on flush
+    run(fresh.flush)
+    assert stored_count(run, key) == allowed
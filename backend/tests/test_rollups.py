@@ -0,0 +1,119 @@
+# Rollup Tests
+# Incremental rollup deltas must match a full RollupService.rebuild()
+
+from decimal import Decimal
+
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.models.expense import ExpenseMonthlyRollup
+from app.services.rollup_service import RollupService
+
+
+def rollup_rows(run, user_id):
+    """Maintained rollup rows and the rows a rebuild would write (not committed)."""
+    async def read():
+        query = select(
+            ExpenseMonthlyRollup.year,
+            ExpenseMonthlyRollup.month,
+            ExpenseMonthlyRollup.category_id,
+            ExpenseMonthlyRollup.type,
+            ExpenseMonthlyRollup.total,
+            ExpenseMonthlyRollup.count,
+        ).where(ExpenseMonthlyRollup.user_id == user_id)
+
+        def normalise(rows):
+            return sorted(
+                (year, month, category_id, str(kind), Decimal(str(total)).quantize(Decimal("0.01")), count)
+                for year, month, category_id, kind, total, count in rows
+            )
+
+        async with async_session_maker() as session:
+            maintained = normalise((await session.execute(query)).all())
+            await RollupService(session).rebuild(user_id)
+            rebuilt = normalise((await session.execute(query)).all())
+            await session.rollback()
+        return maintained, rebuilt
+
+    return run(read)
+
+
+def assert_rollups_match(run, user_id):
+    maintained, rebuilt = rollup_rows(run, user_id)
+    assert maintained == rebuilt
+
+
+def create(client, user, **fields):
+    body = {"amount": "10.00", "category_id": 1, "type": "expense", "date": "2026-03-10", **fields}
+    response = client.post("/api/transactions", json=body, headers=user["headers"])
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_create_updates_rollups(client, run, user):
+    create(client, user, amount="12.50")
+    create(client, user, amount="7.25", category_id=2)
+    create(client, user, amount="100.00", category_id=8, type="income")
+    create(client, user, amount="3.00", date="2026-02-28")
+
+    maintained, _ = rollup_rows(run, user["id"])
+    assert len(maintained) == 4
+    assert_rollups_match(run, user["id"])
+
+
+def test_update_moves_amount_between_rollups(client, run, user):
+    expense_id = create(client, user, amount="20.00")
+    create(client, user, amount="5.00")
+
+    for change in ({"amount": "25.00"}, {"category_id": 3}, {"type": "income"}, {"date": "2026-04-01"}):
+        response = client.patch(f"/api/transactions/{expense_id}", json=change, headers=user["headers"])
+        assert response.status_code == 200, response.text
+        assert_rollups_match(run, user["id"])
+
+
+def test_delete_prunes_empty_rollups(client, run, user):
+    expense_id = create(client, user, category_id=4)
+    create(client, user, category_id=1)
+
+    response = client.delete(f"/api/transactions/{expense_id}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+
+    maintained, rebuilt = rollup_rows(run, user["id"])
+    assert maintained == rebuilt
+    assert [row[2] for row in maintained] == [1]
+
+
+def test_summary_reads_rollups(client, user):
+    create(client, user, amount="40.00", category_id=1)
+    create(client, user, amount="10.00", category_id=2)
+    create(client, user, amount="500.00", category_id=8, type="income")
+
+    summary = client.get("/api/transactions/summary?year=2026&month=3", headers=user["headers"]).json()
+    assert float(summary["total_expense"]) == 50.0
+    assert float(summary["total_income"]) == 500.0
+
+
+def test_import_updates_rollups(client, run, user):
+    create(client, user, amount="1.00", date="2026-01-05")
+    statement = "\n".join([
+        "date,amount,description,category_id",
+        "2026-01-05,-45.10,Groceries,1",
+        "2026-01-06,500.00 Dr,Rent,4",
+        "2026-01-07,1200 Cr,Salary,8",
+        "2026-02-02,-12.00,Cab,2",
+        "not-a-date,-1.00,Bad row,1",
+    ]).encode()
+
+    response = client.post(
+        "/api/transactions/import",
+        files={"file": ("statement.csv", statement, "text/csv")},
+        headers=user["headers"],
+    )
+    assert response.status_code == 200, response.text
+    assert (response.json()["imported"], response.json()["failed"]) == (4, 1)
+    assert_rollups_match(run, user["id"])
+
+    # "Dr" is money out, "Cr" money in
+    summary = client.get("/api/transactions/summary?year=2026&month=1", headers=user["headers"]).json()
+    assert float(summary["total_expense"]) == 546.10
+    assert float(summary["total_income"]) == 1200.0
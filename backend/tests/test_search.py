@@ -0,0 +1,110 @@
+# Search Tests
+# q= full-text search: per-user isolation and index upkeep on writes
+
+import uuid
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.services.search_service import rebuild_search_index
+from tests.test_rollups import create
+
+
+def search(client, user, q, **params):
+    response = client.get("/api/transactions", params={"q": q, **params}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def descriptions(client, user, q):
+    return sorted(item["description"] for item in search(client, user, q)["items"])
+
+
+def other_user(client):
+    email = f"other-{uuid.uuid4().hex[:12]}@example.com"
+    tokens = client.post(
+        "/api/auth/signup",
+        json={"email": email, "password": "password1", "name": "Other"},
+    ).json()
+    return {"headers": {"Authorization": f"Bearer {tokens['access_token']}"}}
+
+
+def test_search_matches_words_and_last_word_prefix(client, user):
+    create(client, user, description="Swiggy order 1042")
+    create(client, user, description="Uber trip to airport")
+    create(client, user, description="Starbucks coffee")
+    create(client, user, description="Café Coffee Day")
+
+    assert descriptions(client, user, "swiggy") == ["Swiggy order 1042"]
+    assert descriptions(client, user, "uber trip") == ["Uber trip to airport"]
+    assert descriptions(client, user, "star") == ["Starbucks coffee"]
+    assert descriptions(client, user, "cafe") == ["Café Coffee Day"]
+    assert descriptions(client, user, "coffee") == ["Café Coffee Day", "Starbucks coffee"]
+    assert descriptions(client, user, "trip swiggy") == []
+    assert search(client, user, "swiggy")["total"] == 1
+
+
+def test_search_is_scoped_to_the_user(client, user):
+    other = other_user(client)
+    create(client, user, description="Netflix subscription")
+    create(client, other, description="Netflix subscription family")
+    create(client, other, description="Netflix gift card")
+
+    assert descriptions(client, user, "netflix") == ["Netflix subscription"]
+    assert descriptions(client, user, "family") == []
+    assert len(search(client, other, "netflix")["items"]) == 2
+
+
+def test_search_follows_updates_and_deletes(client, user):
+    renamed = create(client, user, description="Amazon order")
+    removed = create(client, user, description="Amazon refund")
+
+    response = client.patch(f"/api/transactions/{renamed}", json={"description": "Flipkart order"}, headers=user["headers"])
+    assert response.status_code == 200, response.text
+    client.delete(f"/api/transactions/{removed}", headers=user["headers"])
+
+    assert descriptions(client, user, "amazon") == []
+    assert descriptions(client, user, "flipkart") == ["Flipkart order"]
+    assert descriptions(client, user, "order") == ["Flipkart order"]
+
+
+def test_search_follows_batch_writes(client, user):
+    create(client, user, description="Zomato dinner")
+    changed = create(client, user, description="Zomato lunch")
+    response = client.post(
+        "/api/transactions/batch",
+        json={"operations": [
+            {"op": "create", "data": {"amount": "5.00", "category_id": 1, "date": "2026-03-01", "description": "Zomato breakfast"}},
+            {"op": "update", "id": changed, "data": {"description": "Blinkit groceries"}},
+        ]},
+        headers=user["headers"],
+    )
+    assert response.json()["applied"] == 2
+
+    assert descriptions(client, user, "zomato") == ["Zomato breakfast", "Zomato dinner"]
+    assert descriptions(client, user, "blinkit") == ["Blinkit groceries"]
+
+
+def test_search_does_not_depend_on_expense_rowids(client, run, user):
+    create(client, user, description="Irctc ticket")
+    create(client, user, description="Indigo ticket")
+
+    # What VACUUM or a table-copying migration may do to expenses' implicit rowids
+    async def renumber():
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                text("UPDATE expenses SET rowid = rowid + 1000000 WHERE user_id = :user_id"),
+                {"user_id": user["id"].hex},
+            )
+            assert result.rowcount == 2
+
+    run(renumber)
+    assert descriptions(client, user, "ticket") == ["Indigo ticket", "Irctc ticket"]
+
+    async def rebuild():
+        async with engine.begin() as conn:
+            await rebuild_search_index(conn)
+
+    run(rebuild)
+    assert descriptions(client, user, "irctc") == ["Irctc ticket"]
+    assert descriptions(client, user, "ticket") == ["Indigo ticket", "Irctc ticket"]
@@ -0,0 +1,87 @@
+# Single Flight Tests
+# Coalescing, error sharing and cancellation of concurrent identical calls
+
+import asyncio
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+class Counter:
+    """An async call that counts its runs and blocks until released."""
+
+    def __init__(self):
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        return self.runs
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    call = Counter()
+
+    waiters = [asyncio.create_task(flights.do("key", call)) for _ in range(5)]
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await asyncio.gather(*waiters) == [1] * 5
+    assert call.runs == 1
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+@pytest.mark.asyncio
+async def test_callers_share_the_exception():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flights.do("key", fail), flights.do("key", fail), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert flights.stats()["started"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+    call = Counter()
+
+    first = asyncio.create_task(flights.do("key", call))
+    second = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await second == 1
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_caller_after_last_waiter_cancels_starts_a_fresh_call():
+    flights = SingleFlight()
+    call = Counter()
+
+    first = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    # Join before the cancelled task has finished unwinding
+    while not first.done():
+        await asyncio.sleep(0)
+    second = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await second == 2
+    assert call.runs == 2
+    assert flights.stats()["in_flight"] == 0
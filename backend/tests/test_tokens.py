@@ -0,0 +1,60 @@
+# Token Revocation Tests
+# Refresh-token rotation and logout revocation
+
+import uuid
+
+
+def refresh(client, token):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_refresh_token_can_be_used_once(client, user):
+    first = refresh(client, user["refresh_token"])
+    assert first.status_code == 200, first.text
+
+    # Replaying the spent token is rejected; the rotated one works
+    assert refresh(client, user["refresh_token"]).status_code == 401
+    second = refresh(client, first.json()["refresh_token"])
+    assert second.status_code == 200
+    assert client.get("/api/users/me", headers=bearer(second.json()["access_token"])).status_code == 200
+
+
+def test_logout_revokes_access_and_refresh_tokens(client, user):
+    response = client.post(
+        "/api/auth/logout",
+        json={"refresh_token": user["refresh_token"]},
+        headers=user["headers"],
+    )
+    assert response.status_code == 200, response.text
+
+    assert client.get("/api/users/me", headers=user["headers"]).status_code == 401
+    assert refresh(client, user["refresh_token"]).status_code == 401
+
+
+def test_logout_with_only_a_refresh_token(client, user):
+    response = client.post("/api/auth/logout", json={"refresh_token": user["refresh_token"]})
+    assert response.status_code == 200, response.text
+
+    assert refresh(client, user["refresh_token"]).status_code == 401
+    assert client.post("/api/auth/logout", json={"refresh_token": user["refresh_token"]}).status_code == 401
+    assert client.post("/api/auth/logout").status_code == 401
+
+
+def test_logout_leaves_another_users_refresh_token_alone(client, user):
+    email = f"other-{uuid.uuid4().hex[:12]}@example.com"
+    other = client.post(
+        "/api/auth/signup",
+        json={"email": email, "password": "password1", "name": "Other"},
+    ).json()
+
+    client.post(
+        "/api/auth/logout",
+        json={"refresh_token": other["refresh_token"]},
+        headers=user["headers"],
+    )
+
+    assert refresh(client, other["refresh_token"]).status_code == 200
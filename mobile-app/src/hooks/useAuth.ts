@@ -231,8 +231,9 @@ export function useAuth() {
 
     const logout = useCallback(async () => {
         try {
-            // Call logout endpoint (optional, JWT is stateless)
-            await api.post(Endpoints.auth.logout).catch(() => { });
+            // Revoke the session's tokens server-side (best effort)
+            const refreshToken = await AsyncStorage.getItem(REFRESH_TOKEN_KEY);
+            await api.post(Endpoints.auth.logout, { refresh_token: refreshToken }).catch(() => { });
 
             // Clear stored data
             await AsyncStorage.multiRemove([TOKEN_KEY, REFRESH_TOKEN_KEY, USER_KEY]);